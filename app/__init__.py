@@ -1,12 +1,11 @@
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
-from flask_bcrypt import Bcrypt
 from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
 from app.config import Config
+from app.database import RoutingSession
 
-db = SQLAlchemy()
-bcrypt = Bcrypt()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 migrate = Migrate()
 jwt = JWTManager()
 
@@ -16,16 +15,59 @@ def create_app():
     ## loading the config file
     app.config.from_object(Config)
 
+    ## fast JSON encoding for responses (orjson, when installed)
+    from app.utils.json_provider import init_json_provider
+    init_json_provider(app)
+
     ## initializing the plugins
     db.init_app(app)
-    bcrypt.init_app(app)
-    migrate.init_app(app, db)
+    from app.database import init_sqlite_profile
+    with app.app_context():
+        init_sqlite_profile(app, db.engine)
+    from app.utils.password import password_hasher
+    password_hasher.init_app(app)
     jwt.init_app(app)
+    from app.utils.jwtUtil import register_jwt_callbacks
+    register_jwt_callbacks(jwt)
+    from app.utils.user_cache import init_user_cache
+    init_user_cache(app)
+    from app.utils.cursor import init_cursors
+    init_cursors(app)
+
+    from app.models import User, Task, TaskStats, TaskDueCount, TaskVersion, TaskTombstone, RevokedToken  # Ensure models are imported for migrations
+
+    ## full-text search structures are created alongside `tasks` and hidden from autogenerate
+    from app.utils.task_search import include_object
+    migrate.init_app(app, db, include_object=include_object)
+
+    ## keeping the task counters in step with ORM writes
+    from app.utils.task_counters import register_counter_events
+    register_counter_events()
 
-    from app.models import User, Task  # Ensure models are imported for migrations
+    ## bumping the per-user data version behind the task read ETags
+    from app.utils.task_versions import register_version_events
+    register_version_events()
+    from app.utils.etag import init_response_cache
+    init_response_cache(app)
+
+    ## read replica routing for the read-only task endpoints (REPLICA_DATABASE_URL)
+    from app.utils.replica import init_replica
+    init_replica(app)
+
+    ## live task events: committed task writes wake the user's event streams (EVENTS_BROKER)
+    from app.utils.task_events import init_task_events
+    init_task_events(app)
+
+    ## one-writer-at-a-time queue for SQLite (SQLITE_WRITE_QUEUE)
+    from app.utils.write_queue import init_write_queue
+    init_write_queue(app)
 
     ## importing and registering the blueprints
     from app.routes import register_routes
     register_routes(app)
 
+    ## registering the `flask` maintenance commands
+    from app.commands import register_commands
+    register_commands(app)
+
     return app
\ No newline at end of file
@@ -1,23 +1,349 @@
+import base64
 import click
+import io
 import requests
 import json
+import itertools
 import os
+import shlex
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from app.cli.task_cache import TaskCache, cache_path
 
-API_URL = "http://127.0.0.1:5000"     
+API_URL = os.environ.get("TASKFLOW_API_URL", "http://127.0.0.1:5000")
 TOKEN_FILE = "token.txt"               
+REFRESH_TOKEN_FILE = "refresh_token.txt"
+
+# ---- HTTP SESSION ----
+# One pooled keep-alive session for every call: connections are reused instead
+# of a new TCP connection per request. Every request is retried with backoff
+# when the connection could not be made (nothing was sent); reads are also
+# retried on 502/503/504 (honouring Retry-After). Writes are not: behind a
+# proxy, a 502/504 can come after the server already applied the PUT/DELETE.
+
+MAX_WORKERS = 8            # upper bound for the concurrent commands (list --all, bulk-delete)
+
+_session = None
+_session_lock = threading.Lock()
+_refresh_lock = threading.Lock()
+
+def get_session():
+    """The shared requests.Session, created on first use."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            retry = Retry(
+                total=3,
+                backoff_factor=0.3,
+                status_forcelist=(502, 503, 504),
+                allowed_methods=("GET", "HEAD", "OPTIONS"),
+                respect_retry_after_header=True,
+                raise_on_status=False
+            )
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=MAX_WORKERS, max_retries=retry)
+            _session = requests.Session()
+            _session.mount("http://", adapter)
+            _session.mount("https://", adapter)
+        return _session
+
+def run_ordered(fn, items, workers=4):
+    """
+    Yield fn(item) for every item, in order, running up to `workers` calls at a
+    time. Only a window of 2 x workers calls is in flight or buffered, so results
+    can be streamed out while later ones are still being fetched.
+    """
+    items = iter(items)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        window = deque()
+        for item in items:
+            window.append(pool.submit(fn, item))
+            if len(window) >= workers * 2:
+                yield window.popleft().result()
+        while window:
+            yield window.popleft().result()
 
 # ---- USER COMMANDS ----
 
-def save_token(token):
-    with open(TOKEN_FILE, "w") as f:
+# token file contents by path, re-read only when the file's mtime changes
+_tokens = {}
+
+def save_token(token, path=TOKEN_FILE):
+    with open(path, "w") as f:
         f.write(token)
+    _tokens[path] = (os.stat(path).st_mtime_ns, token)
+
+def load_token(path=TOKEN_FILE):
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    cached = _tokens.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    with open(path, "r") as f:
+        token = f.read().strip()
+    _tokens[path] = (mtime, token)
+    return token
+
+# ---- RESULT CACHE (shell mode) ----
+# Recent GET responses by URL. A repeated GET is sent with If-None-Match and a
+# 304 from the server hands back the stored response, so unchanged results cost
+# no query work on the server and no body on the wire. Disabled (None) in
+# one-shot mode, enabled by `shell`.
+
+_results = None
+_results_lock = threading.Lock()
+
+def enable_result_cache(size=128):
+    global _results
+    _results = OrderedDict() if size > 0 else None
+    enable_result_cache.size = size
+
+def _cached_get(session, url, headers, kwargs):
+    key = requests.Request("GET", url, params=kwargs.get("params")).prepare().url
+    with _results_lock:
+        cached = _results.get(key)
+    if cached is not None:
+        headers = {**headers, "If-None-Match": cached.headers["ETag"]}
+
+    response = session.request("get", url, headers=headers, **kwargs)
+    with _results_lock:
+        if response.status_code == 304 and cached is not None:
+            _results.move_to_end(key)
+            return cached
+        if response.status_code == 200 and "ETag" in response.headers:
+            _results[key] = response
+            _results.move_to_end(key)
+            while len(_results) > enable_result_cache.size:
+                _results.popitem(last=False)
+    return response
+
+def _send(session, method, url, headers, kwargs):
+    if (_results is not None and method.lower() == "get" and not kwargs.get("stream")
+            and "If-None-Match" not in headers):
+        return _cached_get(session, url, headers, kwargs)
+    return session.request(method, url, headers=headers, **kwargs)
+
+def refresh_access_token(expired_token=None):
+    """Trade the saved refresh token for a new access token (no password, no bcrypt on the server)."""
+    with _refresh_lock:
+        # another thread may have refreshed while this one waited
+        current = load_token()
+        if expired_token and current and current != expired_token:
+            return current
+
+        refresh_token = load_token(REFRESH_TOKEN_FILE)
+        if not refresh_token:
+            return None
+
+        res = get_session().post(f"{API_URL}/auth/refresh", headers={"Authorization": f"Bearer {refresh_token}"})
+        if res.status_code != 200:
+            return None
+
+        token = res.json()["access_token"]
+        save_token(token)
+        return token
+
+def auth_request(method, url, **kwargs):
+    """
+    Send a request with the saved access token. On 401 (expired token) refresh
+    the access token once and retry.
+    """
+    headers = dict(kwargs.pop("headers", {}))
+    access_token = load_token()
+    headers["Authorization"] = f"Bearer {access_token}"
+    session = get_session()
+    response = _send(session, method, url, headers, kwargs)
+
+    if response.status_code == 401:
+        token = refresh_access_token(expired_token=access_token)
+        if token:
+            body = kwargs.get("data")
+            if hasattr(body, "seek"):
+                body.seek(0)
+            headers["Authorization"] = f"Bearer {token}"
+            response.close()
+            response = _send(session, method, url, headers, kwargs)
+
+    return response
+
+# ---- LOCAL TASK CACHE ----
+# `sync` keeps a local copy of the user's tasks (app/cli/task_cache.py) that
+# the read commands answer from with --local, and create / update / delete
+# fall back to it when the server cannot be reached: the edit is applied
+# locally and queued, and the next `sync` pushes the queue before pulling.
+
+def token_identity(token):
+    """User id (JWT `sub`) of a saved access token, read without verifying it"""
+    try:
+        payload = token.split(".")[1]
+        return str(json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))["sub"])
+    except (AttributeError, IndexError, KeyError, TypeError, ValueError):
+        return None
 
-def load_token():
-    if not os.path.exists(TOKEN_FILE):
+def open_cache(create=False):
+    """Local cache of the logged-in user, or None (no token, or never synced unless `create`)"""
+    user_id = token_identity(load_token())
+    if user_id is None:
         return None
-    with open(TOKEN_FILE, "r") as f:
-        return f.read().strip()
+    path = cache_path(API_URL, user_id)
+    if not create and not os.path.exists(path):
+        return None
+    return TaskCache(path)
+
+def synced_cache():
+    """Local cache for a --local read; fails when there is nothing synced yet"""
+    cache = open_cache()
+    if cache is None or not cache.synced_at:
+        raise click.ClickException("No local task cache yet. Run `sync` first.")
+    return cache
+
+# responses that reject one queued edit for good; anything else (401, 403,
+# 429, 5xx) says nothing about the edit, so the push stops and keeps it
+REJECTED_STATUSES = (400, 404, 409, 422)
+
+def push_pending(cache):
+    """
+    Replay the queued offline edits in order. Edits the server rejects
+    (REJECTED_STATUSES) are reported and dropped, with the local row of a
+    rejected create; any other error or a connection error stops the push
+    with the rest of the queue kept.
+
+    Returns:
+        (pushed, failures, stopped) - stopped is the error that ended the push early, or None
+    """
+    pushed, failures = 0, []
+    for op_id, method, task_id, body in cache.pending():
+        if method != "post" and task_id < 0:
+            # edit of an offline-created task whose creation was rejected
+            failures.append(f"{method.upper()} task {task_id}: its offline creation was rejected")
+            cache.done(op_id)
+            continue
+
+        if method == "post":
+            response = auth_request("post", f"{API_URL}/user/tasks/", json=body)
+        else:
+            response = auth_request(method, f"{API_URL}/user/tasks/{task_id}", json=body)
+
+        if response.status_code < 300 or (method == "delete" and response.status_code == 404):
+            pushed += 1
+            result = response.json().get("data") if method != "delete" else None
+            if method == "post":
+                cache.assign_id(task_id, result)
+            elif isinstance(result, dict) and "task_id" in result:
+                cache.upsert(result)
+            cache.done(op_id)
+            continue
+
+        try:
+            error = response.json().get("error")
+        except ValueError:
+            error = response.text
+        if response.status_code not in REJECTED_STATUSES:
+            return pushed, failures, f"{response.status_code} {error}"
+        failures.append(f"{method.upper()} task {task_id}: {response.status_code} {error}")
+        if method == "post":
+            cache.delete(task_id)
+        cache.done(op_id)
+    return pushed, failures, None
+
+def pull_tasks(cache, full=False):
+    """
+    Bring the cache up to date from the change feed (GET /user/tasks/changes).
+    The first sync (or --full, or a cursor the server no longer accepts) reads
+    the whole feed into an empty table; later syncs only fetch what changed
+    after the stored cursor, so their cost follows the churn, not the task count.
+
+    Returns:
+        number of changes applied (0 when the cache was current)
+    """
+    url = f"{API_URL}/user/tasks/changes"
+    cursor = None if full or not cache.synced_at else cache.get_meta("changes_cursor")
+
+    def pages(since):
+        while True:
+            response = auth_request("get", url, params={"since": since} if since else None)
+            if response.status_code == 410 and since:
+                raise LookupError(response.json().get("error"))
+            if response.status_code != 200:
+                raise click.ClickException(f"Sync failed ({response.status_code}): {response.text}")
+            data = response.json()["data"]
+            yield data["changes"], data["next_cursor"]
+            if not data["has_more"]:
+                return
+            since = data["next_cursor"]
+
+    applied = 0
+    if cursor:
+        try:
+            for changes, next_cursor in pages(cursor):
+                cache.apply_changes(changes, next_cursor)
+                applied += len(changes)
+            cache.set_meta(synced_at=datetime.now().isoformat(timespec="seconds"))
+            return applied
+        except LookupError as e:
+            click.secho(f"{e} Downloading every task again.", fg="yellow")
+
+    last = {}
+
+    def tasks():
+        for changes, next_cursor in pages(None):
+            last["cursor"] = next_cursor
+            for change in changes:
+                if change["op"] == "upsert":
+                    yield change["task"]
+
+    applied = cache.replace_all(tasks())
+    cache.set_meta(changes_cursor=last["cursor"], synced_at=datetime.now().isoformat(timespec="seconds"))
+    return applied
+
+def save_offline(method, task_id=None, body=None):
+    """
+    Server unreachable: apply a task edit to the local cache and queue it for
+    the next `sync`. Returns False when there is no synced cache to fall back on.
+    """
+    cache = open_cache()
+    if cache is None or not cache.synced_at:
+        return False
+
+    if method == "post":
+        task_id = cache.next_local_id()
+        cache.upsert({**body, "task_id": task_id, "user_id": token_identity(load_token())})
+    elif method == "put":
+        cache.update(task_id, body)
+    else:
+        cache.delete(task_id)
+    cache.queue(method, task_id, body)
+
+    saved = f"saved locally as task {task_id}" if method == "post" else "saved locally"
+    click.secho(f"Server unreachable: {saved}, {cache.pending_count()} edit(s) will be pushed by the next `sync`.",
+                fg="yellow")
+    cache.close()
+    return True
+
+def cache_write(method, task_id, response):
+    """Mirror a successful online edit into the local cache, when there is one"""
+    if response.status_code >= 300:
+        return
+    cache = open_cache()
+    if cache is None:
+        return
+    if method == "delete":
+        cache.delete(task_id)
+    else:
+        try:
+            result = response.json().get("data")
+        except ValueError:
+            result = None
+        if isinstance(result, dict) and "task_id" in result:
+            cache.upsert(result)
+    cache.close()
 
 @click.group()
 def cli():
@@ -32,7 +358,7 @@ def cli():
 def signup(name, email, password):
     """Register a new user"""
     payload = {"name": name, "email": email, "password": password}
-    res = requests.post(f"{API_URL}/auth/signup", json=payload)
+    res = get_session().post(f"{API_URL}/auth/signup", json=payload)
 
     click.echo(res.json())
 
@@ -43,12 +369,14 @@ def signup(name, email, password):
 def login(email, password):
     """Login and save JWT token"""
     payload = {"email": email, "password": password}
-    res = requests.post(f"{API_URL}/auth/login", json=payload)
+    res = get_session().post(f"{API_URL}/auth/login", json=payload)
 
     data = res.json()
 
     if res.status_code == 200 and "access_token" in data:
         save_token(data["access_token"])
+        if "refresh_token" in data:
+            save_token(data["refresh_token"], REFRESH_TOKEN_FILE)
         click.echo("Login successful. Token saved.")
     else:
         click.echo(data)
@@ -61,8 +389,7 @@ def current_user():
     if not token:
         return click.echo(" You must login first")
 
-    headers = {"Authorization": f"Bearer {token}"}
-    res = requests.get(f"{API_URL}/auth/user", headers=headers)
+    res = auth_request("get", f"{API_URL}/auth/user")
 
     click.echo(res.json())
 
@@ -80,8 +407,7 @@ def update_user(name, password):
     if name: payload["name"] = name
     if password: payload["password"] = password
 
-    headers = {"Authorization": f"Bearer {token}"}
-    res = requests.put(f"{API_URL}/auth/user", json=payload, headers=headers)
+    res = auth_request("put", f"{API_URL}/auth/user", json=payload)
 
     click.echo(res.json())
 
@@ -105,7 +431,6 @@ def create_task(title, description, status, priority, due_date, start_date):
         return
 
     url = f"{API_URL}/user/tasks/"
-    headers = {"Authorization": f"Bearer {token}"}
 
     body = {
         "title": title,
@@ -116,13 +441,49 @@ def create_task(title, description, status, priority, due_date, start_date):
         "due_date": due_date
     }
 
-    response = requests.post(url, json=body, headers=headers)
+    try:
+        response = auth_request("post", url, json=body)
+    except requests.ConnectionError as e:
+        if not save_offline("post", body=body):
+            click.secho(f"Request failed: {str(e)}", fg="red")
+        return
+
+    cache_write("post", None, response)
     try:
         click.echo(json.dumps(response.json(), indent=2))
     except:
         click.echo(response.text)
 
 
+def show_result(message, result):
+    """Print a response message and its data (list, dict or scalar)."""
+    click.secho(f"\n {message}", fg="green")
+
+    if isinstance(result, list):
+        if len(result) == 0:
+            click.echo("No records found.")
+        else:
+            click.echo("\nResults:")
+            for item in result:
+                click.echo(f"  - {item}")
+
+    elif isinstance(result, dict):
+        click.echo("\nData:")
+        click.echo(json.dumps(result, indent=2))
+
+    else:
+        click.echo(result)
+
+
+def show_local(message, tasks, cache):
+    """Print tasks read from the local cache, with the time of the last sync."""
+    show_result(f"{message} (local cache, synced {cache.synced_at})", tasks)
+    pending = cache.pending_count()
+    if pending:
+        click.secho(f" {pending} offline edit(s) not pushed yet", fg="yellow")
+    cache.close()
+
+
 def make_request(endpoint, params=None):
     """Helper to send GET requests with auth token."""
     token = load_token()
@@ -130,31 +491,13 @@ def make_request(endpoint, params=None):
         click.secho("No token found. Please log in first.", fg="red")
         return None
 
-    headers = {"Authorization": f"Bearer {token}"}
 
     try:
-        response = requests.get(f"{API_URL}/user/tasks{endpoint}", headers=headers, params=params)
+        response = auth_request("get", f"{API_URL}/user/tasks{endpoint}", params=params)
         data = response.json()
 
         if response.status_code == 200:
-            click.secho(f"\n {data.get('message', 'Success')}", fg="green")
-
-            result = data.get("data", None)
-
-            if isinstance(result, list):
-                if len(result) == 0:
-                    click.echo("No records found.")
-                else:
-                    click.echo("\nResults:")
-                    for item in result:
-                        click.echo(f"  - {item}")
-
-            elif isinstance(result, dict):
-                click.echo("\nData:")
-                click.echo(json.dumps(result, indent=2))
-
-            else:
-                click.echo(result)
+            show_result(data.get('message', 'Success'), data.get("data", None))
 
         else:
             click.secho(f"\n Error {response.status_code}", fg="red")
@@ -172,17 +515,67 @@ def make_request(endpoint, params=None):
 @click.option("--priority", help="Filter by priority (e.g. HIGH, MEDIUM, LOW)")
 @click.option("--search", help="Search tasks by title")
 @click.option("--page", default=1, help="Page number for pagination")
-@click.option("--per-page", default=10, help="Items per page")
-def get_all(status, priority, search, page, per_page):
+@click.option("--per-page", type=int, default=None, help="Items per page (default 10, 100 with --all)")
+@click.option("--all", "fetch_all", is_flag=True, help="Fetch every page concurrently, one JSON task per line")
+@click.option("--workers", default=4, show_default=True, help="Concurrent page requests with --all")
+@click.option("--local", is_flag=True, help="Answer from the local cache (see `sync`)")
+def get_all(status, priority, search, page, per_page, fetch_all, workers, local):
     """Get all tasks for the logged-in user."""
     params = {
         "status": status,
         "priority": priority,
         "search": search,
         "page": page,
-        "per_page": per_page
+        "per_page": per_page or (100 if fetch_all else 10)
     }
-    make_request("/", params)
+    if local:
+        cache = synced_cache()
+        if fetch_all:
+            tasks, total = cache.list_tasks(status, priority, search)
+            for task in tasks:
+                click.echo(json.dumps(task))
+            click.secho(f"{total} tasks (local cache, synced {cache.synced_at})", fg="green", err=True)
+            cache.close()
+            return
+        tasks, total = cache.list_tasks(status, priority, search, page, params["per_page"])
+        show_local("Tasks fetched", {
+            "tasks": tasks,
+            "page": page,
+            "total_pages": -(-total // params["per_page"]),
+            "total_tasks": total
+        }, cache)
+        return
+
+    if not fetch_all:
+        make_request("/", params)
+        return
+
+    if not load_token():
+        click.secho("No token found. Please log in first.", fg="red")
+        return
+
+    url = f"{API_URL}/user/tasks/"
+
+    def fetch_page(number):
+        response = auth_request("get", url, params={**params, "page": number})
+        if response.status_code != 200:
+            raise click.ClickException(f"Page {number} failed ({response.status_code}): {response.text}")
+        return response.json()["data"]
+
+    # page 1 tells how many pages there are, the rest are fetched in parallel
+    # and written out in page order as soon as each one is next in line
+    first = fetch_page(1)
+    total_pages = first["total_pages"]
+    workers = max(1, min(workers, MAX_WORKERS))
+    pages = [first] if total_pages else []
+    pages = itertools.chain(pages, run_ordered(fetch_page, range(2, total_pages + 1), workers))
+
+    count = 0
+    for data in pages:
+        for task in data["tasks"]:
+            click.echo(json.dumps(task))
+            count += 1
+    click.secho(f"{count} tasks from {total_pages} pages", fg="green", err=True)
 
 
 # -------------------------------------------------------------------------
@@ -199,8 +592,13 @@ def get_one(task_id):
 # Get Overdue Tasks
 # -------------------------------------------------------------------------
 @cli.command()
-def overdue_tasks():
+@click.option("--local", is_flag=True, help="Answer from the local cache (see `sync`)")
+def overdue_tasks(local):
     """List overdue tasks."""
+    if local:
+        cache = synced_cache()
+        show_local("Overdue tasks fetched", cache.overdue(), cache)
+        return
     make_request("/overdue")
 
 
@@ -208,8 +606,13 @@ def overdue_tasks():
 # Get Today's Tasks
 # -------------------------------------------------------------------------
 @cli.command()
-def todays_tasks():
+@click.option("--local", is_flag=True, help="Answer from the local cache (see `sync`)")
+def todays_tasks(local):
     """List tasks due today."""
+    if local:
+        cache = synced_cache()
+        show_local("Today's tasks fetched", cache.due_today(), cache)
+        return
     make_request("/today")
 
 
@@ -237,10 +640,58 @@ def get_recent(limit):
 # Get Upcoming Tasks
 # -------------------------------------------------------------------------
 @cli.command("upcoming-tasks")
-def get_upcoming():
+@click.option("--local", is_flag=True, help="Answer from the local cache (see `sync`)")
+def get_upcoming(local):
     """List upcoming tasks."""
+    if local:
+        cache = synced_cache()
+        show_local("Upcoming tasks fetched", cache.upcoming(), cache)
+        return
     make_request("/upcoming")
 
+
+# -------------------------------------------------------------------------
+# Dashboard: today's tasks, overdue tasks and stats in one round trip
+# -------------------------------------------------------------------------
+DASHBOARD_SECTIONS = [
+    ("Today's tasks", "/user/tasks/today"),
+    ("Overdue tasks", "/user/tasks/overdue"),
+    ("Stats", "/user/tasks/stats"),
+]
+
+@cli.command()
+def dashboard():
+    """Show today's tasks, overdue tasks and stats (one POST /batch request)."""
+    if not load_token():
+        click.secho("No token found. Please log in first.", fg="red")
+        return
+
+    body = {"requests": [{"method": "GET", "path": path} for _, path in DASHBOARD_SECTIONS]}
+    try:
+        response = auth_request("post", f"{API_URL}/batch", json=body)
+        if response.status_code != 200:
+            click.secho(f"\n Error {response.status_code}", fg="red")
+            click.echo(response.text)
+            return
+
+        for (title, _), result in zip(DASHBOARD_SECTIONS, response.json()["data"]["responses"]):
+            click.secho(f"\n{title}", fg="cyan", bold=True)
+            if result["status"] != 200:
+                click.secho(f"  Error {result['status']}: {result.get('body')}", fg="red")
+                continue
+
+            data = result["body"].get("data")
+            if isinstance(data, list):
+                if not data:
+                    click.echo("  No records found.")
+                for item in data:
+                    click.echo(f"  - [{item['task_id']}] {item['title']} ({item['status']}, due {item['due_date']})")
+            else:
+                click.echo(json.dumps(data, indent=2))
+
+    except Exception as e:
+        click.secho(f"Request failed: {str(e)}", fg="red")
+
 # UPDATE TASK
 @cli.command()
 @click.argument("task_id", type=int)
@@ -257,7 +708,6 @@ def update_task(task_id, title, description, status, priority, due_date):
         return
 
     url = f"{API_URL}/user/tasks/{task_id}"
-    headers = {"Authorization": f"Bearer {token}"}
 
     body = {}
     if title:
@@ -275,7 +725,14 @@ def update_task(task_id, title, description, status, priority, due_date):
         click.echo("Nothing to update.")
         return
 
-    response = requests.put(url, json=body, headers=headers)
+    try:
+        response = auth_request("put", url, json=body)
+    except requests.ConnectionError as e:
+        if not save_offline("put", task_id, body):
+            click.secho(f"Request failed: {str(e)}", fg="red")
+        return
+
+    cache_write("put", task_id, response)
     try:
         click.echo(json.dumps(response.json(), indent=2))
     except:
@@ -285,7 +742,8 @@ def update_task(task_id, title, description, status, priority, due_date):
 #  DELETE TASK
 @cli.command()
 @click.argument("task_id", type=int)
-def delete_task(task_id):
+@click.option("--yes", "-y", is_flag=True, help="Delete without asking for confirmation")
+def delete_task(task_id, yes):
     """Delete a task by ID"""
     token = load_token()
     if not token:
@@ -293,14 +751,90 @@ def delete_task(task_id):
         return
 
     url = f"{API_URL}/user/tasks/{task_id}"
-    headers = {"Authorization": f"Bearer {token}"}
 
-    confirm = click.confirm(f"Are you sure you want to delete task {task_id}?", default=False)
+    confirm = yes or click.confirm(f"Are you sure you want to delete task {task_id}?", default=False)
     if not confirm:
         click.echo("Cancelled.")
         return
 
-    response = requests.delete(url, headers=headers)
+    try:
+        response = auth_request("delete", url)
+    except requests.ConnectionError as e:
+        if not save_offline("delete", task_id):
+            click.secho(f"Request failed: {str(e)}", fg="red")
+        return
+
+    cache_write("delete", task_id, response)
+    try:
+        click.echo(json.dumps(response.json(), indent=2))
+    except:
+        click.echo(response.text)
+
+
+# EXPORT TASKS
+@cli.command("export")
+@click.option("--format", "export_format", type=click.Choice(["ndjson", "csv"]), default="ndjson", help="Output format")
+@click.option("--output", "-o", required=True, type=click.Path(dir_okay=False, writable=True), help="File to write")
+@click.option("--status", help="Filter by status")
+@click.option("--priority", help="Filter by priority")
+@click.option("--search", help="Filter by title")
+@click.option("--due-after", help="Only tasks due after this date (YYYY-MM-DD)")
+@click.option("--due-before", help="Only tasks due before this date (YYYY-MM-DD)")
+def export_tasks(export_format, output, status, priority, search, due_after, due_before):
+    """Export tasks to a file, streamed straight to disk"""
+    token = load_token()
+    if not token:
+        click.echo("Login required.")
+        return
+
+    url = f"{API_URL}/user/tasks/export"
+    params = {
+        "format": export_format,
+        "status": status,
+        "priority": priority,
+        "search": search,
+        "due_after": due_after,
+        "due_before": due_before
+    }
+
+    with auth_request("get", url, params=params, stream=True) as response:
+        if response.status_code != 200:
+            click.secho(f"Error {response.status_code}", fg="red")
+            click.echo(response.text)
+            return
+
+        written = 0
+        with open(output, "wb") as f:
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                f.write(chunk)
+                written += len(chunk)
+
+    click.secho(f"Exported {written} bytes to {output}", fg="green")
+
+
+# IMPORT TASKS
+@cli.command("import")
+@click.argument("file", type=click.Path(exists=True, dir_okay=False))
+@click.option("--format", "import_format", type=click.Choice(["ndjson", "csv"]), help="File format (default: from the file extension)")
+@click.option("--resume-from", default=0, help="Skip lines already committed by an earlier import")
+def import_tasks(file, import_format, resume_from):
+    """Import tasks from an NDJSON or CSV file, streamed to the server"""
+    token = load_token()
+    if not token:
+        click.echo("Login required.")
+        return
+
+    if not import_format:
+        import_format = "csv" if file.lower().endswith(".csv") else "ndjson"
+
+    url = f"{API_URL}/user/tasks/import"
+    headers = {"Content-Type": "text/csv" if import_format == "csv" else "application/x-ndjson"}
+    params = {"format": import_format, "resume_from": resume_from}
+
+    # passing the open file lets requests stream it instead of reading it into memory
+    with open(file, "rb") as f:
+        response = auth_request("post", url, data=f, headers=headers, params=params)
+
     try:
         click.echo(json.dumps(response.json(), indent=2))
     except:
@@ -310,7 +844,10 @@ def delete_task(task_id):
 
 @cli.command("bulk-delete")
 @click.argument("ids", nargs=-1, type=int)
-def bulk_delete(ids):
+@click.option("--chunk-size", default=200, show_default=True, help="Task IDs per request")
+@click.option("--workers", default=4, show_default=True, help="Concurrent delete requests")
+@click.option("--yes", "-y", is_flag=True, help="Delete without asking for confirmation")
+def bulk_delete(ids, chunk_size, workers, yes):
     """Delete multiple tasks by IDs"""
     token = load_token()
     if not token:
@@ -321,21 +858,285 @@ def bulk_delete(ids):
         click.echo("No task IDs provided.")
         return
 
-    # Convert IDs to comma separated string
-    ids_str = ",".join(map(str, ids))
-    url = f"{API_URL}/user/tasks/bulk_delete?task_ids={ids_str}"
-    headers = {"Authorization": f"Bearer {token}"}
+    ids = list(dict.fromkeys(ids))
+    if len(ids) > 10:
+        summary = f"{len(ids)} tasks ({ids[0]} ... {ids[-1]})"
+    else:
+        summary = f"tasks {','.join(map(str, ids))}"
 
-    confirm = click.confirm(f"Are you sure you want to delete tasks {ids_str}?", default=False)
+    confirm = yes or click.confirm(f"Are you sure you want to delete {summary}?", default=False)
     if not confirm:
         click.echo("Cancelled.")
         return
 
-    response = requests.delete(url, headers=headers)
+    # one request per chunk of IDs, several chunks in flight at once
+    url = f"{API_URL}/user/tasks/bulk_delete"
+    chunk_size = max(1, chunk_size)
+    chunks = [ids[i:i + chunk_size] for i in range(0, len(ids), chunk_size)]
+
+    def delete_chunk(chunk):
+        response = auth_request("delete", url, json={"task_ids": chunk})
+        try:
+            return response.status_code, response.json()
+        except ValueError:
+            return response.status_code, {"error": response.text}
+
+    deleted = 0
+    failures = []
+    workers = max(1, min(workers, MAX_WORKERS))
+    for chunk, (status_code, body) in zip(chunks, run_ordered(delete_chunk, chunks, workers)):
+        if status_code == 200:
+            deleted += body["data"]["deleted"]
+        elif status_code != 404:    # 404: none of the chunk's tasks exist (any more)
+            failures.append(f"{chunk[0]}..{chunk[-1]}: {status_code} {body.get('error') or body.get('msg')}")
+
+    click.secho(f"Deleted {deleted} of {len(ids)} tasks in {len(chunks)} requests",
+                fg="green" if not failures else "yellow")
+    for failure in failures:
+        click.secho(f"  failed chunk {failure}", fg="red")
+
+
+# -------------------------------------------------------------------------
+# Local Cache Sync
+# -------------------------------------------------------------------------
+@cli.command()
+@click.option("--full", is_flag=True, help="Download every task again even if nothing changed")
+def sync(full):
+    """Push offline edits, then bring the local task cache up to date."""
+    if not load_token():
+        click.echo("Login required.")
+        return
+
+    cache = open_cache(create=True)
     try:
-        click.echo(json.dumps(response.json(), indent=2))
-    except:
-        click.echo(response.text)
+        pushed, failures, stopped = push_pending(cache)
+        if pushed or failures:
+            click.echo(f"Pushed {pushed} offline edit(s)")
+        for failure in failures:
+            click.secho(f"  rejected {failure}", fg="red")
+        if stopped:
+            click.secho(f"Sync stopped ({stopped}), {cache.pending_count()} offline edit(s) still queued.", fg="red")
+            return
+
+        start = time.perf_counter()
+        count = pull_tasks(cache, full=full)
+        elapsed = (time.perf_counter() - start) * 1000
+        if count:
+            click.secho(f"Synced {count} changes into {cache.path} ({elapsed:.0f} ms)", fg="green")
+        else:
+            click.secho(f"Local cache is up to date ({elapsed:.0f} ms)", fg="green")
+    except requests.ConnectionError as e:
+        click.secho(f"Server unreachable, {cache.pending_count()} offline edit(s) still queued: {str(e)}", fg="red")
+    finally:
+        cache.close()
+
+
+# -------------------------------------------------------------------------
+# Live Task Events
+# -------------------------------------------------------------------------
+WATCH_READ_TIMEOUT = 60    # seconds without a byte (the server sends heartbeats) before reconnecting
+
+def read_events(response):
+    """Parse a text/event-stream response into (event, id, data) tuples; comment lines are skipped."""
+    event, event_id, data = None, None, []
+    for line in response.iter_lines(decode_unicode=True):
+        if line:
+            if line.startswith(":"):
+                continue
+            field, _, value = line.partition(":")
+            value = value[1:] if value.startswith(" ") else value
+            if field == "event":
+                event = value
+            elif field == "id":
+                event_id = value
+            elif field == "data":
+                data.append(value)
+            elif field == "retry" and value.isdigit():
+                yield "retry", None, int(value)
+            continue
+        if data:
+            yield event or "message", event_id, json.loads("\n".join(data))
+        event, event_id, data = None, None, []
+
+def show_event(event, data):
+    """One line per task event, colored by kind."""
+    stamp = datetime.now().strftime("%H:%M:%S")
+    if event in ("task.created", "task.updated"):
+        task = data["task"]
+        details = ", ".join(str(v) for v in (task.get("status"), task.get("priority")) if v)
+        if task.get("due_date"):
+            details += f", due {task['due_date']}"
+        kind, color = ("+ created", "green") if event == "task.created" else ("~ updated", "yellow")
+        click.secho(f"{stamp}  {kind}  #{data['task_id']} {task.get('title')!r} [{details}]", fg=color)
+    elif event == "task.deleted":
+        click.secho(f"{stamp}  - deleted  #{data['task_id']}", fg="red")
+    elif event == "stats":
+        delta = data.get("delta", {})
+        statuses = sorted((set(data["status_counts"]) | set(delta)) - {"overdue_count"})
+        counts = [f"{status} {data['status_counts'].get(status, 0)}" + (f" ({delta[status]:+d})" if status in delta else "")
+                  for status in statuses]
+        overdue = f"overdue {data['overdue_count']}"
+        if "overdue_count" in delta:
+            overdue += f" ({delta['overdue_count']:+d})"
+        click.echo(f"{stamp}    stats: {', '.join(counts + [overdue])}")
+
+@cli.command()
+@click.option("--json", "as_json", is_flag=True, help="Print every event as one JSON line")
+@click.option("--sync", "keep_synced", is_flag=True, help="Apply the events to the local task cache (see `sync`)")
+def watch(as_json, keep_synced):
+    """Print task changes as they happen (server-sent events, no polling)."""
+    if not load_token():
+        click.echo("Login required.")
+        return
+
+    cache = None
+    last_id = None
+    if keep_synced:
+        # resume right after the last sync: what changed since is replayed first
+        cache = open_cache(create=True)
+        if not cache.synced_at:
+            pull_tasks(cache)
+        last_id = cache.get_meta("changes_cursor")
+
+    url = f"{API_URL}/user/tasks/events"
+    retry = 3.0
+    connected = False
+    try:
+        while True:
+            headers = {"Accept": "text/event-stream"}
+            if last_id:
+                headers["Last-Event-ID"] = last_id
+            try:
+                with auth_request("get", url, headers=headers, stream=True,
+                                  timeout=(10, WATCH_READ_TIMEOUT)) as response:
+                    if response.status_code == 400 and last_id:
+                        click.secho("Saved position not accepted, watching from now on.", fg="yellow")
+                        last_id = None
+                        continue
+                    if response.status_code != 200:
+                        raise click.ClickException(f"Cannot watch tasks ({response.status_code}): {response.text}")
+
+                    for event, event_id, data in read_events(response):
+                        if event == "retry":
+                            retry = data / 1000
+                            continue
+                        if event_id:
+                            last_id = event_id
+
+                        if event == "ready" and not as_json:
+                            click.secho("Reconnected." if connected else "Watching task changes (Ctrl+C to stop)...",
+                                        fg="cyan", err=True)
+                        connected = True
+                        if event == "token-expired":
+                            break    # reconnect: auth_request refreshes the access token
+                        if as_json:
+                            click.echo(json.dumps({"event": event, "id": event_id, "data": data}))
+                        else:
+                            show_event(event, data)
+
+                        if cache is not None:
+                            if event == "reset":
+                                click.secho("Change history was pruned, downloading every task again.", fg="yellow", err=True)
+                                pull_tasks(cache, full=True)
+                            elif event == "task.deleted":
+                                cache.apply_changes([{"op": "delete", "task_id": data["task_id"]}], last_id)
+                            elif event in ("task.created", "task.updated"):
+                                cache.apply_changes([{"op": "upsert", "task": data["task"]}], last_id)
+                            elif event in ("ready", "stats"):
+                                cache.set_meta(changes_cursor=last_id,
+                                               synced_at=datetime.now().isoformat(timespec="seconds"))
+                    else:
+                        click.secho(f"Stream closed by the server, reconnecting in {retry:.0f}s", fg="yellow", err=True)
+                        time.sleep(retry)
+            except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError) as e:
+                click.secho(f"Connection lost ({e.__class__.__name__}), reconnecting in {retry:.0f}s", fg="yellow", err=True)
+                time.sleep(retry)
+    except KeyboardInterrupt:
+        click.echo("Stopped.", err=True)
+    finally:
+        if cache is not None:
+            cache.close()
+
+
+# -------------------------------------------------------------------------
+# Interactive Shell
+# -------------------------------------------------------------------------
+@cli.command()
+@click.option("--timing", is_flag=True, help="Print the wall time of every command (stderr)")
+@click.option("--cache-size", default=128, show_default=True, help="Recent GET results kept for ETag revalidation")
+def shell(timing, cache_size):
+    """Run CLI commands from a prompt, or a script on stdin, in one process."""
+    interactive = sys.stdin.isatty()
+    if interactive:
+        try:
+            import readline  # noqa: F401  (line editing and history for input())
+        except ImportError:
+            pass
+        click.echo("TaskFlow shell. Type a command (e.g. list --status PENDING), 'help' or 'exit'.")
+
+    # the process, the HTTP session and the token stay warm between commands
+    enable_result_cache(cache_size)
+    get_session()
+    load_token()
+
+    times = []
+    while True:
+        try:
+            line = input("taskflow> ") if interactive else sys.stdin.readline()
+        except EOFError:
+            break
+        except KeyboardInterrupt:
+            click.echo()
+            continue
+        if not interactive and not line:
+            break
+
+        try:
+            args = shlex.split(line, comments=True)
+        except ValueError as e:
+            click.secho(f"Invalid command: {e}", fg="red")
+            continue
+        if not args:
+            continue
+        if args[0] in ("exit", "quit"):
+            break
+        if args[0] == "help":
+            args = args[1:] + ["--help"]
+        if args[0] == "shell":
+            click.echo("Already in the shell.")
+            continue
+
+        start = time.perf_counter()
+        # in a script, stdin holds the next commands: a prompt (create-task without
+        # --title, a delete confirmation) must not read them, so it gets no input and aborts
+        stdin = sys.stdin
+        if not interactive:
+            sys.stdin = io.StringIO()
+        try:
+            cli.main(args, prog_name="taskflow", standalone_mode=False)
+        except click.exceptions.Abort:
+            if interactive:
+                click.echo("Aborted.")
+            else:
+                click.echo()    # end the unanswered prompt's line
+                click.secho(f"Aborted: `{line.strip()}` asks for input, which a script cannot give. "
+                            "Pass every value as an option (--title, --description, --yes).", fg="red")
+        except click.ClickException as e:
+            e.show()
+        except requests.RequestException as e:
+            click.secho(f"Request failed: {str(e)}", fg="red")
+        except KeyboardInterrupt:
+            click.echo("Interrupted.")
+        finally:
+            sys.stdin = stdin
+        elapsed = time.perf_counter() - start
+        times.append(elapsed)
+        if timing:
+            click.echo(f"({elapsed * 1000:.1f} ms) {line.strip()}", err=True)
+
+    if timing and times:
+        click.echo(f"{len(times)} commands, {sum(times) * 1000 / len(times):.1f} ms average", err=True)
+
 
 if __name__ == "_main_":
     cli()
\ No newline at end of file
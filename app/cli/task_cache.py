@@ -0,0 +1,225 @@
+import hashlib
+import json
+import os
+import sqlite3
+from datetime import date, datetime, timezone
+
+# Local task cache of the CLI.
+#
+# One SQLite file per (server, user) under the user's config directory holds
+# a copy of the user's tasks, the sync state (meta) and the edits made while
+# the server was unreachable (pending_ops, pushed in order by `sync`).
+# Rows keep the API's JSON shape: dates as ISO strings, enums as their names,
+# so filters and sorting work on the plain column values.
+
+CLOSED_STATUSES = ("COMPLETED", "CANCELLED")
+TASK_FIELDS = ("task_id", "title", "description", "start_date", "due_date", "priority", "status", "user_id")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    task_id     INTEGER PRIMARY KEY,
+    title       TEXT NOT NULL,
+    description TEXT,
+    start_date  TEXT,
+    due_date    TEXT,
+    priority    TEXT,
+    status      TEXT,
+    user_id     INTEGER
+);
+CREATE INDEX IF NOT EXISTS ix_tasks_due_date ON tasks (due_date);
+CREATE INDEX IF NOT EXISTS ix_tasks_status_due_date ON tasks (status, due_date);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS pending_ops (
+    op_id      INTEGER PRIMARY KEY AUTOINCREMENT,
+    method     TEXT NOT NULL,
+    task_id    INTEGER,
+    body       TEXT,
+    created_at TEXT NOT NULL
+);
+"""
+
+
+def config_dir():
+    """TASKFLOW_CONFIG_DIR, else the platform's per-user config directory + /taskflow"""
+    if os.environ.get("TASKFLOW_CONFIG_DIR"):
+        return os.environ["TASKFLOW_CONFIG_DIR"]
+    if os.name == "nt" and os.environ.get("APPDATA"):
+        return os.path.join(os.environ["APPDATA"], "taskflow")
+    base = os.environ.get("XDG_CONFIG_HOME") or os.path.join(os.path.expanduser("~"), ".config")
+    return os.path.join(base, "taskflow")
+
+
+def cache_path(server, user_id):
+    """Cache file of one user on one server"""
+    key = hashlib.sha1(f"{server}|{user_id}".encode("utf-8")).hexdigest()[:16]
+    return os.path.join(config_dir(), f"cache-{key}.db")
+
+
+def _to_dict(row, today):
+    task = dict(zip(TASK_FIELDS, row))
+    task["is_overdue"] = (task["due_date"] is not None and task["status"] not in CLOSED_STATUSES
+                          and task["due_date"] < today)
+    return dict(sorted(task.items()))
+
+
+class TaskCache:
+    """The local copy of one user's tasks"""
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    # ---- sync state ----
+
+    def get_meta(self, key, default=None):
+        row = self.db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, **values):
+        with self.db:
+            self.db.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                                [(key, None if value is None else str(value)) for key, value in values.items()])
+
+    @property
+    def synced_at(self):
+        return self.get_meta("synced_at")
+
+    # ---- task rows ----
+
+    def replace_all(self, tasks):
+        """Swap the whole task table for `tasks` (iterable of API task dicts) in one transaction"""
+        count = 0
+        with self.db:
+            self.db.execute("DELETE FROM tasks")
+            for task in tasks:
+                self.db.execute(f"INSERT INTO tasks VALUES ({', '.join('?' * len(TASK_FIELDS))})",
+                                [task.get(field) for field in TASK_FIELDS])
+                count += 1
+        return count
+
+    def apply_changes(self, changes, cursor):
+        """Apply one page of the server's change feed and store its cursor, in one transaction"""
+        with self.db:
+            for change in changes:
+                if change["op"] == "upsert":
+                    self.db.execute(f"INSERT OR REPLACE INTO tasks VALUES ({', '.join('?' * len(TASK_FIELDS))})",
+                                    [change["task"].get(field) for field in TASK_FIELDS])
+                else:
+                    self.db.execute("DELETE FROM tasks WHERE task_id = ?", (change["task_id"],))
+            self.db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('changes_cursor', ?)", (cursor,))
+
+    def upsert(self, task):
+        with self.db:
+            self.db.execute(f"INSERT OR REPLACE INTO tasks VALUES ({', '.join('?' * len(TASK_FIELDS))})",
+                            [task.get(field) for field in TASK_FIELDS])
+
+    def update(self, task_id, fields):
+        columns = [field for field in fields if field in TASK_FIELDS and field != "task_id"]
+        if not columns:
+            return
+        with self.db:
+            self.db.execute(f"UPDATE tasks SET {', '.join(f'{c} = ?' for c in columns)} WHERE task_id = ?",
+                            [fields[c] for c in columns] + [task_id])
+
+    def delete(self, task_id):
+        with self.db:
+            self.db.execute("DELETE FROM tasks WHERE task_id = ?", (task_id,))
+
+    def get(self, task_id, today=None):
+        row = self.db.execute(f"SELECT {', '.join(TASK_FIELDS)} FROM tasks WHERE task_id = ?", (task_id,)).fetchone()
+        return _to_dict(row, (today or date.today()).isoformat()) if row else None
+
+    # ---- queries (same filters and order as the API) ----
+
+    def _select(self, where, params, order, limit=None, offset=0, today=None):
+        sql = f"SELECT {', '.join(TASK_FIELDS)} FROM tasks"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY {order}"
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params = list(params) + [limit, offset]
+        today = (today or date.today()).isoformat()
+        return [_to_dict(row, today) for row in self.db.execute(sql, params)]
+
+    def list_tasks(self, status=None, priority=None, search=None, page=1, per_page=None, today=None):
+        """
+        Tasks filtered like GET /user/tasks/, dated tasks first by due date.
+
+        Returns:
+            (tasks, total) - one page when per_page is set, else every match
+        """
+        where, params = [], []
+        if status:
+            where.append("status = ?")
+            params.append(status.upper())
+        if priority:
+            where.append("priority = ?")
+            params.append(priority.upper())
+        if search:
+            where.append("title LIKE ?")
+            params.append(f"%{search}%")
+
+        count_sql = "SELECT COUNT(*) FROM tasks" + (" WHERE " + " AND ".join(where) if where else "")
+        total = self.db.execute(count_sql, params).fetchone()[0]
+        order = "due_date IS NULL, due_date, task_id"
+        if per_page is None:
+            return self._select(where, params, order, today=today), total
+        page = max(page, 1)
+        return self._select(where, params, order, per_page, (page - 1) * per_page, today=today), total
+
+    def overdue(self, today=None):
+        today = today or date.today()
+        return self._select(["due_date IS NOT NULL", "due_date < ?", "status NOT IN ('COMPLETED', 'CANCELLED')"],
+                            [today.isoformat()], "due_date, task_id", today=today)
+
+    def due_today(self, today=None):
+        today = today or date.today()
+        return self._select(["due_date = ?"], [today.isoformat()], "task_id", today=today)
+
+    def upcoming(self, today=None):
+        today = today or date.today()
+        return self._select(["due_date > ?"], [today.isoformat()], "due_date, task_id", today=today)
+
+    # ---- offline edits ----
+
+    def next_local_id(self):
+        """Temporary (negative) id for a task created offline"""
+        lowest = self.db.execute("SELECT MIN(task_id) FROM tasks").fetchone()[0]
+        return min(lowest or 0, 0) - 1
+
+    def queue(self, method, task_id, body=None):
+        with self.db:
+            self.db.execute(
+                "INSERT INTO pending_ops (method, task_id, body, created_at) VALUES (?, ?, ?, ?)",
+                (method, task_id, json.dumps(body) if body is not None else None,
+                 datetime.now(timezone.utc).isoformat(timespec="seconds"))
+            )
+
+    def pending(self):
+        """Queued edits in the order they were made: [(op_id, method, task_id, body)]"""
+        return [(op_id, method, task_id, json.loads(body) if body else None)
+                for op_id, method, task_id, body
+                in self.db.execute("SELECT op_id, method, task_id, body FROM pending_ops ORDER BY op_id")]
+
+    def pending_count(self):
+        return self.db.execute("SELECT COUNT(*) FROM pending_ops").fetchone()[0]
+
+    def done(self, op_id):
+        with self.db:
+            self.db.execute("DELETE FROM pending_ops WHERE op_id = ?", (op_id,))
+
+    def assign_id(self, local_id, task):
+        """An offline-created task got its server id: move the row and the queued edits over"""
+        with self.db:
+            self.db.execute("DELETE FROM tasks WHERE task_id = ?", (local_id,))
+            self.db.execute("UPDATE pending_ops SET task_id = ? WHERE task_id = ?", (task["task_id"], local_id))
+        self.upsert(task)
@@ -0,0 +1,151 @@
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import event, func
+from datetime import date, datetime, timedelta, timezone
+from app import db
+from app.models import TaskStats, TaskDueCount, RevokedToken
+from app.utils import task_queries, task_counters, task_search, task_versions, task_changes
+
+# Server-side maintenance commands, available through the `flask` CLI
+# (FLASK_APP=run.py). The client-side `taskflow` tool lives in app/cli.
+
+tasks_cli = AppGroup('tasks', help='Task table maintenance commands.')
+auth_cli = AppGroup('auth', help='Authentication maintenance commands.')
+
+
+def register_commands(app):
+    app.cli.add_command(tasks_cli)
+    app.cli.add_command(auth_cli)
+
+
+def _explain_prefix(dialect_name):
+    if dialect_name == 'sqlite':
+        return 'EXPLAIN QUERY PLAN '
+    return 'EXPLAIN '
+
+
+def explain_query(query):
+    """
+    Run `query` once while capturing the exact SQL + parameters the driver
+    receives, then return the database's plan for that statement.
+    """
+    engine = db.session.get_bind()
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    event.listen(engine, 'before_cursor_execute', capture)
+    try:
+        query.all()
+    finally:
+        event.remove(engine, 'before_cursor_execute', capture)
+
+    statement, parameters = captured[-1]
+    prefix = _explain_prefix(engine.dialect.name)
+    rows = db.session.connection().exec_driver_sql(prefix + statement, parameters).all()
+    return [row[-1] for row in rows]
+
+
+def primary_key(table):
+    """Plan markers of a lookup by `table`'s primary key (SQLite rowid / autoindex, PostgreSQL pkey)"""
+    return (f'{table} USING INTEGER PRIMARY KEY', f'sqlite_autoindex_{table}_', f'{table}_pkey')
+
+
+def route_queries(user_id, today):
+    """The query issued by each task read route and the index it must use, keyed by route"""
+    return {
+        'GET /': (task_queries.filter_tasks(user_id).order_by(task_queries.Task.due_date.asc()),
+                  ('ix_tasks_user_due_date',)),
+        'GET /?status=': (task_queries.filter_tasks(user_id, status='PENDING').order_by(task_queries.Task.due_date.asc()),
+                          ('ix_tasks_user_status_due_date',)),
+        'GET /<id>': (task_queries.Task.query.filter_by(task_id=1, user_id=user_id), primary_key('tasks')),
+        'GET /overdue': (task_queries.overdue_tasks(user_id, today), ('ix_tasks_user_open_due_date',)),
+        'GET /today': (task_queries.today_tasks(user_id, today), ('ix_tasks_user_due_date',)),
+        'GET /upcoming': (task_queries.upcoming_tasks(user_id, today), ('ix_tasks_user_due_date',)),
+        'GET /recent': (task_queries.recent_tasks(user_id, 5), ('ix_tasks_user_task_id_desc',)),
+        'GET /stats (task_stats row)': (TaskStats.query.filter_by(user_id=user_id), primary_key('task_stats')),
+        'GET /stats (overdue buckets)': (db.session.query(func.sum(TaskDueCount.open_count)).filter(
+            TaskDueCount.user_id == user_id, TaskDueCount.due_date < today
+        ), primary_key('task_due_counts')),
+        'GET /changes (tasks)': (task_changes.changed_tasks(user_id, 1, 0).limit(501),
+                                 ('ix_tasks_user_change_seq',)),
+        'GET /changes (tombstones)': (task_changes.deleted_tasks(user_id, 1, 0).limit(501),
+                                      ('ix_task_tombstones_user_change_seq',)),
+    }
+
+
+@tasks_cli.command('explain')
+@click.option('--user-id', default=1, show_default=True, help='user_id to plan the queries for')
+def explain_command(user_id):
+    """Show the query plan of every task route query and check it uses the index meant for it."""
+    failures = 0
+    for route, (query, expected) in route_queries(user_id, date.today()).items():
+        plan = explain_query(query)
+        uses_index = any(marker in line for line in plan for marker in expected)
+        failures += not uses_index
+        if uses_index:
+            click.secho(f"{route}: index", fg='green')
+        else:
+            click.secho(f"{route}: NOT USING {expected[0]}", fg='red')
+        for line in plan:
+            click.echo(f"    {line}")
+
+    if failures:
+        current_app.logger.warning("%d task route queries do not use their index", failures)
+        raise SystemExit(1)
+
+
+@tasks_cli.command('stats-rebuild')
+@click.option('--user-id', type=int, default=None, help='Only this user (default: everyone)')
+@click.option('--verify', is_flag=True, help='Only report drift, do not rewrite the counters')
+def stats_rebuild_command(user_id, verify):
+    """Recompute the task_stats / task_due_counts counters from tasks."""
+    drift = task_counters.counter_drift(user_id)
+    for key, stored, expected in drift:
+        click.secho(f"drift {key}: stored={stored} expected={expected}", fg='yellow')
+
+    if verify:
+        click.echo(f"{len(drift)} counters out of step")
+        if drift:
+            raise SystemExit(1)
+        return
+
+    task_counters.rebuild_counters(user_id)
+    # corrected counters change /stats output, so invalidate those users' ETags
+    task_versions.bump_versions({key[0] if isinstance(key, tuple) else key for key, _, _ in drift})
+    db.session.commit()
+    click.secho(f"Counters rebuilt ({len(drift)} corrected)", fg='green')
+
+
+@tasks_cli.command('search-setup')
+def search_setup_command():
+    """Create (if missing) and rebuild the full-text search index for tasks."""
+    with db.engine.begin() as connection:
+        if not task_search.setup_search(connection):
+            click.secho(f"No full-text index for {connection.dialect.name}; search falls back to LIKE", fg='yellow')
+            return
+        task_search.rebuild_search_index(connection)
+    click.secho("Task search index ready", fg='green')
+
+
+@tasks_cli.command('prune-tombstones')
+@click.option('--days', type=int, default=None, help='Keep deletes this many days (default: TOMBSTONE_RETENTION_DAYS)')
+def prune_tombstones_command(days):
+    """Drop change feed tombstones older than the retention period."""
+    if days is None:
+        days = current_app.config['TOMBSTONE_RETENTION_DAYS']
+    before = task_changes.utcnow() - timedelta(days=days)
+    pruned = task_changes.prune_tombstones(before)
+    db.session.commit()
+    click.echo(f"Pruned {pruned} tombstones older than {days} days")
+
+
+@auth_cli.command('purge-revoked-tokens')
+def purge_revoked_tokens_command():
+    """Drop revoked refresh tokens that have expired anyway."""
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    purged = RevokedToken.query.filter(RevokedToken.expires_at < now).delete(synchronize_session=False)
+    db.session.commit()
+    click.echo(f"Purged {purged} expired revoked tokens")
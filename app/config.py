@@ -1,9 +1,64 @@
 import os
 from dotenv import load_dotenv
+from app.database import engine_options, replica_bind, sqlite_busy_timeout, REPLICA_BIND
 
 load_dotenv()
 
 class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
-    JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY','secret-key')
\ No newline at end of file
+    # pool sizing / timeouts per backend, overridable with DB_* env variables (see app/database.py)
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
+
+    # Optional read replica for the read-only task endpoints (see app/utils/replica.py)
+    REPLICA_DATABASE_URL = os.getenv('REPLICA_DATABASE_URL')
+    SQLALCHEMY_BINDS = {REPLICA_BIND: replica_bind(REPLICA_DATABASE_URL)} if REPLICA_DATABASE_URL else {}
+    REPLICA_READ_YOUR_WRITES = int(os.getenv('REPLICA_READ_YOUR_WRITES', 5))   # seconds on the primary after a write
+    REPLICA_HEALTH_INTERVAL = int(os.getenv('REPLICA_HEALTH_INTERVAL', 10))    # seconds between replica checks
+
+    # GET /health/db shows pool / replica / write queue details only with this X-Health-Token (unset: never)
+    HEALTH_TOKEN = os.getenv('HEALTH_TOKEN')
+
+    # asgi.py: threads running the Flask (sync) part of the API next to the async task reads
+    ASGI_WSGI_THREADS = int(os.getenv('ASGI_WSGI_THREADS', 10))
+    JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY','secret-key')
+
+    # SQLite connection PRAGMAs (file databases only, see app/database.py)
+    SQLITE_JOURNAL_MODE = os.getenv('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_BUSY_TIMEOUT = sqlite_busy_timeout()   # ms, falls back to DB_STATEMENT_TIMEOUT (app/database.py)
+    SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))  # bytes, 0 = off
+    SQLITE_CACHE_SIZE = int(os.getenv('SQLITE_CACHE_SIZE', -64000))          # pages, negative = KiB
+    # Serialize write transactions of this process through one FIFO queue (SQLite only)
+    SQLITE_WRITE_QUEUE = os.getenv('SQLITE_WRITE_QUEUE', '0').lower() in ('1', 'true', 'yes', 'on')
+    SQLITE_WRITE_TIMEOUT = int(os.getenv('SQLITE_WRITE_TIMEOUT', 15))        # seconds waiting for the queue
+
+    # Password hashing: bcrypt cost, and the process pool it runs in
+    # (pool size 0 = hash inline on the request thread)
+    BCRYPT_LOG_ROUNDS = int(os.getenv('BCRYPT_LOG_ROUNDS', 12))
+    BCRYPT_POOL_SIZE = int(os.getenv('BCRYPT_POOL_SIZE', os.cpu_count() or 1))
+    BCRYPT_MAX_PENDING = int(os.getenv('BCRYPT_MAX_PENDING', 0))   # 0 = 4 x pool size
+
+    # Per-process cache of user profiles behind flask_jwt_extended's current_user
+    USER_CACHE_SIZE = int(os.getenv('USER_CACHE_SIZE', 10000))
+    USER_CACHE_TTL = int(os.getenv('USER_CACHE_TTL', 60))   # seconds
+
+    # Bulk task endpoints
+    BULK_MAX_TASKS = int(os.getenv('BULK_MAX_TASKS', 50000))
+    BULK_CHUNK_SIZE = int(os.getenv('BULK_CHUNK_SIZE', 500))
+    EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', 1000))
+    BATCH_MAX_REQUESTS = int(os.getenv('BATCH_MAX_REQUESTS', 50))   # sub-requests per POST /batch
+
+    # Change feed (GET /user/tasks/changes)
+    CHANGES_PAGE_SIZE = int(os.getenv('CHANGES_PAGE_SIZE', 500))
+    TOMBSTONE_RETENTION_DAYS = int(os.getenv('TOMBSTONE_RETENTION_DAYS', 30))   # `flask tasks prune-tombstones`
+
+    # Live task events (GET /user/tasks/events): local | poll | redis
+    EVENTS_BROKER = os.getenv('EVENTS_BROKER', 'local')
+    EVENTS_HEARTBEAT = int(os.getenv('EVENTS_HEARTBEAT', 15))           # seconds between keep-alive comments
+    EVENTS_POLL_INTERVAL = float(os.getenv('EVENTS_POLL_INTERVAL', 2))  # seconds, EVENTS_BROKER=poll
+    EVENTS_REDIS_URL = os.getenv('EVENTS_REDIS_URL', 'redis://localhost:6379/0')
+
+    # In-process cache of task read responses, keyed on (user, endpoint, args, data version).
+    # Number of entries; 0 disables it (ETag / 304 handling is always on)
+    RESPONSE_CACHE_SIZE = int(os.getenv('RESPONSE_CACHE_SIZE', 0))
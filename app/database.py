@@ -0,0 +1,306 @@
+import os
+import threading
+import time
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+
+# Engine / connection pool configuration.
+#
+# Config.SQLALCHEMY_ENGINE_OPTIONS is built here from environment variables,
+# on top of a per-backend profile:
+#
+#   DB_POOL_SIZE          connections kept open per process
+#   DB_MAX_OVERFLOW       extra connections allowed under burst
+#   DB_POOL_TIMEOUT       seconds to wait for a free connection before failing
+#   DB_POOL_RECYCLE       seconds after which a connection is replaced
+#   DB_POOL_PRE_PING      1/0, test connections on checkout (drops stale ones)
+#   DB_STATEMENT_TIMEOUT  milliseconds a single statement may run
+#                         (PostgreSQL statement_timeout, MySQL max_execution_time)
+#
+# SQLite has no statement timeout; its one wait setting is the busy timeout
+# (how long a connection waits for another writer's lock), see
+# sqlite_busy_timeout(). SQLITE_BUSY_TIMEOUT wins over DB_STATEMENT_TIMEOUT.
+#
+# Pools are MeteredQueuePool, which records how long each checkout waited
+# for a free connection (see pool_metrics / GET /health/db).
+#
+# File-backed SQLite databases additionally get the PRAGMAs of
+# sqlite_pragmas() on every new connection (WAL by default, see
+# init_sqlite_profile).
+#
+# With REPLICA_DATABASE_URL set, a `replica` bind is added and RoutingSession
+# sends SELECTs of sessions flagged with USE_REPLICA to it (see
+# app.utils.replica for when a request is flagged).
+
+REPLICA_BIND = 'replica'
+USE_REPLICA = 'use_replica'
+
+# session.info flag set by POST /batch with "atomic": true - commit() only
+# flushes, the batch commits (or rolls back) once at the end
+DEFER_COMMIT = 'defer_commit'
+
+# asyncio drivers for the async read path (app.routes.async_task_routes)
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+    'mysql': 'mysql+aiomysql',
+}
+
+
+class PoolMetrics:
+    """Checkout-wait statistics across every MeteredQueuePool of the process"""
+
+    # upper bounds (seconds) of the wait histogram buckets
+    BUCKETS = (0.001, 0.01, 0.1, 1.0, 5.0, float('inf'))
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with getattr(self, '_lock', threading.Lock()):
+            self.checkouts = 0
+            self.timeouts = 0
+            self.total_wait = 0.0
+            self.max_wait = 0.0
+            self.histogram = [0] * len(self.BUCKETS)
+
+    def record(self, wait, timed_out=False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            for i, bound in enumerate(self.BUCKETS):
+                if wait <= bound:
+                    self.histogram[i] += 1
+                    break
+
+    def snapshot(self):
+        with self._lock:
+            waits = self.checkouts + self.timeouts
+            return {
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'avg_wait_ms': round(self.total_wait / waits * 1000, 3) if waits else 0.0,
+                'max_wait_ms': round(self.max_wait * 1000, 3),
+                'wait_histogram_ms': {
+                    ('inf' if bound == float('inf') else f'<={bound * 1000:g}'): count
+                    for bound, count in zip(self.BUCKETS, self.histogram)
+                }
+            }
+
+
+pool_metrics = PoolMetrics()
+
+
+class MeteredQueuePool(QueuePool):
+    """QueuePool that records the time spent waiting for a connection"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except Exception:
+            pool_metrics.record(time.perf_counter() - start, timed_out=True)
+            raise
+        pool_metrics.record(time.perf_counter() - start)
+        return connection
+
+
+def pool_status(engine):
+    """Current pool occupancy plus the process-wide checkout-wait metrics"""
+    pool = engine.pool
+    status = {'pool_class': type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            'size': pool.size(),
+            'checked_out': pool.checkedout(),
+            'overflow': pool.overflow(),
+            'checked_in': pool.checkedin(),
+        })
+    status['wait'] = pool_metrics.snapshot()
+    return status
+
+
+def _env_int(name, default):
+    value = os.getenv(name)
+    return int(value) if value not in (None, '') else default
+
+
+def _env_bool(name, default):
+    value = os.getenv(name)
+    if value in (None, ''):
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def sqlite_busy_timeout():
+    """
+    Milliseconds a SQLite connection waits for the write lock: SQLITE_BUSY_TIMEOUT,
+    else DB_STATEMENT_TIMEOUT, else 15000. Used for both the driver's connect
+    timeout and PRAGMA busy_timeout, so the two never disagree.
+    """
+    timeout = _env_int('SQLITE_BUSY_TIMEOUT', None)
+    if timeout is None:
+        timeout = _env_int('DB_STATEMENT_TIMEOUT', None)
+    return 15000 if timeout is None else timeout
+
+
+def engine_options(database_uri):
+    """SQLALCHEMY_ENGINE_OPTIONS for `database_uri`: backend profile + environment overrides"""
+    if not database_uri:
+        return {}
+
+    url = make_url(database_uri)
+    backend = url.get_backend_name()
+    statement_timeout = _env_int('DB_STATEMENT_TIMEOUT', None)
+
+    if backend == 'sqlite':
+        # in-memory databases get a StaticPool from Flask-SQLAlchemy; nothing to tune
+        if url.database in (None, '', ':memory:'):
+            return {}
+        options = {
+            'poolclass': MeteredQueuePool,
+            'pool_size': _env_int('DB_POOL_SIZE', 5),
+            'max_overflow': _env_int('DB_MAX_OVERFLOW', 10),
+            'pool_timeout': _env_int('DB_POOL_TIMEOUT', 30),
+            # local file: no network hop that could go stale
+            'pool_pre_ping': _env_bool('DB_POOL_PRE_PING', False),
+            'connect_args': {
+                'timeout': sqlite_busy_timeout() / 1000,
+                'check_same_thread': False,
+            },
+        }
+        recycle = _env_int('DB_POOL_RECYCLE', None)
+        if recycle:
+            options['pool_recycle'] = recycle
+        return options
+
+    options = {
+        'poolclass': MeteredQueuePool,
+        'pool_size': _env_int('DB_POOL_SIZE', 10),
+        'max_overflow': _env_int('DB_MAX_OVERFLOW', 20),
+        'pool_timeout': _env_int('DB_POOL_TIMEOUT', 30),
+        # recycle below typical server / load balancer idle cut-offs
+        'pool_recycle': _env_int('DB_POOL_RECYCLE', 1800),
+        'pool_pre_ping': _env_bool('DB_POOL_PRE_PING', True),
+        'pool_use_lifo': True,
+    }
+
+    if backend == 'postgresql':
+        pg_options = f"-c statement_timeout={statement_timeout or 30000}"
+        options['connect_args'] = {
+            'options': pg_options,
+            'application_name': os.getenv('DB_APPLICATION_NAME', 'taskflow'),
+        }
+    elif backend == 'mysql' and statement_timeout:
+        options['connect_args'] = {'init_command': f"SET SESSION max_execution_time={statement_timeout}"}
+
+    return options
+
+
+def _is_sqlite_file(url):
+    return url.get_backend_name() == 'sqlite' and url.database not in (None, '', ':memory:')
+
+
+def sqlite_pragmas(config):
+    """PRAGMAs applied to each new SQLite connection, in order"""
+    pragmas = [
+        # readers keep reading their snapshot while a writer appends to the WAL
+        ('journal_mode', config.get('SQLITE_JOURNAL_MODE', 'WAL')),
+        # WAL + NORMAL: fsync at checkpoints only; a power loss may drop the last
+        # commits but never corrupts the database
+        ('synchronous', config.get('SQLITE_SYNCHRONOUS', 'NORMAL')),
+        ('busy_timeout', config.get('SQLITE_BUSY_TIMEOUT', sqlite_busy_timeout())),
+        ('foreign_keys', 'ON'),
+        ('temp_store', 'MEMORY'),
+    ]
+    if config.get('SQLITE_MMAP_SIZE'):
+        pragmas.append(('mmap_size', config['SQLITE_MMAP_SIZE']))
+    if config.get('SQLITE_CACHE_SIZE'):
+        pragmas.append(('cache_size', config['SQLITE_CACHE_SIZE']))
+    return pragmas
+
+
+def init_sqlite_profile(app, engine):
+    """Apply the SQLite PRAGMA profile to every connection `engine` opens (file databases only)"""
+    if not _is_sqlite_file(engine.url):
+        return
+
+    pragmas = sqlite_pragmas(app.config)
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas:
+                cursor.execute(f'PRAGMA {name}={value}')
+        finally:
+            cursor.close()
+
+
+def replica_bind(replica_uri):
+    """SQLALCHEMY_BINDS entry for the read replica, None when no replica is configured"""
+    if not replica_uri:
+        return None
+    return {'url': replica_uri, **engine_options(replica_uri)}
+
+
+class RoutingSession(Session):
+    """
+    Session sending reads to the replica bind while session.info[USE_REPLICA]
+    is set. Writes, flushes and anything but a SELECT stay on the primary.
+    While session.info[DEFER_COMMIT] is set, commit() only flushes.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self.info.get(USE_REPLICA) and not self._flushing \
+                and getattr(clause, 'is_select', False):
+            replica = self._db.engines.get(REPLICA_BIND)
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def commit(self):
+        if self.info.get(DEFER_COMMIT):
+            # behave like a commit towards the caller (flushed, expired) but keep the transaction open
+            self.flush()
+            self.expire_all()
+            return
+        super().commit()
+
+
+def async_database_url(url):
+    """The same database as `url`, addressed through its asyncio driver"""
+    url = make_url(url)
+    driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No asyncio driver known for '{url.get_backend_name()}'")
+    return url.set(drivername=driver)
+
+
+def async_engine_options(url):
+    """engine_options() adapted to create_async_engine (asyncio pool, driver connect args)"""
+    url = make_url(url)
+    options = engine_options(url.render_as_string(hide_password=False))
+    options.pop('poolclass', None)
+    connect_args = options.pop('connect_args', {})
+
+    if url.get_backend_name() == 'postgresql':
+        # asyncpg takes server settings instead of a libpq options string
+        timeout = connect_args.get('options', '').rpartition('=')[2]
+        connect_args = {'server_settings': {
+            'statement_timeout': timeout or '30000',
+            'application_name': connect_args.get('application_name', 'taskflow'),
+        }}
+    elif url.get_backend_name() == 'mysql':
+        connect_args = {}
+
+    if connect_args:
+        options['connect_args'] = connect_args
+    return options
@@ -1,4 +1,6 @@
 from app import db
 from app.models.user import User
 from app.models.task import Task, PriorityEnum, StatusEnum
+from app.models.task_stats import TaskStats, TaskDueCount, TaskVersion, TaskTombstone
+from app.models.revoked_token import RevokedToken
 
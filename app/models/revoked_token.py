@@ -0,0 +1,13 @@
+from app import db
+
+
+class RevokedToken(db.Model):
+    """Revoked refresh tokens, looked up by jti (primary key) on every refresh"""
+
+    __tablename__ = 'revoked_tokens'
+    jti = db.Column(db.String(36), primary_key=True)
+    user_id = db.Column(db.Integer, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<RevokedToken {self.jti} user={self.user_id}>"
@@ -1,5 +1,6 @@
 from app import db 
 import enum
+from sqlalchemy import and_, bindparam
 from datetime import datetime,date
 from datetime import timezone
 
@@ -14,6 +15,9 @@ class StatusEnum(enum.Enum):
     COMPLETED = 'COMPLETED'
     CANCELLED = 'CANCELLED'
 
+# Statuses that take a task out of the overdue / open set
+CLOSED_STATUSES = [StatusEnum.COMPLETED, StatusEnum.CANCELLED]
+
 class Task(db.Model):
     __tablename__ = 'tasks'
     task_id = db.Column(db.Integer, primary_key=True, nullable=False, autoincrement=True)
@@ -24,12 +28,42 @@ class Task(db.Model):
     priority = db.Column(db.Enum(PriorityEnum), default=PriorityEnum.LOW)
     status = db.Column(db.Enum(StatusEnum), default=StatusEnum.PENDING)
 
+    # Change feed stamp (app.utils.task_changes): the user's data version of the
+    # transactions that created / last wrote the task, and when it happened (UTC)
+    created_seq = db.Column(db.BigInteger, nullable=False, default=0, server_default='0')
+    change_seq = db.Column(db.BigInteger, nullable=False, default=0, server_default='0')
+    updated_at = db.Column(db.DateTime, nullable=True)
+
     # Foreign key
     user_id = db.Column(db.Integer, db.ForeignKey('users.user_id'), nullable=False)
 
+    # Every route filters on user_id first, so each index leads with it.
+    # ix_tasks_user_open_due_date is partial (open, dated tasks only). The
+    # closed statuses are rendered as literals (literal_execute) so that
+    # SQLite / PostgreSQL can match its predicate at plan time.
+    __table_args__ = (
+        db.Index('ix_tasks_user_due_date', 'user_id', 'due_date'),
+        db.Index('ix_tasks_user_status_due_date', 'user_id', 'status', 'due_date'),
+        db.Index('ix_tasks_user_task_id_desc', 'user_id', db.desc('task_id')),
+        db.Index('ix_tasks_user_change_seq', 'user_id', 'change_seq', 'task_id'),
+        db.Index(
+            'ix_tasks_user_open_due_date', 'user_id', 'due_date',
+            sqlite_where=db.text("due_date IS NOT NULL AND status NOT IN ('COMPLETED', 'CANCELLED')"),
+            postgresql_where=db.text("due_date IS NOT NULL AND status NOT IN ('COMPLETED', 'CANCELLED')"),
+        ),
+    )
+
+    @classmethod
+    def open_dated_clause(cls):
+        """Filter matching the partial index: dated tasks that are not completed/cancelled"""
+        return and_(
+            cls.due_date != None,
+            cls.status.notin_(bindparam('closed_statuses', CLOSED_STATUSES, expanding=True, literal_execute=True))
+        )
+
     def is_overdue(self):
         """Check if task is overdue"""
-        if self.due_date and self.status not in [StatusEnum.COMPLETED.value, StatusEnum.CANCELLED.value]:
+        if self.due_date and self.status not in CLOSED_STATUSES:
             return date.today() > self.due_date
         return False
     
@@ -0,0 +1,67 @@
+from app import db
+
+
+class TaskStats(db.Model):
+    """Per-user task counters by status, kept in step with `tasks` on every write"""
+
+    __tablename__ = 'task_stats'
+    user_id = db.Column(db.Integer, db.ForeignKey('users.user_id', ondelete='CASCADE'), primary_key=True)
+    pending = db.Column(db.Integer, nullable=False, default=0)
+    in_progress = db.Column(db.Integer, nullable=False, default=0)
+    completed = db.Column(db.Integer, nullable=False, default=0)
+    cancelled = db.Column(db.Integer, nullable=False, default=0)
+
+    def status_counts(self):
+        """Non-zero counts keyed by status value, e.g. { 'PENDING': 10, 'COMPLETED': 4 }"""
+        counts = {
+            'PENDING': self.pending,
+            'IN_PROGRESS': self.in_progress,
+            'COMPLETED': self.completed,
+            'CANCELLED': self.cancelled
+        }
+        return {status: count for status, count in counts.items() if count}
+
+    def __repr__(self):
+        return f"<TaskStats user={self.user_id} {self.status_counts()}>"
+
+
+class TaskDueCount(db.Model):
+    """Per-user number of open (not completed/cancelled) tasks due on each date"""
+
+    __tablename__ = 'task_due_counts'
+    user_id = db.Column(db.Integer, db.ForeignKey('users.user_id', ondelete='CASCADE'), primary_key=True)
+    due_date = db.Column(db.Date, primary_key=True)
+    open_count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<TaskDueCount user={self.user_id} {self.due_date}={self.open_count}>"
+
+
+class TaskVersion(db.Model):
+    """Per-user data version, bumped by every task write; drives ETags on task reads"""
+
+    __tablename__ = 'task_versions'
+    user_id = db.Column(db.Integer, db.ForeignKey('users.user_id', ondelete='CASCADE'), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+    # highest change_seq of the tombstones pruned so far: older change feed cursors are stale
+    pruned_seq = db.Column(db.BigInteger, nullable=False, default=0, server_default='0')
+
+    def __repr__(self):
+        return f"<TaskVersion user={self.user_id} v{self.version}>"
+
+
+class TaskTombstone(db.Model):
+    """A deleted task, kept for the change feed until pruned"""
+
+    __tablename__ = 'task_tombstones'
+    user_id = db.Column(db.Integer, db.ForeignKey('users.user_id', ondelete='CASCADE'), primary_key=True)
+    task_id = db.Column(db.Integer, primary_key=True)
+    change_seq = db.Column(db.BigInteger, nullable=False)
+    deleted_at = db.Column(db.DateTime, nullable=False, index=True)
+
+    __table_args__ = (
+        db.Index('ix_task_tombstones_user_change_seq', 'user_id', 'change_seq', 'task_id'),
+    )
+
+    def __repr__(self):
+        return f"<TaskTombstone user={self.user_id} task={self.task_id} seq={self.change_seq}>"
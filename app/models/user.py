@@ -1,4 +1,5 @@
-from app import db, bcrypt
+from app import db
+from app.utils.password import password_hasher
 from datetime import datetime
 from datetime import timezone
 
@@ -13,11 +14,17 @@ class User(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc))
     tasks = db.relationship('Task', backref='user', lazy=True, cascade='all,delete')
 
+    # Both run bcrypt in the password hasher's process pool and may raise
+    # PasswordHasherBusy when too many password operations are queued.
     def set_password(self, password):
-        self.password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+        self.password_hash = password_hasher.hash(password)
 
     def check_password(self, password):
-        return bcrypt.check_password_hash(self.password_hash, password)
+        return password_hasher.check(self.password_hash, password)
+
+    def password_needs_rehash(self):
+        """Stored hash uses a different bcrypt cost than BCRYPT_LOG_ROUNDS"""
+        return password_hasher.needs_rehash(self.password_hash)
 
     def __repr__(self):
         return f"<User {self.user_id} - {self.email}>"
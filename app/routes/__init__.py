@@ -5,7 +5,11 @@ def register_routes(app):
     from app.routes.auth_routes import auth_bp
     # from app.routes.user_routes import user_bp
     from app.routes.task_routes import task_bp
+    from app.routes.health_routes import health_bp
+    from app.routes.batch_routes import batch_bp
 
     app.register_blueprint(auth_bp, url_prefix='/auth')
     # app.register_blueprint(user_bp, url_prefix='/user')
-    app.register_blueprint(task_bp, url_prefix='/user/tasks')
\ No newline at end of file
+    app.register_blueprint(task_bp, url_prefix='/user/tasks')
+    app.register_blueprint(health_bp, url_prefix='/health')
+    app.register_blueprint(batch_bp, url_prefix='/batch')
\ No newline at end of file
@@ -0,0 +1,391 @@
+import asyncio
+import json
+import math
+import re
+from datetime import date
+from urllib.parse import parse_qsl
+
+from a2wsgi import WSGIMiddleware
+from flask_jwt_extended import decode_token
+from jwt.exceptions import ExpiredSignatureError, PyJWTError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from werkzeug.datastructures import MultiDict
+
+from app import db
+from app.database import async_database_url, async_engine_options, init_sqlite_profile, REPLICA_BIND
+from app.models import Task
+from app.utils import task_queries, task_counters, task_events
+from app.utils.etag import task_etag, etag_matches
+from app.utils.replica import use_async_replica_for, watch_replica_errors
+from app.utils.task_serializer import task_rows, serialize_task_rows
+from app.utils.task_versions import current_version
+from app.utils.user_cache import load_user_profile
+
+try:
+    import orjson
+except ImportError:  # optional dependency, fall back to the stdlib encoder
+    orjson = None
+
+# Async read path for the task endpoints (ASGI).
+#
+# AsyncTaskReads wraps the Flask app: GET requests for the read-only task
+# endpoints are answered on the event loop through an SQLAlchemy asyncio
+# engine (aiosqlite / asyncpg), everything else is passed to Flask through
+# a2wsgi on a pool of ASGI_WSGI_THREADS threads. A request waiting on the
+# database only parks a coroutine, so one worker process multiplexes many
+# slow reads instead of holding one thread each.
+#
+# Handlers are the sync query code of task_routes run through
+# AsyncSession.run_sync(): the same query builders (with a `base` query of the
+# async session), the same serializer, ETags and response bodies.
+#
+# Requests get the checks of @jwt_required() (valid access token, user still
+# exists - user_cache.load_user_profile) and the routing of @read_replica /
+# conditional_task_read: the ETag comes from the primary, the body from the
+# replica when app.utils.replica allows it for the user and the replica has
+# reached the user's data version.
+#
+# GET /user/tasks/events is served here too (task_events.EventStream): an
+# open event stream waits on the loop instead of holding one of the
+# ASGI_WSGI_THREADS threads for as long as the client stays connected.
+#
+#     uvicorn asgi:app --workers 4
+
+
+class ReadError(Exception):
+    """Client error of a read handler, answered as error_response(message, status)"""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+class AuthError(Exception):
+    """JWT problem, answered like flask_jwt_extended ({"msg": ...})"""
+
+    def __init__(self, message, status_code=401):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+def _success(data, message):
+    return {'success': True, 'message': message, 'data': data}
+
+
+#******************************************************************************
+# Handlers: (sync session, user_id, query args, today, **path params) -> body
+#******************************************************************************
+
+def get_tasks(session, user_id, args, today):
+    status = args.get('status', type=str)
+    priority = args.get('priority', type=str)
+    search = args.get('search', type=str)
+    page = args.get('page', default=1, type=int)
+    per_page = args.get('per_page', default=10, type=int)
+
+    try:
+        query = task_queries.filter_tasks(user_id, status=status, priority=priority, search=search,
+                                          base=session.query(Task))
+    except ValueError as e:
+        raise ReadError(str(e), 400)
+
+    # --- Cursor (keyset) pagination, same contract as the sync route ---
+    if 'cursor' in args:
+        per_page = max(1, min(per_page, 100))
+        count = args.get('count', type=str)
+        try:
+            tasks, next_cursor = task_queries.keyset_page(task_rows(query), args.get('cursor'), per_page, user_id)
+        except ValueError as e:
+            raise ReadError(str(e), 400)
+
+        pagination = {'per_page': per_page, 'next_cursor': next_cursor, 'has_next': next_cursor is not None}
+        if count in ('exact', 'estimate'):
+            pagination['total_items'] = query.count() if count == 'exact' else task_queries.estimate_count(query)
+            pagination['total_is_estimate'] = count == 'estimate'
+
+        return {
+            'success': True,
+            'message': 'Tasks fetched successfully',
+            'data': serialize_task_rows(tasks, today),
+            'pagination': pagination
+        }
+
+    # --- Page / per_page pagination (Flask-SQLAlchemy paginate(error_out=False) semantics) ---
+    current_page = page if page >= 1 else 1
+    page_size = per_page if per_page >= 1 else 20
+    total = query.order_by(None).count()
+    rows = (
+        task_rows(query)
+        .order_by(Task.due_date.asc())
+        .limit(page_size)
+        .offset((current_page - 1) * page_size)
+        .all()
+    )
+
+    return _success({
+        'tasks': serialize_task_rows(rows, today),
+        'page': page,
+        'total_pages': math.ceil(total / page_size) if total else 0,
+        'total_tasks': total
+    }, 'Tasks fetched successfully')
+
+
+def get_one_task(session, user_id, args, today, task_id):
+    task = session.query(Task).filter_by(task_id=int(task_id), user_id=user_id).first()
+    if not task:
+        raise ReadError('Task not found', 404)
+    return _success(task.to_dict(), 'Task fetched successfully')
+
+
+def get_overdue_tasks(session, user_id, args, today):
+    rows = task_rows(task_queries.overdue_tasks(user_id, today, base=session.query(Task))).all()
+    return _success(serialize_task_rows(rows, today), 'Overdue tasks fetched')
+
+
+def get_today_tasks(session, user_id, args, today):
+    rows = task_rows(task_queries.today_tasks(user_id, today, base=session.query(Task))).all()
+    return _success(serialize_task_rows(rows, today), "Today's tasks fetched")
+
+
+def get_task_stats(session, user_id, args, today):
+    status_summary, overdue_count = task_counters.read_stats(user_id, today, session=session)
+    return _success({'status_counts': status_summary, 'overdue_count': overdue_count}, 'Task stats fetched')
+
+
+def get_recent_tasks(session, user_id, args, today):
+    limit = args.get('limit', default=5, type=int)
+    rows = task_rows(task_queries.recent_tasks(user_id, limit, base=session.query(Task))).all()
+    return _success(serialize_task_rows(rows, today), 'Recent tasks fetched successfully')
+
+
+def get_upcoming_tasks(session, user_id, args, today):
+    rows = task_rows(task_queries.upcoming_tasks(user_id, today, base=session.query(Task))).all()
+    return _success(serialize_task_rows(rows, today), 'Upcoming tasks fetched successfully')
+
+
+EVENTS_PATH = '/user/tasks/events'
+
+# (path pattern, handler, message prefix of unexpected failures) - mirrors task_bp
+ASYNC_ROUTES = [
+    (re.compile(r'/user/tasks/'), get_tasks, 'Failed to fetch tasks'),
+    (re.compile(r'/user/tasks/(?P<task_id>\d+)'), get_one_task, 'Failed to fetch task'),
+    (re.compile(r'/user/tasks/overdue'), get_overdue_tasks, 'Failed to fetch overdue tasks'),
+    (re.compile(r'/user/tasks/today'), get_today_tasks, "Failed to fetch today's tasks"),
+    (re.compile(r'/user/tasks/stats'), get_task_stats, 'Failed to fetch stats'),
+    (re.compile(r'/user/tasks/recent'), get_recent_tasks, 'Failed to fetch recent tasks'),
+    (re.compile(r'/user/tasks/upcoming'), get_upcoming_tasks, 'Failed to fetch upcoming tasks'),
+]
+
+
+def _dumps(body):
+    if orjson is not None:
+        return orjson.dumps(body, option=orjson.OPT_SORT_KEYS | orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(body, sort_keys=True, separators=(',', ':')) + '\n').encode('utf-8')
+
+
+async def _respond(send, status, body=None, headers=()):
+    payload = b'' if body is None else _dumps(body)
+    response_headers = [(b'content-length', str(len(payload)).encode('latin-1'))]
+    if body is not None:
+        response_headers.append((b'content-type', b'application/json'))
+    response_headers += [(name.encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+    await send({'type': 'http.response.start', 'status': status, 'headers': response_headers})
+    await send({'type': 'http.response.body', 'body': payload})
+
+
+class AsyncTaskReads:
+    """ASGI application: async task reads, everything else delegated to the Flask app"""
+
+    def __init__(self, flask_app, fallback=None):
+        self.flask_app = flask_app
+        self.fallback = fallback or WSGIMiddleware(flask_app, workers=flask_app.config.get('ASGI_WSGI_THREADS', 10))
+
+        # same database (and resolved SQLite path) as the Flask engine, and the same replica
+        with flask_app.app_context():
+            url = db.engine.url
+            replica = db.engines.get(REPLICA_BIND)
+            replica_url = replica.url if replica is not None else None
+        self.engine = create_async_engine(async_database_url(url), **async_engine_options(url))
+        init_sqlite_profile(flask_app, self.engine.sync_engine)
+        self.sessionmaker = async_sessionmaker(self.engine, expire_on_commit=False)
+
+        self.replica_engine = None
+        if replica_url is not None:
+            self.replica_engine = create_async_engine(async_database_url(replica_url),
+                                                      **async_engine_options(replica_url))
+            init_sqlite_profile(flask_app, self.replica_engine.sync_engine)
+            watch_replica_errors(self.replica_engine.sync_engine)
+            self.replica_sessionmaker = async_sessionmaker(self.replica_engine, expire_on_commit=False)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self._lifespan(receive, send)
+
+        if scope['type'] == 'http' and scope['method'] == 'GET':
+            if scope['path'] == EVENTS_PATH:
+                return await self._events(scope, receive, send)
+            for pattern, handler, failure in ASYNC_ROUTES:
+                match = pattern.fullmatch(scope['path'])
+                if match:
+                    return await self._handle(scope, send, handler, failure, match.groupdict())
+
+        await self.fallback(scope, receive, send)
+
+    def _identity(self, headers):
+        """JWT subject of an access token in the Authorization header (flask_jwt_extended rules)"""
+        return self._access_token(headers)['sub']
+
+    def _access_token(self, headers):
+        """Decoded access token of the Authorization header"""
+        auth = headers.get('authorization', '').strip().strip(',')
+        if not auth:
+            raise AuthError('Missing Authorization Header', 401)
+        # the header may hold several comma separated credentials, exactly one of them Bearer
+        bearer = [field for field in re.split(r',\s*', auth) if field.split()[0] == 'Bearer']
+        if len(bearer) != 1:
+            raise AuthError("Missing 'Bearer' type in 'Authorization' header. "
+                            "Expected 'Authorization: Bearer <JWT>'", 401)
+        parts = bearer[0].split()
+        if len(parts) != 2:
+            raise AuthError("Bad Authorization header. Expected 'Authorization: Bearer <JWT>'", 422)
+        token = parts[1]
+        try:
+            with self.flask_app.app_context():
+                payload = decode_token(token)
+        except ExpiredSignatureError:
+            raise AuthError('Token has expired', 401)
+        except PyJWTError as e:
+            raise AuthError(str(e), 422)
+        if payload.get('type') != 'access':
+            raise AuthError('Only non-refresh tokens are allowed', 422)
+        return payload
+
+    async def _check_user(self, session, user_id):
+        """user_lookup_loader check of @jwt_required(): the token's user must still exist"""
+        profile = await session.run_sync(lambda sync_session: load_user_profile(user_id, sync_session))
+        if profile is None:
+            raise AuthError(f'Error loading the user {user_id}', 401)
+
+    async def _replica_session(self, user_id, version):
+        """Replica session for the user's reads, None when they stay on the primary (see @read_replica)"""
+        if not await use_async_replica_for(user_id, self.replica_engine):
+            return None
+        replica = self.replica_sessionmaker()
+        try:
+            if await replica.run_sync(lambda sync_session: current_version(user_id, sync_session)) >= version:
+                return replica
+        except Exception:
+            pass    # unreachable replica: marked down by watch_replica_errors, read the primary
+        await replica.close()
+        return None
+
+    async def _handle(self, scope, send, handler, failure, params):
+        headers = {name.decode('latin-1').lower(): value.decode('latin-1') for name, value in scope['headers']}
+        try:
+            user_id = self._identity(headers)
+        except AuthError as e:
+            return await _respond(send, e.status_code, {'msg': e.message})
+
+        args = MultiDict(parse_qsl(scope['query_string'].decode('latin-1'), keep_blank_values=True))
+        today = date.today()
+
+        async with self.sessionmaker() as session:
+            try:
+                await self._check_user(session, user_id)
+            except AuthError as e:
+                return await _respond(send, e.status_code, {'msg': e.message})
+
+            version = await session.run_sync(lambda sync_session: current_version(user_id, sync_session))
+            etag = task_etag(user_id, version, today)
+            if etag_matches(headers.get('if-none-match'), etag):
+                return await _respond(send, 304, headers=[('etag', etag)])
+
+            replica = await self._replica_session(user_id, version)
+            try:
+                body = await (replica or session).run_sync(
+                    lambda sync_session: handler(sync_session, user_id, args, today, **params)
+                )
+            except ReadError as e:
+                return await _respond(send, e.status_code, {'success': False, 'error': e.message})
+            except Exception as e:
+                return await _respond(send, 500, {'success': False, 'error': f'{failure}: {str(e)}'})
+            finally:
+                if replica is not None:
+                    await replica.close()
+
+        await _respond(send, 200, body, headers=[('etag', etag), ('cache-control', 'private, no-cache')])
+
+    async def _events(self, scope, receive, send):
+        """Server-Sent Events stream of task changes, same protocol as task_routes.task_event_stream"""
+        headers = {name.decode('latin-1').lower(): value.decode('latin-1') for name, value in scope['headers']}
+        try:
+            token = self._access_token(headers)
+        except AuthError as e:
+            return await _respond(send, e.status_code, {'msg': e.message})
+
+        args = MultiDict(parse_qsl(scope['query_string'].decode('latin-1'), keep_blank_values=True))
+        cursor = headers.get('last-event-id') or args.get('last_event_id') or None
+        if cursor is not None:
+            try:
+                task_events.check_cursor(cursor)
+            except ValueError as e:
+                return await _respond(send, 400, {'success': False, 'error': str(e)})
+
+        config = self.flask_app.config
+        stream = task_events.EventStream(token['sub'], cursor, expires_at=token.get('exp'),
+                                         heartbeat=config['EVENTS_HEARTBEAT'], page_size=config['CHANGES_PAGE_SIZE'])
+        subscription = task_events.broker.subscribe(stream.user_id, loop=asyncio.get_running_loop())
+
+        async def until_disconnect():
+            while (await receive())['type'] != 'http.disconnect':
+                pass
+            stream.closed = True
+            subscription.notify()
+
+        watcher = asyncio.ensure_future(until_disconnect())
+        try:
+            try:
+                async with self.sessionmaker() as session:
+                    await self._check_user(session, stream.user_id)
+                    message = await session.run_sync(stream.open)
+            except AuthError as e:
+                return await _respond(send, e.status_code, {'msg': e.message})
+            except Exception as e:
+                return await _respond(send, 500, {'success': False, 'error': f'Failed to open task events: {str(e)}'})
+
+            await send({'type': 'http.response.start', 'status': 200, 'headers': [
+                (b'content-type', b'text/event-stream; charset=utf-8'),
+                (b'cache-control', b'no-cache'),
+                (b'x-accel-buffering', b'no'),
+            ]})
+            while True:
+                if message:
+                    await send({'type': 'http.response.body', 'body': message.encode('utf-8'), 'more_body': True})
+                if stream.closed:
+                    break
+                if await subscription.wait_async(stream.wait_time()):
+                    if stream.closed:
+                        break
+                    async with self.sessionmaker() as session:
+                        message = await session.run_sync(stream.changes)
+                else:
+                    message = stream.idle()
+            if not watcher.done():
+                await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+        finally:
+            watcher.cancel()
+            task_events.broker.unsubscribe(subscription)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.engine.dispose()
+                if self.replica_engine is not None:
+                    await self.replica_engine.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
@@ -1,13 +1,22 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import get_jwt_identity, jwt_required
-from app import db,bcrypt
+from flask_jwt_extended import get_jwt_identity, jwt_required, get_jwt, current_user
+from app import db
 from app.models import User
 from app.schema.auth_schema import SignUpSchema,LoginSchema
 from pydantic import ValidationError
-from app.utils.jwtUtil import generate_jwt
+from app.utils.jwtUtil import generate_jwt, generate_refresh_jwt, revoke_token
+from app.utils.password import PasswordHasherBusy
+from app.utils.user_cache import invalidate_user
 
 auth_bp = Blueprint('auth', __name__)
 
+
+@auth_bp.errorhandler(PasswordHasherBusy)
+def password_hasher_busy(e):
+    # every password worker is taken and the queue is full: fail fast instead of piling up
+    return jsonify({"message": "Server busy, please retry shortly"}), 503, {"Retry-After": "1"}
+
+
 @auth_bp.route('/signup', methods=['POST'])
 def signup():
     data = request.get_json()
@@ -39,10 +48,20 @@ def login():
     if not user or not user.check_password(validated_data.password):
         return jsonify({"message": "Invalid email or password"}), 401
 
+    # BCRYPT_LOG_ROUNDS changed since this hash was made: upgrade it transparently
+    if user.password_needs_rehash():
+        try:
+            user.set_password(validated_data.password)
+            db.session.commit()
+        except PasswordHasherBusy:
+            pass
+
     access_token = generate_jwt(user_id=str(user.user_id))
+    refresh_token = generate_refresh_jwt(user_id=str(user.user_id))
     return jsonify({
         "message": "Login successful",
         "access_token": access_token,
+        "refresh_token": refresh_token,
         "user": {
             "user_id": user.user_id,
             "name": user.name,
@@ -50,13 +69,31 @@ def login():
         }
     }), 200
 
+@auth_bp.route('/refresh', methods=['POST'])
+@jwt_required(refresh=True)
+def refresh():
+    # new access token from a refresh token: no password, no bcrypt
+    user_id = get_jwt_identity()
+    access_token = generate_jwt(user_id=user_id)
+    return jsonify({
+        "message": "Token refreshed",
+        "access_token": access_token
+    }), 200
+
+@auth_bp.route('/logout', methods=['POST'])
+@jwt_required(refresh=True)
+def logout():
+    # revoke the refresh token; outstanding access tokens expire on their own
+    revoke_token(get_jwt())
+    db.session.commit()
+    return jsonify({"message": "Logged out"}), 200
+
 @auth_bp.route('/user', methods=['GET'])
 @jwt_required()
 def get_current_user():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    if not user:
-        return jsonify({"message": "User not found"}), 404
+    # current_user is the cached profile loaded by the JWT user_lookup_loader (no DB query on a cache hit);
+    # a token of a user that no longer exists is already refused there with 401
+    user = current_user
 
     return jsonify({
         "user_id": user.user_id,
@@ -69,7 +106,7 @@ def get_current_user():
 @jwt_required()
 def update_current_user():
     user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = db.session.get(User, user_id)
     if not user:
         return jsonify({"message": "User not found"}), 404
     
@@ -82,6 +119,7 @@ def update_current_user():
         user.set_password(data['password'])
         
     db.session.commit()
+    invalidate_user(user_id)
     return jsonify({"message": "User updated successfully"}), 200
 
 
@@ -0,0 +1,144 @@
+from flask import Blueprint, request, current_app
+from flask_jwt_extended import jwt_required
+from pydantic import ValidationError
+from urllib.parse import urlsplit
+from werkzeug.exceptions import HTTPException
+from werkzeug.routing import RequestRedirect
+from app import db
+from app.database import DEFER_COMMIT
+from app.schema.batch_schema import BatchSchema
+from app.utils.replica import PIN_PRIMARY
+from app.utils.response import success_response, error_response
+from app.utils.write_queue import WriteQueueTimeout
+
+batch_bp = Blueprint('batch', __name__)
+
+# Sub-requests may target every access-token route of auth_bp / task_bp except
+# the token endpoints and the streaming export / import / event stream.
+BATCH_BLUEPRINTS = ('auth', 'task_bp')
+BATCH_EXCLUDED = {'auth.signup', 'auth.login', 'auth.refresh', 'auth.logout',
+                  'task_bp.export_tasks', 'task_bp.import_tasks', 'task_bp.task_event_stream'}
+FORWARDED_HEADERS = ('ETag', 'Cache-Control', 'Retry-After')
+
+
+def _run_operation(operation):
+    """
+    Run one sub-request through the matching view in the current app context,
+    so it shares db.session and the JWT already verified for the batch.
+
+    Returns:
+        dict with the sub-response status, headers and JSON body
+    """
+    app = current_app._get_current_object()
+    path, _, query_string = operation.path.partition('?')
+    options = {'json': operation.body} if operation.body is not None else {}
+
+    with app.test_request_context(path, method=operation.method, query_string=query_string,
+                                  headers=operation.headers or {}, **options):
+        try:
+            if isinstance(request.routing_exception, RequestRedirect):
+                # canonical form of the path (e.g. missing trailing slash): follow it
+                new_path = urlsplit(request.routing_exception.new_url).path
+                if query_string:
+                    new_path = f'{new_path}?{query_string}'
+                return _run_operation(operation.model_copy(update={'path': new_path}))
+            if request.routing_exception is not None:
+                raise request.routing_exception
+            endpoint = request.url_rule.endpoint
+            if request.blueprint not in BATCH_BLUEPRINTS or endpoint in BATCH_EXCLUDED:
+                response = app.make_response(error_response(f'{operation.path} cannot be used in a batch', 400))
+            else:
+                # the view without its @jwt_required() layer: the token was checked once for the batch
+                view = app.view_functions[endpoint].__wrapped__
+                response = app.make_response(view(**request.view_args))
+        except HTTPException as e:
+            # unknown path, wrong method, missing JSON body ...
+            response = app.make_response(error_response(e.description, e.code))
+        except Exception as e:
+            try:
+                response = app.make_response(app.handle_user_exception(e))
+            except Exception as e:
+                db.session.rollback()
+                response = app.make_response(error_response(f'Request failed: {str(e)}', 500))
+
+        result = {
+            'status': response.status_code,
+            'headers': {name: response.headers[name] for name in FORWARDED_HEADERS if name in response.headers},
+        }
+        if response.status_code != 304:
+            body = response.get_json(silent=True)
+            result['body'] = body if body is not None else response.get_data(as_text=True)
+        return result
+
+
+
+#**************************************************************************************************
+# Run an ordered list of task / user requests in one round trip
+@batch_bp.route('', methods=['POST'])
+@jwt_required()
+def run_batch():
+    """
+    Body: {"requests": [{"method": "GET", "path": "/user/tasks/today"}, ...], "atomic": false}
+    Sub-requests run in order with one JWT check and one database session.
+    With "atomic": true their writes share one transaction: it is committed
+    after the last sub-request, or rolled back at the first one failing
+    (status >= 400), in which case the remaining sub-requests are not run (424).
+    """
+    try:
+        data = BatchSchema(**(request.get_json(silent=True) or {}))
+    except ValidationError as e:
+        errors = [{
+            'field': '.'.join(str(part) for part in error['loc']) or 'unknown',
+            'message': error['msg'],
+            'type': error['type']
+        } for error in e.errors()]
+        return error_response('Validation failed', 400, errors=errors)
+
+    max_requests = current_app.config.get('BATCH_MAX_REQUESTS', 50)
+    if len(data.requests) > max_requests:
+        return error_response(f'A batch may contain at most {max_requests} requests', 400)
+
+    session = db.session
+    # reads after a write in the same batch must see it: keep them off the replica
+    if any(operation.method != 'GET' for operation in data.requests):
+        session.info[PIN_PRIMARY] = True
+    if data.atomic:
+        session.info[DEFER_COMMIT] = True
+
+    responses = []
+    failed_at = None
+    try:
+        for index, operation in enumerate(data.requests):
+            if failed_at is not None:
+                responses.append({
+                    'status': 424,
+                    'headers': {},
+                    'body': {'success': False, 'error': f'Not run: request {failed_at} failed'}
+                })
+                continue
+
+            result = _run_operation(operation)
+            responses.append(result)
+            if data.atomic and result['status'] >= 400:
+                failed_at = index
+
+        batch = {'responses': responses, 'atomic': data.atomic}
+        if data.atomic:
+            session.info.pop(DEFER_COMMIT, None)
+            if failed_at is None:
+                session.commit()
+            else:
+                session.rollback()
+            batch['committed'] = failed_at is None
+
+        return success_response(data=batch, message='Batch processed')
+
+    except WriteQueueTimeout:
+        raise
+    except Exception as e:
+        session.rollback()
+        return error_response(f'Batch failed: {str(e)}', 500)
+
+    finally:
+        session.info.pop(DEFER_COMMIT, None)
+        session.info.pop(PIN_PRIMARY, None)
@@ -0,0 +1,57 @@
+import hmac
+from flask import Blueprint, current_app, request
+from sqlalchemy import text
+from app import db
+from app.database import pool_status
+from app.utils.response import success_response, error_response
+from app.utils.write_queue import write_queue
+from app.utils.replica import replica_health
+from app.utils import task_events
+from app.database import REPLICA_BIND
+
+health_bp = Blueprint('health', __name__)
+
+
+def _show_details():
+    """Pool / replica / queue internals only for callers presenting HEALTH_TOKEN (X-Health-Token)"""
+    token = current_app.config.get('HEALTH_TOKEN')
+    given = request.headers.get('X-Health-Token', '')
+    return bool(token) and hmac.compare_digest(given.encode('utf-8'), token.encode('utf-8'))
+
+
+#******************************************************************************
+# Database health: connectivity for everyone; with X-Health-Token, connection
+# pool occupancy and checkout waits (SQLite: journal mode and write queue
+# statistics; replica health when configured; open task event streams)
+#******************************************************************************
+@health_bp.route('/db', methods=['GET'])
+def database_health():
+    details = _show_details()
+    try:
+        db.session.execute(text('SELECT 1'))
+        if not details:
+            db.session.rollback()
+            return success_response(message='Database reachable')
+
+        status = pool_status(db.engine)
+        if db.engine.dialect.name == 'sqlite':
+            status['journal_mode'] = db.session.execute(text('PRAGMA journal_mode')).scalar()
+            if current_app.config.get('SQLITE_WRITE_QUEUE'):
+                status['write_queue'] = write_queue.stats()
+        if REPLICA_BIND in db.engines:
+            replica_health.is_healthy(db.engines[REPLICA_BIND])
+            status['replica'] = {**pool_status(db.engines[REPLICA_BIND]), **replica_health.status()}
+            del status['replica']['wait']
+        status['event_streams'] = task_events.broker.stats()
+        db.session.rollback()
+
+        return success_response(
+            data=status,
+            message='Database reachable'
+        )
+
+    except Exception as e:
+        # the driver's message (host names, paths) goes to the log, not to the caller
+        current_app.logger.warning("Database health check failed: %s", e)
+        db.session.rollback()
+        return error_response('Database unreachable', 503, pool_status(db.engine) if details else None)
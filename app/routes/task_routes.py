@@ -1,13 +1,17 @@
-from app.models.task import StatusEnum, PriorityEnum
-from flask import Blueprint,request
+from flask import Blueprint,request,current_app,Response,stream_with_context
 from app.models import Task
 from app import db
-from app.schema.task_schema import TaskCreateSchema, TaskReadSchema, TaskUpdateSchema
-from app.utils.response import success_response, error_response
+from app.schema.task_schema import TaskCreateSchema, TaskReadSchema, TaskUpdateSchema, TaskBulkUpdateSchema, TaskBulkDeleteSchema
+from app.utils.response import success_response, error_response, cursor_paginated_response, route_errors
 from pydantic import ValidationError
-from flask_jwt_extended import get_jwt_identity, jwt_required
+from flask_jwt_extended import get_jwt_identity, get_jwt, jwt_required
 from datetime import date, datetime
-from sqlalchemy import func
+from app.utils import task_queries, task_counters, task_bulk, task_search, task_changes, task_events, task_versions
+from app.utils.task_export import EXPORT_ENCODERS, EXPORT_MIMETYPES
+from app.utils.task_serializer import task_rows, serialize_task_rows, TaskRowSerializer
+from app.utils.etag import conditional_task_read
+from app.utils.replica import read_replica
+from app.utils.task_import import IMPORT_FORMATS, import_tasks as import_task_stream
 
 task_bp = Blueprint("task_bp",__name__)
 
@@ -19,56 +23,252 @@ task_bp = Blueprint("task_bp",__name__)
 # Get all tasks for the user
 @task_bp.route('/',methods=['GET'])
 @jwt_required()     #Protects the route — user must be authenticated.
+@read_replica
+@conditional_task_read
+@route_errors("Failed to fetch tasks")
 def get_tasks():
+    user_id = get_jwt_identity()  #Retrieves the identity stored inside the JWT,get users task
+
+    # --- Filtering parameters ---
+    status = request.args.get('status', type=str)
+    priority = request.args.get('priority', type=str)
+    search = request.args.get('search', type=str)  # optional title search ,(used to search the title)
+    page = request.args.get('page', default=1, type=int)          #Reads page query param for pagination.
+    per_page = request.args.get('per_page', default=10, type=int)   #(items per page). Defaults to 10
+
+    # --- Base query + filters ---
+    # selecting tasks that belong to this user_id, narrowed by status / priority / title search.
+    # Invalid status or priority text raises ValueError -> 400.
     try:
-        user_id = get_jwt_identity()  #Retrieves the identity stored inside the JWT,get users task
+        query = task_queries.filter_tasks(user_id, status=status, priority=priority, search=search)
+    except ValueError as e:
+        return error_response(str(e), 400)
+
+    # --- Cursor (keyset) pagination ---
+    # Opt-in with ?cursor= (empty for the first page, then the returned next_cursor).
+    # Seeks on (due_date, task_id) instead of OFFSET, and only counts when asked:
+    # ?count=exact runs COUNT(*), ?count=estimate uses the planner estimate where available.
+    if 'cursor' in request.args:
+        per_page = max(1, min(per_page, 100))
+        count = request.args.get('count', type=str)
+        try:
+            tasks, next_cursor = task_queries.keyset_page(task_rows(query), request.args.get('cursor'), per_page, user_id)
+        except ValueError as e:
+            return error_response(str(e), 400)
+
+        total = None
+        if count == 'exact':
+            total = query.count()
+        elif count == 'estimate':
+            total = task_queries.estimate_count(query)
+
+        return cursor_paginated_response(
+            items=serialize_task_rows(tasks),
+            per_page=per_page,
+            next_cursor=next_cursor,
+            total=total,
+            total_is_estimate=(count == 'estimate'),
+            message="Tasks fetched successfully"
+        )
 
-        # --- Filtering parameters ---
-        status = request.args.get('status', type=str)
-        priority = request.args.get('priority', type=str)
-        search = request.args.get('search', type=str)  # optional title search ,(used to search the title)
-        page = request.args.get('page', default=1, type=int)          #Reads page query param for pagination.
-        per_page = request.args.get('per_page', default=10, type=int)   #(items per page). Defaults to 10
+    # --- Pagination ---
+    paginated = task_rows(query).order_by(Task.due_date.asc()).paginate(page=page, per_page=per_page, error_out=False)
+    # Orders query results by due_date ascending (soonest due first)
+    # then uses SQLAlchemy/Flask-SQLAlchemy paginate to get a page object containing only the requested slice of results.
+    # error_out=False prevents 404 on out-of-range pages — it returns an empty list instead.
+    tasks = serialize_task_rows(paginated.items)
+    # Selects plain column tuples (no ORM objects) and serializes them into the same dicts as Task.to_dict().
 
-        # --- Base query ---
-        query = Task.query.filter_by(user_id=user_id)   #selecting tasks that belong to this user_id.
+    return success_response(
+        data={
+            "tasks": tasks,
+            "page": page,
+            "total_pages": paginated.pages,
+            "total_tasks": paginated.total
+        },
+        message="Tasks fetched successfully"
+    )
 
-        # --- Apply filters ---
-        if status:
-            try:
-                query = query.filter(Task.status == StatusEnum(status.upper())) #filter tasks whose status equals that enum value, StatusEnum(status.upper()) — converts text like "completed" -> "COMPLETED" and into the Enum member.
-            except ValueError:
-                return error_response(f"Invalid status '{status}'.", 400)
 
-        if priority:
-            try:
-                query = query.filter(Task.priority == PriorityEnum(priority.upper())) #same as above 
-            except ValueError:
-                return error_response(f"Invalid priority '{priority}'.", 400)
 
-        if search:
-            query = query.filter(Task.title.ilike(f"%{search}%")) #Adds a case-insensitive LIKE filter on title. This will return tasks whose title contains the search substring.
 
-        # --- Pagination ---
-        paginated = query.order_by(Task.due_date.asc()).paginate(page=page, per_page=per_page, error_out=False)
-        # Orders query results by due_date ascending (soonest due first)
-        # then uses SQLAlchemy/Flask-SQLAlchemy paginate to get a page object containing only the requested slice of results.
-        # error_out=False prevents 404 on out-of-range pages — it returns an empty list instead.
-        tasks = [task.to_dict() for task in paginated.items]
-        # Serializes each Task model instance into a dictionary using your model's to_dict() method (so JSON is safe to return).
+#**************************************************************************************************
 
-        return success_response(
-            data={
-                "tasks": tasks,
-                "page": page,
-                "total_pages": paginated.pages,
-                "total_tasks": paginated.total
-            },
-            message="Tasks fetched successfully"
+
+# Full-text search over title and description
+@task_bp.route('/search', methods=['GET'])
+@jwt_required()
+@read_replica
+@conditional_task_read
+@route_errors("Failed to search tasks")
+def search_tasks():
+    """
+    Search the user's tasks by title and description, best match first.
+    Every word must match, as a prefix: ?q=rep  finds "Report", "reply".
+    Example: /search?q=expense report&page=1&per_page=10
+    """
+    user_id = get_jwt_identity()
+    term = request.args.get('q', type=str)
+    page = max(request.args.get('page', default=1, type=int), 1)
+    per_page = max(1, min(request.args.get('per_page', default=10, type=int), 100))
+
+    if not task_search.search_terms(term):
+        return error_response("q query parameter required", 400)
+
+    # fetch one extra result to know whether there is a next page
+    results = task_search.search_tasks(user_id, term, limit=per_page + 1, offset=(page - 1) * per_page)
+
+    tasks = []
+    for task, score in results[:per_page]:
+        item = task.to_dict()
+        item['score'] = score
+        tasks.append(item)
+
+    return success_response(
+        data={
+            "tasks": tasks,
+            "page": page,
+            "per_page": per_page,
+            "has_next": len(results) > per_page
+        },
+        message="Search results fetched"
+    )
+
+
+
+#**************************************************************************************************
+
+
+# Export all of the user's tasks as NDJSON or CSV
+@task_bp.route('/export', methods=['GET'])
+@jwt_required()
+@route_errors("Failed to export tasks")
+def export_tasks():
+    """
+    Stream the user's tasks, optionally filtered, as NDJSON (default) or CSV.
+    Rows are read through a server-side cursor in batches of EXPORT_BATCH_SIZE,
+    so memory stays flat whatever the number of tasks.
+    Example: /export?format=csv&status=PENDING&due_before=2025-12-31
+    """
+    user_id = get_jwt_identity()
+    export_format = request.args.get('format', default='ndjson', type=str).lower()
+
+    if export_format not in EXPORT_ENCODERS:
+        return error_response(f"Invalid format '{export_format}'. Use one of: {list(EXPORT_ENCODERS)}", 400)
+
+    try:
+        query = task_queries.filter_tasks(
+            user_id,
+            status=request.args.get('status', type=str),
+            priority=request.args.get('priority', type=str),
+            search=request.args.get('search', type=str),
+            due_after=task_queries.parse_date('due_after', request.args.get('due_after')),
+            due_before=task_queries.parse_date('due_before', request.args.get('due_before'))
         )
+    except ValueError as e:
+        return error_response(str(e), 400)
+
+    rows = task_rows(query).order_by(Task.task_id.asc()).yield_per(current_app.config['EXPORT_BATCH_SIZE'])
+    body = EXPORT_ENCODERS[export_format](map(TaskRowSerializer(), rows))
+
+    return Response(
+        stream_with_context(body),
+        mimetype=EXPORT_MIMETYPES[export_format],
+        headers={"Content-Disposition": f"attachment; filename=tasks.{export_format}"}
+    )
+
+
+
+#**************************************************************************************************
+
 
-    except Exception as e:
-        return error_response(f"Failed to fetch tasks: {str(e)}", 500)
+# Change feed: what changed in the user's tasks since a cursor
+@task_bp.route('/changes', methods=['GET'])
+@jwt_required()
+@read_replica
+@conditional_task_read
+@route_errors("Failed to fetch task changes")
+def get_task_changes():
+    """
+    Created / updated tasks and deleted task ids after ?since=<cursor>, oldest first.
+    Start without `since` (every task, plus the retained deletes), then pass the
+    returned next_cursor each time; keep paging while has_more is true.
+    ?limit= page size (default CHANGES_PAGE_SIZE, at most 1000).
+    A cursor older than the retained deletes gets 410: start over without `since`.
+    """
+    user_id = get_jwt_identity()
+    limit = request.args.get('limit', default=current_app.config['CHANGES_PAGE_SIZE'], type=int)
+    limit = max(1, min(limit, 1000))
+
+    try:
+        rows, next_cursor, has_more = task_changes.changes_page(user_id, request.args.get('since'), limit)
+    except ValueError as e:
+        return error_response(str(e), 400)
+    except LookupError as e:
+        return error_response(f"{str(e)} Sync again without `since`.", 410)
+
+    serialize = TaskRowSerializer()
+    changes = []
+    for kind, row, change_seq, changed_at, created in rows:
+        change = {"op": kind, "seq": change_seq}
+        if kind == "upsert":
+            change["task_id"] = row[0]
+            change["created"] = created
+            change["task"] = serialize(row)
+            change["updated_at"] = changed_at.isoformat() if changed_at else None
+        else:
+            change["task_id"] = row
+            change["deleted_at"] = changed_at.isoformat()
+        changes.append(change)
+
+    return success_response(
+        data={
+            "changes": changes,
+            "next_cursor": next_cursor,
+            "has_more": has_more
+        },
+        message="Task changes fetched"
+    )
+
+
+
+#**************************************************************************************************
+
+
+# Live task events (Server-Sent Events) instead of polling the read endpoints
+@task_bp.route('/events', methods=['GET'])
+@jwt_required()
+@route_errors("Failed to open task events")
+def task_event_stream():
+    """
+    text/event-stream of the user's task changes as they are committed:
+    task.created / task.updated / task.deleted (same payloads as /changes),
+    then a `stats` event with the recomputed counts and their delta.
+    Every event id is a change feed cursor: reconnecting with Last-Event-ID
+    (or ?last_event_id=) replays what was missed. A comment line is sent
+    every EVENTS_HEARTBEAT seconds of silence; the stream ends with a
+    `token-expired` event when the access token expires.
+    """
+    user_id = get_jwt_identity()
+    cursor = request.headers.get('Last-Event-ID') or request.args.get('last_event_id') or None
+    if cursor is not None:
+        try:
+            task_events.check_cursor(cursor)
+        except ValueError as e:
+            return error_response(str(e), 400)
+
+    body = task_events.event_stream(
+        user_id,
+        cursor,
+        expires_at=get_jwt().get('exp'),
+        heartbeat=current_app.config['EVENTS_HEARTBEAT'],
+        page_size=current_app.config['CHANGES_PAGE_SIZE']
+    )
+    return Response(
+        stream_with_context(body),
+        mimetype='text/event-stream',
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 
@@ -78,21 +278,21 @@ def get_tasks():
 # Get one task of the user
 @task_bp.route('/<int:task_id>',methods=['GET'])
 @jwt_required()
+@read_replica
+@conditional_task_read
+@route_errors("Failed to fetch task")
 def get_one_task(task_id):
-    try:
-        user_id = get_jwt_identity()
-        task = Task.query.filter_by(task_id=task_id, user_id=user_id).first()
+    user_id = get_jwt_identity()
+    task = Task.query.filter_by(task_id=task_id, user_id=user_id).first()
 
-        if not task:
-            return error_response('Task not found', 404)
+    if not task:
+        return error_response('Task not found', 404)
 
-        return success_response(
-            data=task.to_dict(),
-            message="Task fetched successfully"
-        )
+    return success_response(
+        data=task.to_dict(),
+        message="Task fetched successfully"
+    )
 
-    except Exception as e:
-        return error_response(f"Failed to fetch task: {str(e)}", 500)
 
 
 #**************************************************************************************************
@@ -101,22 +301,19 @@ def get_one_task(task_id):
 # GET /overdue - tasks that are overdue (and not completed/cancelled)
 @task_bp.route('/overdue', methods=['GET'])
 @jwt_required()
+@read_replica
+@conditional_task_read
+@route_errors("Failed to fetch overdue tasks")
 def get_overdue_tasks():
-    try:
-        user_id = get_jwt_identity()
-        # Fetch tasks that belong to user, have a due_date before today,
-        # and are not COMPLETED or CANCELLED
-        overdue_tasks = Task.query.filter(
-            Task.user_id == user_id,
-            Task.due_date != None,             #must have a due date set.
-            Task.due_date < date.today(),      #due date is in the past.
-            Task.status.notin_([StatusEnum.COMPLETED, StatusEnum.CANCELLED])
-        ).order_by(Task.due_date.asc()).all()
+    user_id = get_jwt_identity()
+    # Fetch tasks that belong to user, have a due_date before today,
+    # and are not COMPLETED or CANCELLED
+    # (served by the partial index ix_tasks_user_open_due_date)
+    today = date.today()
+    overdue_tasks = task_rows(task_queries.overdue_tasks(user_id, today)).all()
 
-        data = [t.to_dict() for t in overdue_tasks]     #sort soonest-overdue first, fetch all results.
-        return success_response(data=data, message="Overdue tasks fetched")
-    except Exception as e:
-        return error_response(f"Failed to fetch overdue tasks: {str(e)}", 500)
+    data = serialize_task_rows(overdue_tasks, today)     #sort soonest-overdue first, fetch all results.
+    return success_response(data=data, message="Overdue tasks fetched")
 
 
 #**************************************************************************************************
@@ -124,19 +321,15 @@ def get_overdue_tasks():
 # GET /today - tasks due today
 @task_bp.route('/today', methods=['GET'])
 @jwt_required()
+@read_replica
+@conditional_task_read
+@route_errors("Failed to fetch today's tasks")
 def get_today_tasks():
-    try:
-        user_id = get_jwt_identity()
-        today = date.today()
-        today_tasks = Task.query.filter(
-            Task.user_id == user_id,
-            Task.due_date != None,
-            Task.due_date == date.today()
-        ).order_by(Task.due_date.asc()).all()
+    user_id = get_jwt_identity()
+    today = date.today()
+    today_tasks = task_rows(task_queries.today_tasks(user_id, today)).all()
 
-        return success_response(data=[t.to_dict() for t in today_tasks], message="Today's tasks fetched")
-    except Exception as e:
-        return error_response(f"Failed to fetch today's tasks: {str(e)}", 500)
+    return success_response(data=serialize_task_rows(today_tasks, today), message="Today's tasks fetched")
 
 
 #**************************************************************************************************
@@ -144,38 +337,23 @@ def get_today_tasks():
 # GET /stats - simple stats (counts by status + overdue count)
 @task_bp.route('/stats', methods=['GET'])
 @jwt_required()
+@read_replica
+@conditional_task_read
+@route_errors("Failed to fetch stats")
 def get_task_stats():
-    try:
-        user_id = get_jwt_identity()
-        # Count tasks grouped by status
-        status_counts = db.session.query(
-            Task.status, func.count(Task.task_id)
-        ).filter_by(user_id=user_id).group_by(Task.status).all()   
-
-        # Build dict: { 'PENDING': 10, 'COMPLETED': 4, ... }
-        status_summary = {status.value 
-                            if hasattr(status, 'value') 
-                            else str(status): 
-                            count
-                        for status, count in status_counts}
-
-        # total overdue
-        overdue_count = Task.query.filter(
-            Task.user_id == user_id,
-            Task.due_date != None,
-            Task.due_date < date.today(),
-            Task.status.notin_([StatusEnum.COMPLETED, StatusEnum.CANCELLED])
-        ).count()
+    user_id = get_jwt_identity()
+    # Counts come from the incrementally maintained task_stats row (primary-key read)
+    # plus the open-task due-date buckets before today, in one statement.
+    # Build dict: { 'PENDING': 10, 'COMPLETED': 4, ... }
+    status_summary, overdue_count = task_counters.read_stats(user_id, date.today())
 
-        return success_response(
-            data={
-                "status_counts": status_summary,
-                "overdue_count": overdue_count
-            },
-            message="Task stats fetched"
-        )
-    except Exception as e:
-        return error_response(f"Failed to fetch stats: {str(e)}", 500)
+    return success_response(
+        data={
+            "status_counts": status_summary,
+            "overdue_count": overdue_count
+        },
+        message="Task stats fetched"
+    )
 
 
 #**************************************************************************************************
@@ -183,34 +361,28 @@ def get_task_stats():
 # GET /recent - recent tasks created (optionally limit via ?limit=5)
 @task_bp.route('/recent', methods=['GET'])
 @jwt_required()
+@read_replica
+@conditional_task_read
+@route_errors("Failed to fetch recent tasks")
 def get_recent_tasks():
     """
     Get the most recent tasks for the logged-in user.
     Ordered by task_id DESC (newest first) and limited by ?limit=.
     Example: /recent?limit=5
     """
-    try:
-        user_id = get_jwt_identity()
+    user_id = get_jwt_identity()
         
-        # Read 'limit' from query string, default to 5
-        limit = request.args.get('limit', default=5, type=int)
-
-        # Query user's tasks, order by descending task_id, and limit results
-        recent_tasks = (
-            Task.query
-            .filter_by(user_id=user_id)
-            .order_by(Task.task_id.desc())
-            .limit(limit)
-            .all()
-        )
+    # Read 'limit' from query string, default to 5
+    limit = request.args.get('limit', default=5, type=int)
 
-        # Convert to dictionaries for JSON response
-        data = [task.to_dict() for task in recent_tasks]
+    # Query user's tasks, order by descending task_id, and limit results
+    recent_tasks = task_rows(task_queries.recent_tasks(user_id, limit)).all()
 
-        return success_response(data=data, message="Recent tasks fetched successfully")
+    # Convert to dictionaries for JSON response
+    data = serialize_task_rows(recent_tasks)
+
+    return success_response(data=data, message="Recent tasks fetched successfully")
 
-    except Exception as e:
-        return error_response(f"Failed to fetch recent tasks: {str(e)}", 500)
 
 
 #**************************************************************************************************
@@ -220,38 +392,30 @@ def get_recent_tasks():
 # It deliberately excludes everything that’s already due or overdue.
 @task_bp.route('/upcoming', methods=['GET'])
 @jwt_required()
+@read_replica
+@conditional_task_read
+@route_errors("Failed to fetch upcoming tasks")
 def get_upcoming_tasks():
     """
     Get all upcoming tasks (due after today) for the logged-in user.
     Example: GET /user/tasks/upcoming
     """
-    try:
-        user_id = get_jwt_identity()
+    user_id = get_jwt_identity()
 
-        # today's date
-        today = date.today()
-
-        # fetch tasks that are due after today
-        upcoming_tasks = (
-            Task.query
-            .filter(
-                Task.user_id == user_id,
-                Task.due_date != None,  # only consider tasks with a due date
-                Task.due_date > today   # due date is in the future
-            )
-            .order_by(Task.due_date.asc())  # sort earliest upcoming first
-            .all()
-        )
+    # today's date
+    today = date.today()
 
-        data = [task.to_dict() for task in upcoming_tasks]
+    # fetch tasks that are due after today
+    # only tasks with a due date in the future, sorted earliest upcoming first
+    upcoming_tasks = task_rows(task_queries.upcoming_tasks(user_id, today)).all()
 
-        return success_response(
-            data=data,
-            message="Upcoming tasks fetched successfully"
-        )
+    data = serialize_task_rows(upcoming_tasks, today)
+
+    return success_response(
+        data=data,
+        message="Upcoming tasks fetched successfully"
+    )
 
-    except Exception as e:
-        return error_response(f"Failed to fetch upcoming tasks: {str(e)}", 500)
 
 
 #**************************************************************************************************
@@ -292,16 +456,148 @@ def create_task():
 
 
 
+#**************************************************************************************************
+
+
+# Create many tasks in one request
+@task_bp.route('/bulk', methods=['POST'])
+@jwt_required()
+@route_errors("Failed to create tasks")
+def bulk_create_tasks():
+    """
+    Create many tasks at once.
+    Body: a JSON list of task payloads (same fields as POST /), or {"tasks": [...]}.
+    The whole list is validated in one pass, valid items are inserted with one
+    multi-row INSERT per chunk in a single transaction, and invalid items are
+    reported by their index in the list.
+    """
+    user_id = get_jwt_identity()
+    payload = request.get_json(silent=True)
+    items = payload.get('tasks') if isinstance(payload, dict) else payload
+
+    if not isinstance(items, list) or not items:
+        return error_response("Request body must be a non-empty list of tasks", 400)
+
+    max_tasks = current_app.config['BULK_MAX_TASKS']
+    if len(items) > max_tasks:
+        return error_response(f"At most {max_tasks} tasks can be created per request", 413)
+
+    valid, errors = task_bulk.validate_task_list(items)
+    if not valid:
+        return error_response('Validation failed', 400, errors=errors)
+
+    task_ids = task_bulk.insert_tasks(
+        user_id, [data for _, data in valid], current_app.config['BULK_CHUNK_SIZE']
+    )
+    db.session.commit()
+
+    return success_response(
+        data={
+            "created": len(valid),
+            "task_ids": task_ids,
+            "failed": len(errors),
+            "errors": errors
+        },
+        message=f"Created {len(valid)} tasks",
+        status_code=201
+    )
+
+
+
+# Import tasks from an NDJSON / CSV request body
+@task_bp.route('/import', methods=['POST'])
+@jwt_required()
+@route_errors("Failed to import tasks")
+def import_tasks():
+    """
+    Stream tasks in from an NDJSON (one task object per line) or CSV (header row) body.
+    The body is read incrementally; every BULK_CHUNK_SIZE records are validated,
+    inserted and committed as one batch. Errors are reported by line number.
+    Format comes from ?format= or the Content-Type; ?resume_from=<line> skips
+    lines already committed by an earlier, interrupted import.
+    """
+    user_id = get_jwt_identity()
+    import_format = request.args.get('format', type=str)
+    if not import_format:
+        import_format = 'csv' if request.mimetype == 'text/csv' else 'ndjson'
+    import_format = import_format.lower()
+
+    if import_format not in IMPORT_FORMATS:
+        return error_response(f"Invalid format '{import_format}'. Use one of: {list(IMPORT_FORMATS)}", 400)
+
+    summary = import_task_stream(
+        user_id,
+        request.stream,
+        import_format,
+        batch_size=current_app.config['BULK_CHUNK_SIZE'],
+        resume_from=request.args.get('resume_from', default=0, type=int)
+    )
+
+    return success_response(
+        data=summary.to_dict(),
+        message=f"Imported {summary.imported} tasks",
+        status_code=201 if summary.imported else 200
+    )
+
+
+
+# Update many tasks of the user with one statement
+@task_bp.route('/bulk', methods=['PATCH'])
+@jwt_required()
+@route_errors("Failed to update tasks")
+def bulk_update_tasks():
+    """
+    Apply the same field changes to many tasks with a single UPDATE.
+    Body: {"task_ids": [...]} or {"filter": {status, priority, search, due_after, due_before}},
+    plus {"changes": {...}} and optional "return_rows": true.
+    """
+    try:
+        user_id = get_jwt_identity()
+        data = TaskBulkUpdateSchema(**(request.get_json(silent=True) or {}))
+
+        if data.task_ids is not None:
+            clauses = [Task.user_id == user_id, Task.task_id.in_(data.task_ids)]
+        else:
+            try:
+                clauses = task_queries.task_filter_clauses(user_id, **data.filter.model_dump())
+            except ValueError as e:
+                return error_response(str(e), 400)
+
+        updated, tasks = task_bulk.update_tasks(
+            user_id, clauses, data.changes.model_dump(exclude_none=True), return_rows=data.return_rows
+        )
+        db.session.commit()
+
+        response = {"updated": updated}
+        if tasks is not None:
+            response["tasks"] = [task.to_dict() for task in tasks]
+
+        return success_response(data=response, message=f"Updated {updated} tasks")
+
+    except ValidationError as e:
+        errors = [{
+            'field': '.'.join(str(part) for part in error['loc']) or 'unknown',
+            'message': error['msg'],
+            'type': error['type']
+        } for error in e.errors()]
+        return error_response('Validation failed', 400, errors=errors)
+
+
+
 # Update one task of the user
 @task_bp.route('/<int:task_id>',methods=['PUT'])
 @jwt_required()
+@route_errors("Failed to update task")
 def update_task(task_id):
    try:
         user_id = get_jwt_identity()
-        # Find task
-        task = Task.query.filter_by(task_id=task_id, user_id=user_id).first()
+        # Find task - under the user's write lock, so the counter deltas of the
+        # flush start from the row as it is now, not as a concurrent write left it
+        task_versions.lock_user(user_id)
+        task = task_versions.lock_rows(Task.query.filter_by(task_id=task_id, user_id=user_id)).first()
         
         if not task:
+            db.session.rollback()
             return error_response('Task not found', 404)
         
         # Validate request data
@@ -328,9 +624,9 @@ def update_task(task_id):
         )
         
    except ValidationError as e:
+        db.session.rollback()
         # Formatng validation errors properly
         errors = []
-        print(e.errors())
         for error in e.errors():
             errors.append({
                 'field': error['loc'][0] if error['loc'] else 'unknown',
@@ -339,9 +635,6 @@ def update_task(task_id):
             })
         return error_response('Validation failed', 400, errors=errors)
     
-   except Exception as e:
-        db.session.rollback()
-        return error_response(f'Failed to update task: {str(e)}', 500)
 
     
 
@@ -349,50 +642,71 @@ def update_task(task_id):
 # Delete one task of the user
 @task_bp.route('/<int:task_id>',methods=['DELETE'])
 @jwt_required()
+@route_errors("Failed to delete task")
 def delete_task(task_id):
-    try:
-        user_id = get_jwt_identity()
-        task = Task.query.filter_by(task_id=task_id, user_id=user_id).first()
-        print(task)
+    user_id = get_jwt_identity()
+    # under the user's write lock, as in update_task
+    task_versions.lock_user(user_id)
+    task = task_versions.lock_rows(Task.query.filter_by(task_id=task_id, user_id=user_id)).first()
         
-        if not task:
-            return error_response('Task not found', 404)
+    if not task:
+        db.session.rollback()
+        return error_response('Task not found', 404)
         
-        db.session.delete(task)
-        db.session.commit()
+    db.session.delete(task)
+    db.session.commit()
         
-        return success_response(
-            message='Task deleted successfully'
-        )
+    return success_response(
+        message='Task deleted successfully'
+    )
         
-    except Exception as e:
-        db.session.rollback()
-        return error_response(f'Failed to delete task: {str(e)}', 500)
 
 
 # Delete multiple tasks of the user
 @task_bp.route('/bulk_delete', methods=['DELETE'])
 @jwt_required()
+@route_errors("Failed to delete tasks")
 def bulk_delete():
+    """
+    Delete many tasks with chunked, set-based DELETE statements.
+    Either ?task_ids=1,2,3 (query string, kept for old clients), or a JSON body
+    {"task_ids": [...]} / {"filter": {status, priority, search, due_after, due_before, start_before}}.
+    Each chunk of BULK_CHUNK_SIZE tasks is committed on its own.
+    """
     try:
         user_id = get_jwt_identity()
+        chunk_size = current_app.config['BULK_CHUNK_SIZE']
         ids_str = request.args.get('task_ids')
-
-        if not ids_str:
-            return error_response("task_ids query parameter required", 400)
-
-        task_ids = [int(i) for i in ids_str.split(',')]
-        tasks = Task.query.filter(Task.task_id.in_(task_ids), Task.user_id == user_id).all()
-
-        if not tasks:
+        body = request.get_json(silent=True)
+
+        if ids_str:
+            task_ids = [int(i) for i in ids_str.split(',')]
+            clauses = [Task.user_id == user_id]
+        elif body:
+            data = TaskBulkDeleteSchema(**body)
+            task_ids = data.task_ids
+            if data.filter is not None:
+                try:
+                    clauses = task_queries.task_filter_clauses(user_id, **data.filter.model_dump())
+                except ValueError as e:
+                    return error_response(str(e), 400)
+            else:
+                clauses = [Task.user_id == user_id]
+        else:
+            return error_response("task_ids query parameter or JSON body required", 400)
+
+        deleted = task_bulk.delete_tasks(user_id, clauses, chunk_size, task_ids=task_ids)
+
+        if not deleted:
             return error_response("No valid tasks found to delete", 404)
 
-        for task in tasks:
-            db.session.delete(task)
-        db.session.commit()
+        return success_response(data={"deleted": deleted}, message=f"Deleted {deleted} tasks")
 
-        return success_response(message=f"Deleted {len(tasks)} tasks")
+    except ValidationError as e:
+        errors = [{
+            'field': '.'.join(str(part) for part in error['loc']) or 'unknown',
+            'message': error['msg'],
+            'type': error['type']
+        } for error in e.errors()]
+        return error_response('Validation failed', 400, errors=errors)
 
-    except Exception as e:
-        db.session.rollback()
-        return error_response(f"Failed to delete tasks: {str(e)}", 500)
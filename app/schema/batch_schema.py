@@ -0,0 +1,29 @@
+from pydantic import BaseModel, validator, Field
+from typing import Any, Dict, List, Optional
+
+BATCH_METHODS = ('GET', 'POST', 'PUT', 'PATCH', 'DELETE')
+
+
+class BatchOperationSchema(BaseModel):
+    method: str = 'GET'
+    path: str = Field(..., min_length=1)            # e.g. "/user/tasks/today" or "/user/tasks/?status=PENDING"
+    body: Optional[Any] = None                      # JSON body of the sub-request
+    headers: Optional[Dict[str, str]] = None        # e.g. {"If-None-Match": "..."}
+
+    @validator('method')
+    def validate_method(cls, value):
+        value = value.upper()
+        if value not in BATCH_METHODS:
+            raise ValueError(f'Method must be one of: {list(BATCH_METHODS)}')
+        return value
+
+    @validator('path')
+    def validate_path(cls, value):
+        if not value.startswith('/'):
+            raise ValueError("Path must start with '/'.")
+        return value
+
+
+class BatchSchema(BaseModel):
+    requests: List[BatchOperationSchema] = Field(..., min_length=1)
+    atomic: bool = False            # all writes in one transaction, stop at the first failure
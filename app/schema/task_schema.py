@@ -1,5 +1,5 @@
-from pydantic import BaseModel, validator , Field
-from typing import Optional
+from pydantic import BaseModel, validator , Field, model_validator
+from typing import Optional, List
 from datetime import date
 from app.models.task import PriorityEnum, StatusEnum
 
@@ -66,3 +66,43 @@ class TaskReadSchema(BaseModel):
 
 
 
+
+class TaskFilterSchema(BaseModel):
+    status: Optional[str] = None
+    priority: Optional[str] = None
+    search: Optional[str] = None
+    due_after: Optional[date] = None
+    due_before: Optional[date] = None
+    start_before: Optional[date] = None
+
+
+
+class TaskBulkUpdateSchema(BaseModel):
+    task_ids: Optional[List[int]] = None
+    filter: Optional[TaskFilterSchema] = None
+    changes: TaskUpdateSchema
+    return_rows: bool = False
+
+    @model_validator(mode='after')
+    def validate_target(self):
+        if (self.task_ids is None) == (self.filter is None):
+            raise ValueError('Provide exactly one of task_ids or filter.')
+        if self.task_ids is not None and not self.task_ids:
+            raise ValueError('task_ids must not be empty.')
+        if not self.changes.model_dump(exclude_none=True):
+            raise ValueError('changes must set at least one field.')
+        return self
+
+
+
+class TaskBulkDeleteSchema(BaseModel):
+    task_ids: Optional[List[int]] = None
+    filter: Optional[TaskFilterSchema] = None
+
+    @model_validator(mode='after')
+    def validate_target(self):
+        if (self.task_ids is None) == (self.filter is None):
+            raise ValueError('Provide exactly one of task_ids or filter.')
+        if self.task_ids is not None and not self.task_ids:
+            raise ValueError('task_ids must not be empty.')
+        return self
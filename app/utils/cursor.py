@@ -0,0 +1,63 @@
+import base64
+import hashlib
+import hmac
+import json
+
+# Key of the signed (scoped) cursors, set from JWT_SECRET_KEY by init_cursors
+_signing_key = b''
+
+
+def init_cursors(app):
+    """Sign scoped cursors with the app's JWT_SECRET_KEY"""
+    global _signing_key
+    _signing_key = app.config['JWT_SECRET_KEY'].encode('utf-8')
+
+
+def _b64(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def _signature(body: str, scope) -> str:
+    digest = hmac.new(_signing_key, f'{scope}:{body}'.encode('utf-8'), hashlib.sha256).digest()
+    return _b64(digest[:12])
+
+
+def encode_cursor(values: dict, scope=None) -> str:
+    """
+    Encode keyset values into an opaque, URL-safe cursor string
+
+    Args:
+        values: JSON-serializable dict identifying the last row of a page
+        scope: when given (e.g. the user id), the cursor is signed and only
+            decodes again with the same scope
+
+    Returns:
+        Cursor string to hand back to the client as `next_cursor`
+    """
+    cursor = _b64(json.dumps(values, separators=(',', ':')).encode('utf-8'))
+    if scope is not None:
+        cursor += '.' + _signature(cursor, scope)
+    return cursor
+
+
+def decode_cursor(cursor: str, scope=None) -> dict:
+    """
+    Decode a cursor produced by encode_cursor with the same scope
+
+    Raises:
+        ValueError: if the cursor is malformed, altered or of another scope
+    """
+    if scope is not None:
+        cursor, _, signature = cursor.partition('.')
+        if not hmac.compare_digest(signature, _signature(cursor, scope)):
+            raise ValueError('Invalid cursor.')
+
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, UnicodeError):
+        raise ValueError('Invalid cursor.')
+
+    if not isinstance(values, dict):
+        raise ValueError('Invalid cursor.')
+    return values
@@ -0,0 +1,74 @@
+from contextlib import nullcontext
+from functools import wraps
+from datetime import date
+from flask import request, make_response, current_app
+from flask_jwt_extended import get_jwt_identity
+from app.utils.cache import LRUCache
+from app.utils.replica import on_primary, replica_behind
+from app.utils.task_versions import current_version
+
+# Conditional GET + optional response cache for the task read endpoints.
+# The ETag is the user's data version plus today's date (/today and /overdue
+# change at midnight without any write), so a matching If-None-Match is
+# answered with 304 after a single primary-key read of task_versions.
+# The version is always read on the primary: a lagging replica would hand
+# out (and match) the ETag of data the user has already changed.
+
+response_cache = LRUCache(0)
+
+
+def init_response_cache(app):
+    """Size the in-process response cache from RESPONSE_CACHE_SIZE (0 = disabled)"""
+    response_cache.maxsize = app.config.get('RESPONSE_CACHE_SIZE', 0)
+    response_cache.clear()
+
+
+def task_etag(user_id, version, today):
+    return f'W/"{user_id}.{version}.{today.strftime("%Y%m%d")}"'
+
+
+def etag_matches(header, etag):
+    """Whether an If-None-Match header value matches `etag`"""
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    return etag in [tag.strip() for tag in header.split(',')]
+
+
+def conditional_task_read(view):
+    """
+    Decorator for task read endpoints (apply below @jwt_required()).
+    Adds an ETag, answers If-None-Match with 304, and serves repeated
+    identical reads from the response cache when it is enabled.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        user_id = get_jwt_identity()
+        with on_primary():
+            version = current_version(user_id)
+        etag = task_etag(user_id, version, date.today())
+
+        if etag_matches(request.headers.get('If-None-Match'), etag):
+            response = current_app.response_class(status=304)
+            response.headers['ETag'] = etag
+            return response
+
+        key = (user_id, request.endpoint, tuple(sorted(request.args.items(multi=True))), etag)
+        cached = response_cache.get(key)
+        if cached is not None:
+            body, status, mimetype = cached
+            response = current_app.response_class(body, status=status, mimetype=mimetype)
+        else:
+            # the body must match the ETag: while the replica lags, build it on the primary
+            with on_primary() if replica_behind(user_id, version) else nullcontext():
+                response = make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                response_cache.set(key, (response.get_data(), response.status_code, response.mimetype))
+
+        if response.status_code == 200:
+            response.headers['ETag'] = etag
+            response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+
+    return wrapper
@@ -0,0 +1,30 @@
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional dependency, fall back to the stdlib encoder
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider encoding responses with orjson. Output matches the
+    default provider (sorted keys, compact); anything orjson cannot encode
+    natively goes through DefaultJSONProvider.default.
+    """
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=orjson.OPT_SORT_KEYS).decode('utf-8')
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        dumped = orjson.dumps(obj, default=self.default, option=orjson.OPT_SORT_KEYS | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(dumped, mimetype=self.mimetype)
+
+
+def init_json_provider(app):
+    """Use orjson for jsonify / success_response when it is installed"""
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
@@ -1,9 +1,48 @@
-from flask_jwt_extended import create_access_token,decode_token
-from datetime import timedelta
+from flask_jwt_extended import create_access_token,create_refresh_token,decode_token
+from datetime import timedelta, datetime, timezone
+from app import db
 
 def generate_jwt(user_id, expires_delta=timedelta(hours=1)):
     """
     Generate a JWT token for a given user ID with an expiration time.
     """
     access_token = create_access_token(identity=user_id, expires_delta=expires_delta)
-    return access_token
\ No newline at end of file
+    return access_token
+
+
+def generate_refresh_jwt(user_id, expires_delta=timedelta(days=30)):
+    """
+    Generate a long-lived refresh token, exchanged at /auth/refresh for new access tokens.
+    """
+    refresh_token = create_refresh_token(identity=user_id, expires_delta=expires_delta)
+    return refresh_token
+
+
+def revoke_token(jwt_payload):
+    """
+    Add a refresh token to the revocation store (caller commits).
+    """
+    from app.models import RevokedToken
+    db.session.merge(RevokedToken(
+        jti=jwt_payload['jti'],
+        user_id=int(jwt_payload['sub']),
+        expires_at=datetime.fromtimestamp(jwt_payload['exp'], tz=timezone.utc).replace(tzinfo=None)
+    ))
+
+
+def is_token_revoked(jwt_header, jwt_payload):
+    """
+    Blocklist check, a single primary-key lookup by jti.
+    Only refresh tokens are checked; access tokens are short-lived and stay stateless,
+    so ordinary requests never pay for the lookup.
+    """
+    if jwt_payload.get('type') != 'refresh':
+        return False
+    from app.models import RevokedToken
+    return db.session.get(RevokedToken, jwt_payload['jti']) is not None
+
+
+def register_jwt_callbacks(jwt):
+    from app.utils.user_cache import user_lookup
+    jwt.token_in_blocklist_loader(is_token_revoked)
+    jwt.user_lookup_loader(user_lookup)
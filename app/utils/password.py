@@ -0,0 +1,115 @@
+import hashlib
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import bcrypt
+
+# bcrypt hashing / verification off the request threads.
+#
+# Work is sent to a bounded process pool, so a login storm uses at most
+# BCRYPT_POOL_SIZE cores and the Flask workers stay free to serve cheap reads.
+# At most BCRYPT_MAX_PENDING operations may be running or queued; beyond that
+# PasswordHasherBusy is raised at once and the routes answer 503.
+# BCRYPT_POOL_SIZE = 0 runs bcrypt inline (tests / development).
+#
+# Hashes are compatible with the Flask-Bcrypt ones stored before (same config
+# keys, same format); this is the only hashing configuration of the app.
+
+
+class PasswordHasherBusy(Exception):
+    """Too many password operations in flight; the caller should retry later"""
+
+
+def _prepare(password, handle_long_passwords):
+    password = password.encode('utf-8')
+    if handle_long_passwords:
+        password = hashlib.sha256(password).hexdigest().encode('utf-8')
+    return password
+
+
+def _hash_password(password, rounds, prefix, handle_long_passwords):
+    salt = bcrypt.gensalt(rounds=rounds, prefix=prefix.encode('utf-8'))
+    return bcrypt.hashpw(_prepare(password, handle_long_passwords), salt).decode('utf-8')
+
+
+def _check_password(password_hash, password, handle_long_passwords):
+    return bcrypt.checkpw(_prepare(password, handle_long_passwords), password_hash.encode('utf-8'))
+
+
+def hash_rounds(password_hash):
+    """Cost factor stored in a bcrypt hash ($2b$<rounds>$...), None if unparseable"""
+    try:
+        return int(password_hash.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+class PasswordHasher:
+
+    def __init__(self, app=None):
+        self.rounds = 12
+        self.prefix = '2b'
+        self.handle_long_passwords = False
+        self.pool_size = 0
+        self.max_pending = 0
+        self._executor = None
+        self._slots = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.rounds = app.config.get('BCRYPT_LOG_ROUNDS', 12)
+        self.prefix = app.config.get('BCRYPT_HASH_PREFIX', '2b')
+        self.handle_long_passwords = app.config.get('BCRYPT_HANDLE_LONG_PASSWORDS', False)
+        self.pool_size = app.config.get('BCRYPT_POOL_SIZE', 0)
+        self.max_pending = app.config.get('BCRYPT_MAX_PENDING', 0) or self.pool_size * 4
+        self._slots = threading.BoundedSemaphore(self.max_pending) if self.pool_size else None
+
+    def _pool(self):
+        # created lazily, so importing / forking the app never starts processes
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.pool_size,
+                        mp_context=multiprocessing.get_context('spawn')
+                    )
+        return self._executor
+
+    def _run(self, fn, *args):
+        if not self.pool_size:
+            return fn(*args)
+
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHasherBusy()
+        try:
+            future = self._pool().submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result()
+
+    def hash(self, password):
+        if not password:
+            raise ValueError('Password must be non-empty.')
+        return self._run(_hash_password, password, self.rounds, self.prefix, self.handle_long_passwords)
+
+    def check(self, password_hash, password):
+        if not password_hash or not password:
+            return False
+        return self._run(_check_password, password_hash, password, self.handle_long_passwords)
+
+    def needs_rehash(self, password_hash):
+        """True when the hash was made with a different cost than the configured one"""
+        return hash_rounds(password_hash) != self.rounds
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,188 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import event, text
+
+from app import db
+from app.database import REPLICA_BIND, USE_REPLICA, init_sqlite_profile
+from app.utils.cache import LRUCache
+from app.utils.task_versions import on_commit, current_version
+
+# Read-replica routing for the read-only task endpoints.
+#
+# Handlers decorated with @read_replica run with the session flagged for the
+# replica bind, so their SELECTs go to REPLICA_DATABASE_URL. A request stays
+# on the primary when
+#   - no replica is configured,
+#   - the user wrote tasks in this process within the last
+#     REPLICA_READ_YOUR_WRITES seconds (read-your-writes window), or
+#   - the replica failed its last health check (re-checked every
+#     REPLICA_HEALTH_INTERVAL seconds, and marked down on connection errors).
+#
+# Task writes start the window once their transaction commits
+# (task_versions.on_commit). The window only covers writes made through
+# this process; for the rest, conditional_task_read (app.utils.etag) reads
+# the user's data version on the primary and builds the response there
+# while the replica has not reached it (replica_behind).
+
+logger = logging.getLogger(__name__)
+
+# session.info flag keeping the rest of the request on the primary (POST /batch with writes)
+PIN_PRIMARY = 'pin_primary'
+
+recent_writers = LRUCache(0)
+
+
+class ReplicaHealth:
+    """Cached replica liveness, re-checked at most once per interval"""
+
+    def __init__(self, interval=10):
+        self.interval = interval
+        self.healthy = True
+        self.checked_at = None
+        self.last_error = None
+        self._lock = threading.Lock()
+
+    def mark_down(self, error):
+        with self._lock:
+            self.checked_at = time.monotonic()
+        self._record(False, str(error))
+
+    def _due(self):
+        """Whether a new check is due (claims it); otherwise the cached state stands"""
+        with self._lock:
+            if self.checked_at is not None and time.monotonic() - self.checked_at < self.interval:
+                return False
+            self.checked_at = time.monotonic()
+            return True
+
+    def _record(self, healthy, error):
+        with self._lock:
+            went_down = self.healthy and not healthy
+            self.healthy, self.last_error = healthy, error
+        if went_down:
+            logger.warning("Read replica marked down, reading the primary: %s", error)
+        return healthy
+
+    def is_healthy(self, engine):
+        if not self._due():
+            return self.healthy
+        try:
+            with engine.connect() as connection:
+                connection.execute(text('SELECT 1'))
+        except Exception as e:
+            return self._record(False, str(e))
+        return self._record(True, None)
+
+    async def is_healthy_async(self, engine):
+        """is_healthy() for an AsyncEngine (async read path)"""
+        if not self._due():
+            return self.healthy
+        try:
+            async with engine.connect() as connection:
+                await connection.execute(text('SELECT 1'))
+        except Exception as e:
+            return self._record(False, str(e))
+        return self._record(True, None)
+
+    def status(self):
+        # last_error stays internal: driver messages name hosts and users
+        with self._lock:
+            return {'healthy': self.healthy}
+
+
+replica_health = ReplicaHealth()
+
+
+def _replica_engine():
+    return db.engines.get(REPLICA_BIND)
+
+
+def _mark_written(user_ids):
+    for user_id in user_ids:
+        recent_writers.set(int(user_id), True)
+
+
+def _replica_error(context):
+    if context.is_disconnect or context.connection is None:
+        replica_health.mark_down(context.original_exception)
+
+
+def watch_replica_errors(engine):
+    """Mark the replica down when `engine` (sync, or an AsyncEngine's sync_engine) loses it"""
+    if not event.contains(engine, 'handle_error', _replica_error):
+        event.listen(engine, 'handle_error', _replica_error)
+
+
+def _recent_writer(user_id):
+    return user_id is not None and bool(recent_writers.get(int(user_id)))
+
+
+def use_replica_for(user_id):
+    """Whether reads for `user_id` may go to the replica right now"""
+    engine = _replica_engine()
+    if engine is None or _recent_writer(user_id):
+        return False
+    return replica_health.is_healthy(engine)
+
+
+async def use_async_replica_for(user_id, engine):
+    """use_replica_for() on the async read path, `engine` being its AsyncEngine of the replica (or None)"""
+    if engine is None or _recent_writer(user_id):
+        return False
+    return await replica_health.is_healthy_async(engine)
+
+
+@contextmanager
+def on_primary(session=None):
+    """Send the block's reads to the primary, also inside a @read_replica handler"""
+    session = session or db.session
+    flagged = session.info.pop(USE_REPLICA, None)
+    try:
+        yield
+    finally:
+        if flagged:
+            session.info[USE_REPLICA] = flagged
+
+
+def replica_behind(user_id, version, session=None):
+    """Whether this request reads from a replica that has not reached the user's primary `version` yet"""
+    session = session or db.session
+    return bool(session.info.get(USE_REPLICA)) and current_version(user_id, session) < version
+
+
+def read_replica(view):
+    """Run a read-only handler against the replica when use_replica_for() allows it"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if db.session.info.get(PIN_PRIMARY) or not use_replica_for(get_jwt_identity()):
+            return view(*args, **kwargs)
+        db.session.info[USE_REPLICA] = True
+        try:
+            return view(*args, **kwargs)
+        finally:
+            db.session.info.pop(USE_REPLICA, None)
+    return wrapper
+
+
+def init_replica(app):
+    """Hook up the replica bind (when configured) and the read-your-writes bookkeeping"""
+    recent_writers.maxsize = 100000
+    recent_writers.ttl = app.config.get('REPLICA_READ_YOUR_WRITES', 5)
+    recent_writers.clear()
+    replica_health.interval = app.config.get('REPLICA_HEALTH_INTERVAL', 10)
+
+    with app.app_context():
+        engine = _replica_engine()
+        if engine is None:
+            return
+        init_sqlite_profile(app, engine)
+        watch_replica_errors(engine)
+
+    if not recent_writers.ttl:
+        recent_writers.maxsize = 0
+    on_commit(_mark_written)
@@ -1,5 +1,9 @@
+from functools import wraps
 from flask import jsonify
 from typing import Any, Optional
+from werkzeug.exceptions import HTTPException
+from app import db
+from app.utils.write_queue import WriteQueueTimeout
 
 def success_response(data: Any = None, message: str = 'Success', status_code: int = 200):
     """
@@ -49,6 +53,32 @@ def error_response(message: str, status_code: int = 400, errors: Optional[dict]
 
 
 
+def route_errors(message: str):
+    """
+    Turn an unexpected error of a view into a 500 error response
+    
+    The session is rolled back and the error is reported as
+    "<message>: <error>". HTTP errors (abort, 415 ...) and WriteQueueTimeout
+    (503 + Retry-After) are left to their registered handlers.
+    
+    Args:
+        message: What the view failed to do, e.g. 'Failed to fetch tasks'
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                return view(*args, **kwargs)
+            except (HTTPException, WriteQueueTimeout):
+                raise
+            except Exception as e:
+                db.session.rollback()
+                return error_response(f"{message}: {str(e)}", 500)
+        return wrapper
+    return decorator
+
+
+
 def paginated_response(items: list, page: int, per_page: int, total: int, message: str = 'Success'):
     """
     Paginated response format
@@ -79,4 +109,42 @@ def paginated_response(items: list, page: int, per_page: int, total: int, messag
         }
     }
     
-    return jsonify(response), 200
\ No newline at end of file
+    return jsonify(response), 200
+
+
+
+def cursor_paginated_response(items: list, per_page: int, next_cursor: Optional[str] = None,
+                              total: Optional[int] = None, total_is_estimate: bool = False,
+                              message: str = 'Success'):
+    """
+    Cursor (keyset) paginated response format
+    
+    Args:
+        items: List of items for current page
+        per_page: Items per page
+        next_cursor: Opaque cursor for the next page, None on the last page
+        total: Total number of items, only when the client asked for it
+        total_is_estimate: Whether `total` is a planner estimate
+        message: Success message
+    
+    Returns:
+        JSON response with cursor pagination metadata
+    """
+    pagination = {
+        'per_page': per_page,
+        'next_cursor': next_cursor,
+        'has_next': next_cursor is not None
+    }
+
+    if total is not None:
+        pagination['total_items'] = total
+        pagination['total_is_estimate'] = total_is_estimate
+
+    response = {
+        'success': True,
+        'message': message,
+        'data': items,
+        'pagination': pagination
+    }
+    
+    return jsonify(response), 200
@@ -0,0 +1,223 @@
+from app import db
+from app.models.task import Task, StatusEnum, PriorityEnum
+from app.schema.task_schema import TaskCreateSchema
+from app.utils import task_counters, task_versions, task_changes
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import insert, update, delete, func, select
+from collections import Counter
+from datetime import date
+from typing import List
+
+# Set-based task writes. These bypass the ORM unit of work, so each one
+# updates the task counters (task_counters.apply_deltas), bumps the user's
+# data version (task_versions.next_change_seq) and stamps the change feed
+# (change_seq / updated_at, tombstones - app.utils.task_changes) itself.
+
+task_list_adapter = TypeAdapter(List[TaskCreateSchema])
+
+
+def format_errors(errors, index_offset=0):
+    """
+    Flatten pydantic errors from a list-level validation into per-item entries:
+    [{'index': 3, 'field': 'title', 'message': ..., 'type': ...}, ...]
+    """
+    formatted = []
+    for error in errors:
+        loc = error['loc']
+        formatted.append({
+            'index': loc[0] + index_offset if loc and isinstance(loc[0], int) else None,
+            'field': loc[1] if len(loc) > 1 else 'unknown',
+            'message': error['msg'],
+            'type': error['type']
+        })
+    return formatted
+
+
+def validate_task_list(items, index_offset=0):
+    """
+    Validate a list of task payloads in one pass.
+
+    Returns:
+        (valid, errors) - valid is a list of (index, TaskCreateSchema), errors are per item
+    """
+    try:
+        return list(enumerate(task_list_adapter.validate_python(items), start=index_offset)), []
+    except ValidationError as e:
+        errors = format_errors(e.errors(), index_offset)
+
+    # second pass over the items that passed, so they can still be inserted
+    bad = {error['index'] for error in errors}
+    good = [(i + index_offset, item) for i, item in enumerate(items) if i + index_offset not in bad]
+    validated = task_list_adapter.validate_python([item for _, item in good]) if good else []
+    return [(index, data) for (index, _), data in zip(good, validated)], errors
+
+
+def insert_tasks(user_id, tasks, chunk_size):
+    """
+    Insert validated TaskCreateSchema objects with one multi-row INSERT per chunk.
+    Runs inside the caller's transaction (caller commits).
+
+    Returns:
+        list of new task_ids, in the order of `tasks`
+    """
+    bind = db.session.get_bind()
+    returning = bind.dialect.insert_executemany_returning
+    today = date.today()
+    task_ids = []
+    deltas = Counter()
+    seq = task_versions.next_change_seq(user_id)
+    now = task_changes.utcnow()
+
+    for start in range(0, len(tasks), chunk_size):
+        rows = []
+        for data in tasks[start:start + chunk_size]:
+            status = StatusEnum(data.status)
+            rows.append({
+                'title': data.title,
+                'description': data.description,
+                'status': status,
+                'priority': PriorityEnum(data.priority),
+                'start_date': data.start_date or today,
+                'due_date': data.due_date,
+                'user_id': user_id,
+                'created_seq': seq,
+                'change_seq': seq,
+                'updated_at': now
+            })
+            deltas.update(task_counters.contribution(user_id, status, data.due_date))
+
+        if returning:
+            task_ids += db.session.execute(
+                insert(Task).returning(Task.task_id, sort_by_parameter_order=True), rows
+            ).scalars().all()
+        else:
+            db.session.execute(insert(Task), rows)
+
+    if not returning:
+        # no RETURNING with executemany: the rows of this insert are the ones
+        # stamped with its version, numbered in insertion order
+        task_ids = [row[0] for row in db.session.query(Task.task_id).filter(
+            Task.user_id == user_id, Task.created_seq == seq
+        ).order_by(Task.task_id.asc())]
+
+    task_counters.apply_deltas(deltas)
+    task_changes.clear_tombstones(user_id, task_ids)
+    return task_ids
+
+
+def _grouped_contributions(clauses):
+    """
+    (status, due_date, count) groups of the rows matched by `clauses`. On
+    PostgreSQL the rows are locked (FOR UPDATE on the inner SELECT - it is not
+    allowed next to GROUP BY) until the caller's transaction ends.
+    """
+    rows = task_versions.lock_rows(select(Task.status, Task.due_date).where(*clauses)).subquery()
+    return db.session.query(rows.c.status, rows.c.due_date, func.count()).group_by(
+        rows.c.status, rows.c.due_date
+    ).all()
+
+
+def update_tasks(user_id, clauses, changes, return_rows=False):
+    """
+    Apply `changes` to every task matched by `clauses` with a single UPDATE.
+    Runs inside the caller's transaction (caller commits).
+
+    Args:
+        user_id: owner of the tasks (clauses must already restrict to it)
+        clauses: WHERE clauses, e.g. from task_queries.task_filter_clauses
+        changes: column -> new value
+        return_rows: return the updated Task rows when the backend supports RETURNING
+
+    Returns:
+        (updated_count, tasks) - tasks is None unless rows were returned
+    """
+    if 'status' in changes:
+        changes['status'] = StatusEnum(changes['status'])
+    if 'priority' in changes:
+        changes['priority'] = PriorityEnum(changes['priority'])
+
+    # Bump the version first: it locks the user's task_versions row until
+    # commit, and every task write that reads before writing takes that lock
+    # first (see app.utils.task_versions), so no write can commit between the
+    # read of the groups below and the UPDATE. The matched rows are locked as
+    # well on PostgreSQL. The counters only care about status / due_date
+    # moves, so groups are read, not rows.
+    seq = task_versions.next_change_seq(user_id)
+    deltas = Counter()
+    if 'status' in changes or 'due_date' in changes:
+        for status, due_date, count in _grouped_contributions(clauses):
+            deltas.update({key: value * count for key, value in task_counters.contribution(user_id, status, due_date, -1).items()})
+            deltas.update({key: value * count for key, value in task_counters.contribution(
+                user_id, changes.get('status', status), changes.get('due_date', due_date)).items()})
+
+    stmt = update(Task).where(*clauses).values(
+        **changes, change_seq=seq, updated_at=task_changes.utcnow()
+    ).execution_options(synchronize_session=False)
+
+    tasks = None
+    if return_rows and db.session.get_bind().dialect.update_returning:
+        tasks = db.session.execute(stmt.returning(Task)).scalars().all()
+        updated = len(tasks)
+    else:
+        updated = db.session.execute(stmt).rowcount
+
+    task_counters.apply_deltas(deltas)
+    return updated, tasks
+
+
+def _delete_chunk(user_id, clauses, chunk_size):
+    """Delete up to `chunk_size` matching tasks in their own transaction; returns the deleted ids"""
+    # version first, as in update_tasks: no other write of the user can change
+    # the rows between this read and the DELETE (rows locked too on PostgreSQL).
+    # A chunk matching nothing leaves the bump to the request's teardown - no
+    # rollback here, an atomic /batch still holds earlier operations
+    seq = task_versions.next_change_seq(user_id)
+    rows = task_versions.lock_rows(db.session.query(Task.task_id, Task.status, Task.due_date).filter(
+        *clauses
+    ).order_by(Task.task_id.asc()).limit(chunk_size)).all()
+
+    if not rows:
+        return []
+
+    deltas = Counter()
+    for _, status, due_date in rows:
+        deltas.update(task_counters.contribution(user_id, status, due_date, -1))
+
+    task_ids = [row[0] for row in rows]
+    db.session.execute(
+        delete(Task).where(Task.user_id == user_id, Task.task_id.in_(task_ids))
+        .execution_options(synchronize_session=False)
+    )
+    task_counters.apply_deltas(deltas)
+    task_changes.record_deleted(user_id, seq, task_ids)
+    db.session.commit()
+    return task_ids
+
+
+def delete_tasks(user_id, clauses, chunk_size, task_ids=None):
+    """
+    Delete every task matched by `clauses` (and `task_ids`, if given) with
+    chunked DELETE statements, committing after each chunk so no transaction
+    holds more than `chunk_size` rows. Only (task_id, status, due_date)
+    tuples are read, never ORM objects.
+
+    Returns:
+        number of deleted tasks
+    """
+    deleted = 0
+
+    if task_ids is not None:
+        for start in range(0, len(task_ids), chunk_size):
+            chunk = task_ids[start:start + chunk_size]
+            deleted += len(_delete_chunk(user_id, clauses + [Task.task_id.in_(chunk)], chunk_size))
+        return deleted
+
+    # filter: seek forward on task_id so every round is an index range scan
+    last_id = 0
+    while True:
+        deleted_ids = _delete_chunk(user_id, clauses + [Task.task_id > last_id], chunk_size)
+        deleted += len(deleted_ids)
+        # a short chunk was the last one - no extra round just to find nothing
+        if len(deleted_ids) < chunk_size:
+            return deleted
+        last_id = deleted_ids[-1]
@@ -0,0 +1,165 @@
+import heapq
+from datetime import datetime, timezone
+
+from app import db
+from app.models.task import Task
+from app.models.task_stats import TaskVersion, TaskTombstone
+from app.utils.cursor import encode_cursor, decode_cursor
+from app.utils.task_serializer import TASK_COLUMNS
+from sqlalchemy import update, delete, insert, func, tuple_
+from sqlalchemy.orm.attributes import set_committed_value
+
+# Change feed bookkeeping behind GET /user/tasks/changes.
+#
+# Every task write is stamped with the user's data version of its transaction
+# (app.utils.task_versions): inserted / updated rows get tasks.change_seq and
+# updated_at (inserted ones also created_seq), deleted rows leave a
+# task_tombstones row. Bumping the version
+# locks the user's task_versions row until commit, so one user's versions
+# commit in increasing order and (change_seq, task_id) is a resume cursor that
+# never skips a change. Tasks written before the feed existed have change_seq 0.
+
+
+def utcnow():
+    """Naive UTC timestamp for updated_at / deleted_at"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def stamp_written(user_id, seq, tasks=(), task_ids=(), created=False, session=None):
+    """
+    Mark inserted / updated tasks as changed in version `seq`.
+
+    Args:
+        tasks: ORM Task objects flushed in this transaction (their loaded state is updated too)
+        task_ids: ids of tasks written with set-based statements
+        created: the tasks were inserted in this version
+    """
+    session = session or db.session
+    ids = [task.task_id for task in tasks] + list(task_ids)
+    if not ids:
+        return
+    values = {'change_seq': seq, 'updated_at': utcnow()}
+    if created:
+        values['created_seq'] = seq
+    session.execute(
+        update(Task).where(Task.task_id.in_(ids)).values(**values).execution_options(synchronize_session=False)
+    )
+    for task in tasks:
+        for name, value in values.items():
+            set_committed_value(task, name, value)
+    clear_tombstones(user_id, ids, session)
+
+
+def clear_tombstones(user_id, task_ids, session=None):
+    """A task id can come back (SQLite reuses the highest rowid): drop its old tombstone"""
+    if task_ids:
+        (session or db.session).execute(
+            delete(TaskTombstone).where(TaskTombstone.user_id == user_id, TaskTombstone.task_id.in_(task_ids))
+        )
+
+
+def record_deleted(user_id, seq, task_ids, session=None):
+    """Leave tombstones for tasks deleted in version `seq`"""
+    session = session or db.session
+    task_ids = list(task_ids)
+    if not task_ids:
+        return
+    now = utcnow()
+    clear_tombstones(user_id, task_ids, session)
+    session.execute(insert(TaskTombstone), [
+        {'user_id': user_id, 'task_id': task_id, 'change_seq': seq, 'deleted_at': now} for task_id in task_ids
+    ])
+
+
+def _after(column_seq, column_id, seq, task_id):
+    return tuple_(column_seq, column_id) > tuple_(seq, task_id)
+
+
+def changed_tasks(user_id, seq=0, task_id=0, session=None):
+    """Live tasks changed after (seq, task_id), in feed order -> ix_tasks_user_change_seq"""
+    return (session or db.session).query(*TASK_COLUMNS, Task.created_seq, Task.change_seq, Task.updated_at).filter(
+        Task.user_id == user_id, _after(Task.change_seq, Task.task_id, seq, task_id)
+    ).order_by(Task.change_seq.asc(), Task.task_id.asc())
+
+
+def deleted_tasks(user_id, seq=0, task_id=0, session=None):
+    """Tombstones after (seq, task_id), in feed order -> ix_task_tombstones_user_change_seq"""
+    return (session or db.session).query(TaskTombstone.task_id, TaskTombstone.change_seq, TaskTombstone.deleted_at).filter(
+        TaskTombstone.user_id == user_id, _after(TaskTombstone.change_seq, TaskTombstone.task_id, seq, task_id)
+    ).order_by(TaskTombstone.change_seq.asc(), TaskTombstone.task_id.asc())
+
+
+def changes_page(user_id, cursor, limit, session=None):
+    """
+    The user's task changes after `cursor`, oldest first: live tasks by their
+    last change and tombstones of deleted ones, merged on (change_seq, task_id).
+
+    Args:
+        cursor: `next_cursor` of an earlier page, or None/'' to start from the beginning
+        limit: maximum number of changes
+
+    Returns:
+        (rows, next_cursor, has_more) - rows are ('upsert', task_row, change_seq, updated_at, created)
+        or ('delete', task_id, change_seq, deleted_at, None); next_cursor is always set
+        (same position as the given cursor when nothing changed)
+
+    Raises:
+        ValueError: if the cursor is malformed
+        LookupError: if tombstones after the cursor were already pruned (client must start over)
+    """
+    session = session or db.session
+    pruned = session.query(TaskVersion.pruned_seq).filter_by(user_id=user_id).scalar() or 0
+    seq, last_id, horizon = 0, 0, pruned
+    if cursor:
+        values = decode_cursor(cursor)
+        try:
+            seq, last_id, horizon = int(values['s']), int(values['id']), int(values.get('p', 0))
+        except (KeyError, TypeError, ValueError):
+            raise ValueError('Invalid cursor.')
+    # tombstones were pruned past the cursor since it was handed out
+    # (a walk started after the pruning does not need them)
+    if seq < pruned and horizon < pruned:
+        raise LookupError('Cursor is older than the retained change history.')
+
+    # one row more than asked from each side tells whether another page exists
+    upserts = changed_tasks(user_id, seq, last_id, session).limit(limit + 1).all()
+    deletes = deleted_tasks(user_id, seq, last_id, session).limit(limit + 1).all()
+
+    merged = heapq.merge(
+        ((row[-2], row[0], 'upsert', row) for row in upserts),
+        ((row[1], row[0], 'delete', row) for row in deletes),
+    )
+    rows = []
+    for change_seq, task_id, kind, row in merged:
+        if len(rows) == limit:
+            return rows, encode_cursor({'s': seq, 'id': last_id, 'p': horizon}), True
+        if kind == 'upsert':
+            rows.append(('upsert', row[:-3], change_seq, row[-1], row[-3] == change_seq))
+        else:
+            rows.append(('delete', task_id, change_seq, row[2], None))
+        seq, last_id = change_seq, task_id
+
+    return rows, encode_cursor({'s': seq, 'id': last_id, 'p': horizon}), False
+
+
+def prune_tombstones(before):
+    """
+    Delete tombstones older than `before` (naive UTC datetime) and raise each
+    affected user's pruned_seq, so cursors from before the pruned range get a
+    410 instead of silently missing deletes. Runs in the caller's transaction.
+
+    Returns:
+        number of tombstones deleted
+    """
+    horizons = db.session.query(TaskTombstone.user_id, func.max(TaskTombstone.change_seq)).filter(
+        TaskTombstone.deleted_at < before
+    ).group_by(TaskTombstone.user_id).all()
+
+    for user_id, seq in horizons:
+        db.session.execute(
+            update(TaskVersion).where(TaskVersion.user_id == user_id, TaskVersion.pruned_seq < seq)
+            .values(pruned_seq=seq)
+        )
+    return db.session.execute(
+        delete(TaskTombstone).where(TaskTombstone.deleted_at < before).execution_options(synchronize_session=False)
+    ).rowcount
@@ -0,0 +1,195 @@
+from app import db
+from app.models.task import Task, StatusEnum, CLOSED_STATUSES
+from app.models.task_stats import TaskStats, TaskDueCount
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.dialects import sqlite, postgresql
+from collections import Counter
+
+# Incrementally maintained task counters (task_stats + task_due_counts).
+#
+# ORM writes (create / update / delete) are picked up by an after_flush hook,
+# so the counters change in the same transaction as the task rows. Set-based
+# statements that bypass the ORM must call apply_deltas() themselves.
+# `flask tasks stats-rebuild` recomputes everything from `tasks`.
+
+STATUS_COLUMNS = {
+    StatusEnum.PENDING: 'pending',
+    StatusEnum.IN_PROGRESS: 'in_progress',
+    StatusEnum.COMPLETED: 'completed',
+    StatusEnum.CANCELLED: 'cancelled',
+}
+
+
+def _as_status(value):
+    # Task.status may hold the enum member or its string value before a flush
+    return StatusEnum(value) if value is not None else StatusEnum.PENDING
+
+
+def contribution(user_id, status, due_date, sign=1):
+    """
+    Counter keys a single task contributes to, as a Counter of
+    ('status', user_id, column) / ('due', user_id, due_date) -> sign
+    """
+    status = _as_status(status)
+    deltas = Counter({('status', int(user_id), STATUS_COLUMNS[status]): sign})
+    if due_date is not None and status not in CLOSED_STATUSES:
+        deltas[('due', int(user_id), due_date)] += sign
+    return deltas
+
+
+def upsert_add(model, key, values):
+    """INSERT the row or add `values` onto the existing counters"""
+    dialect = db.session.get_bind().dialect.name
+    columns = {**key, **values}
+
+    if dialect in ('sqlite', 'postgresql'):
+        insert = sqlite.insert if dialect == 'sqlite' else postgresql.insert
+        stmt = insert(model).values(**columns)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(key),
+            set_={name: getattr(model, name) + stmt.excluded[name] for name in values}
+        )
+        db.session.execute(stmt)
+        return
+
+    updated = db.session.execute(
+        db.update(model).filter_by(**key).values({name: getattr(model, name) + delta for name, delta in values.items()})
+    ).rowcount
+    if not updated:
+        db.session.execute(db.insert(model).values(**columns))
+
+
+def apply_deltas(deltas):
+    """Write a Counter produced by contribution() to the counter tables"""
+    by_user = {}
+    for (kind, user_id, key), delta in deltas.items():
+        if not delta:
+            continue
+        if kind == 'status':
+            by_user.setdefault(user_id, {})[key] = delta
+        else:
+            upsert_add(TaskDueCount, {'user_id': user_id, 'due_date': key}, {'open_count': delta})
+
+    for user_id, values in by_user.items():
+        for column in STATUS_COLUMNS.values():
+            values.setdefault(column, 0)
+        upsert_add(TaskStats, {'user_id': user_id}, values)
+
+
+def _previous(state, name):
+    """Value an attribute had before the pending flush"""
+    history = state.attrs[name].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return history.added[0] if history.added else None
+
+
+def _collect_flush_deltas(session, flush_context):
+    deltas = Counter()
+
+    for obj in session.new:
+        if isinstance(obj, Task):
+            deltas.update(contribution(obj.user_id, obj.status, obj.due_date))
+
+    for obj in session.deleted:
+        if isinstance(obj, Task):
+            state = inspect(obj)
+            deltas.update(contribution(_previous(state, 'user_id'), _previous(state, 'status'),
+                                       _previous(state, 'due_date'), sign=-1))
+
+    for obj in session.dirty:
+        if isinstance(obj, Task) and obj not in session.deleted:
+            state = inspect(obj)
+            if not any(state.attrs[name].history.has_changes() for name in ('status', 'due_date', 'user_id')):
+                continue
+            deltas.update(contribution(_previous(state, 'user_id'), _previous(state, 'status'),
+                                       _previous(state, 'due_date'), sign=-1))
+            deltas.update(contribution(obj.user_id, obj.status, obj.due_date))
+
+    if deltas:
+        apply_deltas(deltas)
+
+
+def register_counter_events():
+    if not event.contains(db.session, 'after_flush', _collect_flush_deltas):
+        event.listen(db.session, 'after_flush', _collect_flush_deltas)
+
+
+def read_stats(user_id, today, session=None):
+    """
+    Status counts and overdue count for a user: the task_stats primary-key row
+    plus a range sum over task_due_counts, in a single statement.
+    """
+    overdue = (
+        select(func.coalesce(func.sum(TaskDueCount.open_count), 0))
+        .where(TaskDueCount.user_id == user_id, TaskDueCount.due_date < today)
+        .scalar_subquery()
+    )
+    stats = (session or db.session).execute(
+        select(TaskStats, overdue).where(TaskStats.user_id == user_id)
+    ).first()
+
+    if stats is None:
+        return {}, 0
+    return stats[0].status_counts(), int(stats[1])
+
+
+def _scoped(query, model, user_id):
+    return query.filter(model.user_id == user_id) if user_id is not None else query
+
+
+def expected_counters(user_id=None):
+    """Counters recomputed from the tasks table: ({user_id: {column: n}}, {(user_id, due_date): n})"""
+    stats = {}
+    rows = _scoped(db.session.query(Task.user_id, Task.status, func.count(Task.task_id)), Task, user_id)
+    for uid, status, count in rows.group_by(Task.user_id, Task.status):
+        stats.setdefault(uid, dict.fromkeys(STATUS_COLUMNS.values(), 0))[STATUS_COLUMNS[status]] = count
+
+    rows = _scoped(db.session.query(Task.user_id, Task.due_date, func.count(Task.task_id)), Task, user_id)
+    rows = rows.filter(Task.open_dated_clause()).group_by(Task.user_id, Task.due_date)
+    due = {(uid, due_date): count for uid, due_date, count in rows}
+
+    return stats, due
+
+
+def stored_counters(user_id=None):
+    """Counters as currently stored, in the same shape as expected_counters()"""
+    stats = {
+        row.user_id: {column: getattr(row, column) for column in STATUS_COLUMNS.values()}
+        for row in _scoped(TaskStats.query, TaskStats, user_id)
+        if any(getattr(row, column) for column in STATUS_COLUMNS.values())
+    }
+    due = {
+        (row.user_id, row.due_date): row.open_count
+        for row in _scoped(TaskDueCount.query, TaskDueCount, user_id)
+        if row.open_count
+    }
+    return stats, due
+
+
+def counter_drift(user_id=None):
+    """List of (key, stored, expected) for every counter that disagrees with `tasks`"""
+    drift = []
+    for stored, expected in zip(stored_counters(user_id), expected_counters(user_id)):
+        for key in sorted(set(stored) | set(expected), key=str):
+            if stored.get(key) != expected.get(key):
+                drift.append((key, stored.get(key), expected.get(key)))
+    return drift
+
+
+def rebuild_counters(user_id=None):
+    """Replace the stored counters with values recomputed from `tasks` (caller commits)"""
+    stats, due = expected_counters(user_id)
+
+    _scoped(TaskStats.query, TaskStats, user_id).delete(synchronize_session=False)
+    _scoped(TaskDueCount.query, TaskDueCount, user_id).delete(synchronize_session=False)
+
+    if stats:
+        db.session.execute(db.insert(TaskStats), [{'user_id': uid, **values} for uid, values in stats.items()])
+    if due:
+        db.session.execute(db.insert(TaskDueCount), [
+            {'user_id': uid, 'due_date': due_date, 'open_count': count}
+            for (uid, due_date), count in due.items()
+        ])
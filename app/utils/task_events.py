@@ -0,0 +1,404 @@
+import asyncio
+import json
+import threading
+import time
+from collections import defaultdict
+from datetime import date
+
+from app import db
+from app.models.task_stats import TaskVersion
+from app.utils import task_changes, task_counters
+from app.utils.cursor import encode_cursor, decode_cursor
+from app.utils.task_serializer import TaskRowSerializer
+from app.utils.task_versions import current_version, on_commit
+
+try:
+    import redis
+except ImportError:  # optional dependency, only needed for EVENTS_BROKER=redis
+    redis = None
+
+# Live task events behind GET /user/tasks/events (Server-Sent Events).
+#
+# A commit that wrote a user's tasks publishes the user id to the broker,
+# which wakes every open event stream of that user. The stream then reads
+# what changed from the change feed (app.utils.task_changes) after its own
+# cursor, so notifications carry no data: a lost or doubled one costs at most
+# a feed query, and a reconnecting client resumes from Last-Event-ID.
+#
+# EVENTS_BROKER picks how notifications reach the streams:
+#   local  in-process fan-out (a single worker process)
+#   poll   local, plus a thread per process reading task_versions of the users
+#          with an open stream every EVENTS_POLL_INTERVAL seconds
+#          (any number of workers, no extra service)
+#   redis  Redis pub/sub on EVENTS_REDIS_URL (needs the `redis` package)
+
+# cursor id past every task id: "everything up to this version was sent"
+_TAIL_ID = 2 ** 62
+
+
+class Subscription:
+    """Wake-up flag of one event stream: a thread's, or a coroutine's on `loop`"""
+
+    def __init__(self, user_id, loop=None):
+        self.user_id = int(user_id)
+        self._loop = loop
+        self._event = asyncio.Event() if loop is not None else threading.Event()
+
+    def notify(self):
+        if self._loop is None:
+            self._event.set()
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._event.set)
+        except RuntimeError:    # event loop already closed
+            pass
+
+    def wait(self, timeout):
+        """True if notified within `timeout` seconds; the flag is reset either way"""
+        notified = self._event.wait(timeout)
+        self._event.clear()
+        return notified
+
+    async def wait_async(self, timeout):
+        """wait() for a subscription made with a loop"""
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+            notified = True
+        except asyncio.TimeoutError:
+            notified = False
+        self._event.clear()
+        return notified
+
+
+class LocalBroker:
+    """In-process fan-out from publishing commits to the streams of this process"""
+
+    def __init__(self, app=None):
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id, loop=None):
+        subscription = Subscription(user_id, loop)
+        with self._lock:
+            self._subscribers[subscription.user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            streams = self._subscribers.get(subscription.user_id)
+            if streams is not None:
+                streams.discard(subscription)
+                if not streams:
+                    del self._subscribers[subscription.user_id]
+
+    def subscribed_users(self):
+        with self._lock:
+            return list(self._subscribers)
+
+    def publish(self, user_ids):
+        """Tasks of these users changed (called after the commit)"""
+        self.deliver(user_ids)
+
+    def deliver(self, user_ids):
+        with self._lock:
+            streams = [s for user_id in user_ids for s in self._subscribers.get(int(user_id), ())]
+        for subscription in streams:
+            subscription.notify()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'broker': type(self).__name__,
+                'users': len(self._subscribers),
+                'streams': sum(len(streams) for streams in self._subscribers.values())
+            }
+
+    def close(self):
+        pass
+
+
+class PollingBroker(LocalBroker):
+    """Local fan-out, plus task_versions polling for commits made by other worker processes"""
+
+    def __init__(self, app=None):
+        super().__init__(app)
+        self.app = app
+        self.interval = app.config.get('EVENTS_POLL_INTERVAL', 2) if app else 2
+        self._versions = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def subscribe(self, user_id, loop=None):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='task-events-poll', daemon=True)
+                self._thread.start()
+        return super().subscribe(user_id, loop)
+
+    def poll(self):
+        """Wake the streams of users whose version moved since the last poll"""
+        user_ids = self.subscribed_users()
+        if not user_ids:
+            self._versions.clear()
+            return
+        with self.app.app_context():
+            try:
+                versions = dict(db.session.query(TaskVersion.user_id, TaskVersion.version).filter(
+                    TaskVersion.user_id.in_(user_ids)
+                ).all())
+            finally:
+                db.session.remove()
+        # users seen for the first time are woken too: their streams may have
+        # read the feed before this baseline
+        changed = [user_id for user_id in user_ids
+                   if user_id not in self._versions or self._versions[user_id] != versions.get(user_id, 0)]
+        self._versions = {user_id: versions.get(user_id, 0) for user_id in user_ids}
+        self.deliver(changed)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception as e:
+                self.app.logger.warning("Task events poll failed: %s", e)
+
+    def close(self):
+        self._stop.set()
+
+
+class RedisBroker(LocalBroker):
+    """Fan-out through a Redis pub/sub channel shared by every worker process"""
+
+    def __init__(self, app=None):
+        super().__init__(app)
+        if redis is None:
+            raise RuntimeError("EVENTS_BROKER=redis needs the `redis` package (pip install redis)")
+        self.app = app
+        self.channel = app.config.get('EVENTS_REDIS_CHANNEL', 'taskflow:task-events')
+        self.client = redis.Redis.from_url(app.config['EVENTS_REDIS_URL'])
+        self._stop = threading.Event()
+        self._thread = None
+
+    def subscribe(self, user_id, loop=None):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='task-events-redis', daemon=True)
+                self._thread.start()
+        return super().subscribe(user_id, loop)
+
+    def publish(self, user_ids):
+        try:
+            self.client.publish(self.channel, ' '.join(str(int(user_id)) for user_id in user_ids))
+        except redis.RedisError as e:
+            # other workers miss this one; streams of this process still get it
+            self.app.logger.warning("Task events publish failed: %s", e)
+            self.deliver(user_ids)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                # everything committed while disconnected: re-read the feed
+                self.deliver(self.subscribed_users())
+                while not self._stop.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message and message['type'] == 'message':
+                        self.deliver(int(user_id) for user_id in message['data'].split())
+            except redis.RedisError as e:
+                self.app.logger.warning("Task events subscriber lost Redis: %s", e)
+                self._stop.wait(1.0)
+
+    def close(self):
+        self._stop.set()
+
+
+BROKERS = {'local': LocalBroker, 'poll': PollingBroker, 'redis': RedisBroker}
+
+broker = LocalBroker()
+
+
+def _publish(user_ids):
+    broker.publish(user_ids)
+
+
+def init_task_events(app):
+    """Create the EVENTS_BROKER broker and publish the users of every committed task write to it"""
+    global broker
+    name = app.config.get('EVENTS_BROKER', 'local')
+    if name not in BROKERS:
+        raise ValueError(f"Unknown EVENTS_BROKER '{name}'. Use one of: {list(BROKERS)}")
+    broker.close()
+    broker = BROKERS[name](app)
+    on_commit(_publish)
+
+
+def tail_cursor(user_id, session=None):
+    """Change feed cursor past everything the user committed so far"""
+    session = session or db.session
+    pruned = session.query(TaskVersion.pruned_seq).filter_by(user_id=user_id).scalar() or 0
+    return encode_cursor({'s': current_version(user_id, session), 'id': _TAIL_ID, 'p': pruned})
+
+
+def check_cursor(cursor):
+    """
+    Raises:
+        ValueError: if `cursor` is not a change feed cursor
+    """
+    values = decode_cursor(cursor)
+    try:
+        int(values['s']), int(values['id'])
+    except (KeyError, TypeError, ValueError):
+        raise ValueError('Invalid cursor.')
+
+
+def format_event(event, data, event_id=None):
+    """One text/event-stream message"""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'), sort_keys=True)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def _stats_delta(before, after):
+    delta = {}
+    for status in set(before['status_counts']) | set(after['status_counts']):
+        change = after['status_counts'].get(status, 0) - before['status_counts'].get(status, 0)
+        if change:
+            delta[status] = change
+    if after['overdue_count'] != before['overdue_count']:
+        delta['overdue_count'] = after['overdue_count'] - before['overdue_count']
+    return delta
+
+
+class EventStream:
+    """
+    Position and output of one open event stream. The transport (the Flask
+    generator below, or the ASGI handler in app.routes.async_task_routes)
+    subscribes to the broker and calls open() once, then changes() after
+    every notification and idle() after every wait that timed out. Database
+    methods take the session to read with, which may be released in between.
+    """
+
+    def __init__(self, user_id, cursor=None, expires_at=None, heartbeat=15, page_size=500, retry_ms=3000):
+        self.user_id = int(user_id)
+        self.cursor = cursor
+        self.expires_at = expires_at
+        self.heartbeat = heartbeat
+        self.page_size = page_size
+        self.retry_ms = retry_ms
+        self.stats = None
+        self.closed = False
+        self._quiet_since = time.monotonic()
+
+    def open(self, session):
+        """
+        retry hint, the changes after the client's cursor (None: from now on)
+        and a `ready` event carrying the current position
+        """
+        messages = [f"retry: {self.retry_ms}\n\n"]
+        self.stats = self._read_stats(session)
+        if self.cursor is None:
+            self.cursor = tail_cursor(self.user_id, session)
+        else:
+            messages += self._read_changes(session)
+        messages.append(format_event('ready', {'cursor': self.cursor}, self.cursor))
+        return self._sent("".join(messages))
+
+    def changes(self, session):
+        """Events for what was committed since the last read, then `stats` ('' if nothing changed)"""
+        messages = self._read_changes(session)
+        if not messages:
+            return ''
+        stats = self._read_stats(session)
+        messages.append(format_event('stats', dict(stats, delta=_stats_delta(self.stats, stats)), self.cursor))
+        self.stats = stats
+        return self._sent("".join(messages))
+
+    def wait_time(self):
+        """Seconds until the next heartbeat or the token expiry"""
+        timeout = self.heartbeat - (time.monotonic() - self._quiet_since)
+        if self.expires_at is not None:
+            timeout = min(timeout, self.expires_at - time.time())
+        return max(0.0, timeout)
+
+    def idle(self):
+        """After a wait without notification: heartbeat comment when due, `token-expired` (closing) at expiry"""
+        if self.expires_at is not None and time.time() >= self.expires_at:
+            self.closed = True
+            return format_event('token-expired', {'cursor': self.cursor}, self.cursor)
+        if time.monotonic() - self._quiet_since < self.heartbeat:
+            return ''
+        return self._sent(": heartbeat\n\n")
+
+    def _sent(self, message):
+        self._quiet_since = time.monotonic()
+        return message
+
+    def _read_stats(self, session):
+        status_counts, overdue_count = task_counters.read_stats(self.user_id, date.today(), session)
+        return {'status_counts': status_counts, 'overdue_count': overdue_count}
+
+    def _read_changes(self, session):
+        """The change feed after the cursor, one message per change with the cursor right after it as the id"""
+        serialize = TaskRowSerializer()
+        messages = []
+        try:
+            while True:
+                rows, next_cursor, has_more = task_changes.changes_page(self.user_id, self.cursor, self.page_size,
+                                                                        session)
+                horizon = decode_cursor(next_cursor)['p']
+                for kind, row, change_seq, changed_at, created in rows:
+                    task_id = row[0] if kind == 'upsert' else row
+                    event_id = encode_cursor({'s': change_seq, 'id': task_id, 'p': horizon})
+                    if kind == 'upsert':
+                        data = {'seq': change_seq, 'task_id': task_id, 'task': serialize(row),
+                                'updated_at': changed_at.isoformat() if changed_at else None}
+                        event = 'task.created' if created else 'task.updated'
+                    else:
+                        data = {'seq': change_seq, 'task_id': task_id, 'deleted_at': changed_at.isoformat()}
+                        event = 'task.deleted'
+                    messages.append(format_event(event, data, event_id))
+                self.cursor = next_cursor
+                if not has_more:
+                    return messages
+        except LookupError as e:
+            # deletes after the cursor were pruned: the client has to reload
+            self.cursor = tail_cursor(self.user_id, session)
+            messages.append(format_event('reset', {'error': f"{str(e)} Reload the task list."}, self.cursor))
+            return messages
+
+
+def event_stream(user_id, cursor, **options):
+    """
+    text/event-stream body for a Flask response: task.created / task.updated /
+    task.deleted events after `cursor` (None: from now on), a `stats` event
+    with the recomputed counts and their delta after every burst of changes,
+    and a comment line every `heartbeat` seconds of silence. Runs until the
+    client disconnects, or until `expires_at` (epoch seconds, the access
+    token's expiry) after a `token-expired` event: the client reconnects with
+    a fresh token. Options are those of EventStream.
+
+    The request's database session is released before every wait, so an idle
+    stream holds no pooled connection (it does hold its worker thread).
+    """
+    stream = EventStream(user_id, cursor, **options)
+    # subscribed before the first read: a commit racing with it wakes the loop
+    subscription = broker.subscribe(stream.user_id)
+    try:
+        message = stream.open(db.session)
+        db.session.remove()
+        yield message
+
+        while not stream.closed:
+            if subscription.wait(stream.wait_time()):
+                message = stream.changes(db.session)
+                db.session.remove()
+            else:
+                message = stream.idle()
+            if message:
+                yield message
+    finally:
+        broker.unsubscribe(subscription)
@@ -0,0 +1,60 @@
+import csv
+import io
+import json
+from app.utils.json_provider import orjson
+
+# Streaming encoders for the task export. Each takes an iterable of task
+# dicts and yields text in blocks of `rows_per_chunk` rows so the response is
+# written out as it is produced.
+
+EXPORT_FIELDS = [
+    'task_id', 'title', 'description', 'start_date', 'due_date',
+    'priority', 'status', 'user_id', 'is_overdue'
+]
+
+EXPORT_MIMETYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+def _dumps(task):
+    if orjson is not None:
+        return orjson.dumps(task).decode('utf-8')
+    return json.dumps(task)
+
+
+def iter_ndjson(tasks, rows_per_chunk=500):
+    """One JSON object per line"""
+    lines = []
+    for task in tasks:
+        lines.append(_dumps(task))
+        if len(lines) >= rows_per_chunk:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+def iter_csv(tasks, rows_per_chunk=500):
+    """CSV with a header row"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+
+    rows = 0
+    for task in tasks:
+        writer.writerow(task)
+        rows += 1
+        if rows >= rows_per_chunk:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            rows = 0
+    yield buffer.getvalue()
+
+
+EXPORT_ENCODERS = {
+    'ndjson': iter_ndjson,
+    'csv': iter_csv,
+}
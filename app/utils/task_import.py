@@ -0,0 +1,130 @@
+import csv
+import json
+from app import db
+from app.utils import task_bulk
+
+# Streaming task import: the request body is read line by line, and every
+# `batch_size` records are validated, inserted and committed together. A
+# failed request therefore keeps the batches committed so far; the summary's
+# `committed_lines` tells the client where to resume (?resume_from=).
+
+IMPORT_FORMATS = ('ndjson', 'csv')
+MAX_REPORTED_ERRORS = 1000
+
+
+def _decoded_lines(stream, keep_ends=False):
+    for raw in stream:
+        line = raw.decode('utf-8-sig')
+        yield line if keep_ends else line.rstrip('\r\n')
+
+
+def iter_ndjson_records(stream):
+    """(line_no, record, error) for every non-blank line of an NDJSON body"""
+    for line_no, line in enumerate(_decoded_lines(stream), start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_no, json.loads(line), None
+        except ValueError as e:
+            yield line_no, None, f"Invalid JSON: {e}"
+
+
+def iter_csv_records(stream):
+    """
+    (line_no, record, error) for every data row of a CSV body with a header row.
+    Lines keep their line endings, so a quoted field spanning several lines keeps
+    its newlines; line_no is the last line of the row.
+    """
+    lines = _decoded_lines(stream, keep_ends=True)
+    reader = csv.DictReader(lines)
+    for record in reader:
+        # empty cells mean "not given", so optional fields fall back to their defaults
+        record = {key: value for key, value in record.items() if key and value not in ('', None)}
+        yield reader.line_num, record, None
+
+
+IMPORT_READERS = {
+    'ndjson': iter_ndjson_records,
+    'csv': iter_csv_records,
+}
+
+
+class ImportSummary:
+    def __init__(self, resume_from):
+        self.imported = 0
+        self.failed = 0
+        self.batches = 0
+        self.committed_lines = resume_from
+        self.errors = []
+
+    def add_error(self, line, message, field=None):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line, 'field': field, 'message': message})
+
+    def to_dict(self):
+        return {
+            'imported': self.imported,
+            'failed': self.failed,
+            'batches': self.batches,
+            'committed_lines': self.committed_lines,
+            'errors': self.errors,
+            'errors_truncated': self.failed > len(self.errors)
+        }
+
+
+def _flush_batch(user_id, batch, pending_errors, last_line, summary, chunk_size):
+    """
+    Validate, insert and commit one batch. Parse errors of its lines
+    (pending_errors) are reported together with its validation errors,
+    so the summary lists errors in line order.
+    """
+    valid, invalid = task_bulk.validate_task_list([record for _, record in batch]) if batch else ([], [])
+    errors = list(pending_errors) + [(batch[error['index']][0], error['message'], error['field']) for error in invalid]
+    for line, message, field in sorted(errors, key=lambda error: error[0]):
+        summary.add_error(line, message, field)
+    if valid:
+        task_bulk.insert_tasks(user_id, [data for _, data in valid], chunk_size)
+    summary.imported += len(valid)
+    db.session.commit()
+    summary.batches += 1
+    summary.committed_lines = last_line
+
+
+def import_tasks(user_id, stream, import_format, batch_size, resume_from=0):
+    """
+    Import tasks from a byte stream of NDJSON or CSV, one transaction per batch.
+
+    Args:
+        user_id: owner of the new tasks
+        stream: iterable of raw lines (e.g. request.stream)
+        import_format: 'ndjson' or 'csv'
+        batch_size: records validated / inserted / committed together
+        resume_from: skip records on lines up to and including this one
+
+    Returns:
+        ImportSummary
+    """
+    summary = ImportSummary(resume_from)
+    batch = []
+    pending_errors = []
+    line_no = resume_from
+
+    for line_no, record, error in IMPORT_READERS[import_format](stream):
+        if line_no <= resume_from:
+            continue
+        if error:
+            pending_errors.append((line_no, error, None))
+        elif not isinstance(record, dict):
+            pending_errors.append((line_no, 'Each record must be an object', None))
+        else:
+            batch.append((line_no, record))
+
+        if len(batch) >= batch_size:
+            _flush_batch(user_id, batch, pending_errors, line_no, summary, batch_size)
+            batch, pending_errors = [], []
+
+    if batch or pending_errors or line_no > summary.committed_lines:
+        _flush_batch(user_id, batch, pending_errors, line_no, summary, batch_size)
+
+    return summary
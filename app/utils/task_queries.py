@@ -0,0 +1,182 @@
+from app import db
+from app.models.task import Task, StatusEnum, PriorityEnum
+from app.utils.cursor import encode_cursor, decode_cursor
+from sqlalchemy import tuple_
+from datetime import date
+
+# Query builders shared by the task routes and the `flask tasks` commands.
+# Each one is shaped to an index declared in Task.__table_args__ :
+#   filter_tasks          -> ix_tasks_user_due_date / ix_tasks_user_status_due_date
+#   keyset_page           -> ix_tasks_user_due_date (rowid / task_id is the tie-breaker)
+#   overdue_tasks         -> ix_tasks_user_open_due_date (partial)
+#   today/upcoming        -> ix_tasks_user_due_date
+#   recent                -> ix_tasks_user_task_id_desc
+#
+# The builders start from Task.query (Flask-SQLAlchemy session) unless a
+# `base` Task query of another session is passed, e.g. the sync session of
+# an AsyncSession.run_sync() call on the async read path.
+
+
+def parse_status(status):
+    """Convert text like "completed" into StatusEnum.COMPLETED (raises ValueError)"""
+    try:
+        return StatusEnum(status.upper())
+    except ValueError:
+        raise ValueError(f"Invalid status '{status}'.")
+
+
+def parse_priority(priority):
+    """Convert text like "high" into PriorityEnum.HIGH (raises ValueError)"""
+    try:
+        return PriorityEnum(priority.upper())
+    except ValueError:
+        raise ValueError(f"Invalid priority '{priority}'.")
+
+
+def parse_date(name, value):
+    """Convert an ISO date query argument like "2025-12-31" into a date, None when absent (raises ValueError)"""
+    if value is None or value == '':
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Invalid {name} '{value}'. Use YYYY-MM-DD.")
+
+
+def task_filter_clauses(user_id, status=None, priority=None, search=None, due_after=None, due_before=None,
+                        start_before=None):
+    """
+    WHERE clauses for a user's tasks narrowed by the optional filters.
+    Shared by the list query and the set-based bulk UPDATE / DELETE statements.
+    """
+    clauses = [Task.user_id == user_id]
+
+    if status:
+        clauses.append(Task.status == parse_status(status))
+    if priority:
+        clauses.append(Task.priority == parse_priority(priority))
+    if search:
+        clauses.append(Task.title.ilike(f"%{search}%"))
+    if due_after:
+        clauses.append(Task.due_date > due_after)
+    if due_before:
+        clauses.append(Task.due_date < due_before)
+    if start_before:
+        clauses.append(Task.start_date < start_before)
+
+    return clauses
+
+
+def _base(base):
+    return Task.query if base is None else base
+
+
+def filter_tasks(user_id, status=None, priority=None, search=None, due_after=None, due_before=None, base=None):
+    """Tasks of a user narrowed by the optional status / priority / title search / due range filters"""
+    return _base(base).filter(*task_filter_clauses(user_id, status, priority, search, due_after, due_before))
+
+
+def overdue_tasks(user_id, today, base=None):
+    """Open tasks whose due date is before today, soonest-overdue first"""
+    return _base(base).filter(
+        Task.user_id == user_id,
+        Task.open_dated_clause(),
+        Task.due_date < today
+    ).order_by(Task.due_date.asc())
+
+
+def today_tasks(user_id, today, base=None):
+    """Tasks due today"""
+    return _base(base).filter(
+        Task.user_id == user_id,
+        Task.due_date == today
+    ).order_by(Task.due_date.asc())
+
+
+def upcoming_tasks(user_id, today, base=None):
+    """Tasks due after today, earliest first"""
+    return _base(base).filter(
+        Task.user_id == user_id,
+        Task.due_date > today
+    ).order_by(Task.due_date.asc())
+
+
+def recent_tasks(user_id, limit, base=None):
+    """Newest tasks first"""
+    return (
+        _base(base)
+        .filter_by(user_id=user_id)
+        .order_by(Task.task_id.desc())
+        .limit(limit)
+    )
+
+
+def keyset_page(query, cursor, per_page, user_id):
+    """
+    One page of `query` in (due_date, task_id) order, seeking past `cursor`
+    instead of using OFFSET. Dated tasks come first, undated tasks last, so
+    the walk is two index range scans: dated rows then the due_date IS NULL rows.
+
+    Args:
+        query: Task query (already filtered, not ordered)
+        cursor: value of a previous `next_cursor`, or None/'' for the first page
+        per_page: page size
+        user_id: owner of the tasks; cursors are signed for this user only
+
+    Returns:
+        (tasks, next_cursor) - next_cursor is None on the last page
+
+    Raises:
+        ValueError: if the cursor is malformed, altered or another user's
+    """
+    last_due, last_id = None, 0
+    dated_done = False
+    if cursor:
+        values = decode_cursor(cursor, scope=user_id)
+        try:
+            last_id = int(values['id'])
+            last_due = date.fromisoformat(values['d']) if values.get('d') else None
+        except (KeyError, TypeError, ValueError):
+            raise ValueError('Invalid cursor.')
+        dated_done = last_due is None
+
+    # fetch one row more than asked so we know whether another page exists
+    limit = per_page + 1
+    tasks = []
+
+    if not dated_done:
+        dated = query.filter(Task.due_date != None)
+        if last_due is not None:
+            dated = dated.filter(tuple_(Task.due_date, Task.task_id) > tuple_(last_due, last_id))
+        tasks = dated.order_by(Task.due_date.asc(), Task.task_id.asc()).limit(limit).all()
+        # the undated tail starts from the beginning once dated rows run out
+        last_id = 0
+
+    if len(tasks) < limit:
+        undated = query.filter(Task.due_date == None, Task.task_id > last_id)
+        tasks += undated.order_by(Task.task_id.asc()).limit(limit - len(tasks)).all()
+
+    next_cursor = None
+    if len(tasks) > per_page:
+        tasks = tasks[:per_page]
+        last = tasks[-1]
+        next_cursor = encode_cursor({
+            'd': last.due_date.isoformat() if last.due_date else None,
+            'id': last.task_id
+        }, scope=user_id)
+
+    return tasks, next_cursor
+
+
+def estimate_count(query):
+    """
+    Cheap row estimate for `query`. PostgreSQL answers from the planner
+    (EXPLAIN row estimate); other backends fall back to an exact COUNT.
+    """
+    session = query.session
+    bind = session.get_bind()
+    if bind.dialect.name == 'postgresql':
+        statement = query.statement.compile(bind, compile_kwargs={'literal_binds': True})
+        plan = session.execute(db.text(f'EXPLAIN (FORMAT JSON) {statement}')).scalar()
+        return int(plan[0]['Plan']['Plan Rows'])
+    return query.order_by(None).count()
@@ -0,0 +1,181 @@
+import re
+from app import db
+from app.models.task import Task
+from app.utils.cache import LRUCache
+from sqlalchemy import event, select, text, Float, Integer
+
+# Full-text search over task title + description, one implementation per backend:
+#   SQLite     - external-content FTS5 table `tasks_fts`, kept in sync by triggers on `tasks`
+#   PostgreSQL - GIN expression index over a weighted tsvector of title / description
+# Other backends fall back to a (non-indexed) LIKE over both columns.
+#
+# The structures are created with `tasks` (create_all) or by `flask tasks search-setup`
+# on an existing database. They are hidden from `flask db migrate` via include_object.
+# The ranked queries are textual SELECTs, so inside a @read_replica handler they
+# run on the replica like every other read of the request.
+#
+# SQLite: a task is indexed under rowid user_id * 2^32 + task_id (view
+# tasks_fts_source), so each user's entries form one rowid range and a search
+# seeks into that range of every doclist instead of matching all users' rows
+# and dropping the foreign ones after the join. Short prefixes (2-4 chars)
+# have a prefix index. Requires task_id < 2^32 and user_id < 2^31.
+
+SEARCH_ROWID_SPAN = 2 ** 32
+
+SQLITE_DDL = [
+    f"""CREATE VIEW IF NOT EXISTS tasks_fts_source AS
+        SELECT user_id * {SEARCH_ROWID_SPAN} + task_id AS search_rowid, title, description FROM tasks""",
+    """CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+        title, description, content='tasks_fts_source', content_rowid='search_rowid',
+        tokenize='unicode61', prefix='2 3 4'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS tasks_fts_ai AFTER INSERT ON tasks BEGIN
+        INSERT INTO tasks_fts(rowid, title, description)
+        VALUES (new.user_id * {SEARCH_ROWID_SPAN} + new.task_id, new.title, new.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS tasks_fts_ad AFTER DELETE ON tasks BEGIN
+        INSERT INTO tasks_fts(tasks_fts, rowid, title, description)
+        VALUES ('delete', old.user_id * {SEARCH_ROWID_SPAN} + old.task_id, old.title, old.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS tasks_fts_au AFTER UPDATE OF title, description, user_id ON tasks BEGIN
+        INSERT INTO tasks_fts(tasks_fts, rowid, title, description)
+        VALUES ('delete', old.user_id * {SEARCH_ROWID_SPAN} + old.task_id, old.title, old.description);
+        INSERT INTO tasks_fts(rowid, title, description)
+        VALUES (new.user_id * {SEARCH_ROWID_SPAN} + new.task_id, new.title, new.description);
+    END""",
+]
+
+# an index of the first version (rowid = task_id, every user in one range) is replaced
+SQLITE_DROP_OUTDATED = [
+    "DROP TRIGGER IF EXISTS tasks_fts_ai",
+    "DROP TRIGGER IF EXISTS tasks_fts_ad",
+    "DROP TRIGGER IF EXISTS tasks_fts_au",
+    "DROP TABLE IF EXISTS tasks_fts",
+]
+
+# title matches weigh more than description matches
+PG_SEARCH_VECTOR = (
+    "(setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'B'))"
+)
+
+POSTGRES_DDL = [
+    f"CREATE INDEX IF NOT EXISTS ix_tasks_search ON tasks USING GIN ({PG_SEARCH_VECTOR})",
+]
+
+SEARCH_OBJECT_PREFIXES = ('tasks_fts', 'ix_tasks_search')
+
+# engine url -> whether the search structures exist; re-probed after
+# SEARCH_PROBE_TTL seconds, so every worker picks up a `flask tasks search-setup`
+SEARCH_PROBE_TTL = 60
+_search_ready = LRUCache(16, ttl=SEARCH_PROBE_TTL)
+
+SQLITE_PROBE = "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tasks_fts' AND sql LIKE '%tasks_fts_source%'"
+SEARCH_PROBES = {
+    'sqlite': SQLITE_PROBE,
+    'postgresql': "SELECT 1 FROM pg_indexes WHERE indexname = 'ix_tasks_search'",
+}
+
+
+def setup_search(connection):
+    """Create the backend's search structures (idempotent). Returns False if unsupported."""
+    dialect = connection.dialect.name
+    statements = {'sqlite': SQLITE_DDL, 'postgresql': POSTGRES_DDL}.get(dialect)
+    if statements is None:
+        return False
+
+    if dialect == 'sqlite' and _sqlite_outdated(connection):
+        for statement in SQLITE_DROP_OUTDATED:
+            connection.execute(text(statement))
+    for statement in statements:
+        connection.execute(text(statement))
+    _search_ready.pop(str(connection.engine.url))
+    return True
+
+
+def _sqlite_outdated(connection):
+    """tasks_fts exists, but not in its per-user rowid layout"""
+    exists = connection.execute(text("SELECT 1 FROM sqlite_master WHERE name = 'tasks_fts'")).first()
+    return exists is not None and connection.execute(text(SQLITE_PROBE)).first() is None
+
+
+def rebuild_search_index(connection):
+    """Re-index every task (SQLite FTS5 only; the PostgreSQL index is maintained by the database)"""
+    if connection.dialect.name == 'sqlite':
+        connection.execute(text("INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')"))
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Flask-Migrate hook: keep autogenerate from dropping the search tables / index"""
+    return not (reflected and compare_to is None and name and name.startswith(SEARCH_OBJECT_PREFIXES))
+
+
+@event.listens_for(Task.__table__, 'after_create')
+def _create_search_structures(target, connection, **kw):
+    setup_search(connection)
+
+
+def _is_ready(engine):
+    key = str(engine.url)
+    ready = _search_ready.get(key)
+    if ready is None:
+        query = SEARCH_PROBES.get(engine.dialect.name)
+        ready = False
+        if query is not None:
+            with engine.connect() as connection:
+                ready = connection.execute(text(query)).first() is not None
+        _search_ready.set(key, ready)
+    return ready
+
+
+def search_terms(term):
+    """Words of a search string; punctuation and FTS operators are dropped"""
+    return re.findall(r'\w+', term or '', re.UNICODE)
+
+
+def search_tasks(user_id, term, limit, offset=0):
+    """
+    Tasks of a user matching every word of `term` as a prefix, best match first.
+
+    Returns:
+        list of (Task, score) - higher score is more relevant
+    """
+    words = search_terms(term)
+    if not words:
+        return []
+
+    # the engine the request's SELECTs go to (primary or replica)
+    engine = db.session.get_bind(clause=select(Task.task_id))
+    params = {'user_id': user_id, 'limit': limit, 'offset': offset}
+
+    if _is_ready(engine) and engine.dialect.name == 'sqlite':
+        params['match'] = ' '.join(f'"{word}"*' for word in words)
+        params['first_rowid'] = int(user_id) * SEARCH_ROWID_SPAN
+        params['last_rowid'] = params['first_rowid'] + SEARCH_ROWID_SPAN - 1
+        rows = db.session.execute(text(
+            "SELECT tasks_fts.rowid - :first_rowid AS task_id, -bm25(tasks_fts, 10.0, 1.0) AS score "
+            "FROM tasks_fts "
+            "WHERE tasks_fts MATCH :match AND tasks_fts.rowid BETWEEN :first_rowid AND :last_rowid "
+            "ORDER BY score DESC, task_id LIMIT :limit OFFSET :offset"
+        ).columns(task_id=Integer, score=Float), params).all()
+
+    elif _is_ready(engine) and engine.dialect.name == 'postgresql':
+        params['match'] = ' & '.join(f'{word}:*' for word in words)
+        rows = db.session.execute(text(
+            f"SELECT task_id, ts_rank({PG_SEARCH_VECTOR}, query) AS score "
+            f"FROM tasks, to_tsquery('simple', :match) AS query "
+            f"WHERE user_id = :user_id AND {PG_SEARCH_VECTOR} @@ query "
+            f"ORDER BY score DESC, task_id LIMIT :limit OFFSET :offset"
+        ).columns(task_id=Integer, score=Float), params).all()
+
+    else:
+        query = Task.query.filter(Task.user_id == user_id)
+        for word in words:
+            query = query.filter(Task.title.ilike(f"%{word}%") | Task.description.ilike(f"%{word}%"))
+        tasks = query.order_by(Task.task_id.desc()).limit(limit).offset(offset).all()
+        return [(task, None) for task in tasks]
+
+    scores = {task_id: score for task_id, score in rows}
+    tasks = Task.query.filter(Task.user_id == user_id, Task.task_id.in_(scores)).all() if scores else []
+    tasks.sort(key=lambda task: (-scores[task.task_id], task.task_id))
+    return [(task, scores[task.task_id]) for task in tasks]
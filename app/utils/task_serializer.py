@@ -0,0 +1,57 @@
+from app.models.task import Task, CLOSED_STATUSES
+from datetime import date
+
+# Column-level read path for the task list endpoints. Instead of hydrating
+# ORM objects and calling Task.to_dict() per row, queries select plain row
+# tuples and one TaskRowSerializer per request turns them into the same dicts:
+# `today` is evaluated once and each distinct date is isoformat()-ed once.
+
+TASK_COLUMNS = (
+    Task.task_id,
+    Task.title,
+    Task.description,
+    Task.start_date,
+    Task.due_date,
+    Task.priority,
+    Task.status,
+    Task.user_id,
+)
+
+
+def task_rows(query):
+    """Narrow a Task query to the plain columns TaskRowSerializer needs"""
+    return query.with_entities(*TASK_COLUMNS)
+
+
+class TaskRowSerializer:
+    """Callable turning a task row tuple into the Task.to_dict() shape"""
+
+    def __init__(self, today=None):
+        self.today = today or date.today()
+        self._iso = {None: None}
+
+    def _isoformat(self, value):
+        try:
+            return self._iso[value]
+        except KeyError:
+            text = self._iso[value] = value.isoformat()
+            return text
+
+    def __call__(self, row):
+        task_id, title, description, start_date, due_date, priority, status, user_id = row
+        return {
+            'task_id': task_id,
+            'title': title,
+            'description': description,
+            'start_date': self._isoformat(start_date),
+            'due_date': self._isoformat(due_date),
+            'priority': priority.value,
+            'status': status.value,
+            'user_id': user_id,
+            'is_overdue': due_date is not None and status not in CLOSED_STATUSES and self.today > due_date
+        }
+
+
+def serialize_task_rows(rows, today=None):
+    """List of task dicts for an iterable of task row tuples"""
+    return list(map(TaskRowSerializer(today), rows))
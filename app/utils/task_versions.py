@@ -0,0 +1,110 @@
+from app import db
+from app.models.task import Task
+from app.models.task_stats import TaskVersion
+from app.utils.task_counters import upsert_add
+from app.utils import task_changes
+from sqlalchemy import event, inspect
+
+# Per-user data version. Every task write bumps it in the same transaction,
+# so (user_id, version) identifies the state of a user's tasks and read
+# endpoints can answer If-None-Match without querying `tasks`.
+# ORM writes are picked up by an after_flush hook; set-based statements
+# (app.utils.task_bulk) call bump_versions() / next_change_seq() themselves.
+# The new version is also the change feed stamp of the written tasks
+# (app.utils.task_changes).
+# The users whose tasks a transaction wrote are collected in
+# session.info[TOUCHED_USERS] and handed to the on_commit() hooks once it
+# commits (replica read-your-writes, live task events).
+#
+# Bumping the version locks the user's task_versions row until commit. A
+# write whose counter deltas depend on the rows it reads (ORM update / delete
+# of a loaded task, the set-based writes of app.utils.task_bulk) takes that
+# lock with lock_user() *before* reading, and reads through lock_rows(): every
+# writer locks version -> rows, and no concurrent write of the user can change
+# the rows between the read and the write.
+
+TOUCHED_USERS = 'touched_task_users'
+
+_commit_hooks = []
+
+
+def bump_versions(user_ids):
+    user_ids = sorted({int(user_id) for user_id in user_ids})
+    for user_id in user_ids:
+        upsert_add(TaskVersion, {'user_id': user_id}, {'version': 1})
+    db.session.info.setdefault(TOUCHED_USERS, set()).update(user_ids)
+
+
+def next_change_seq(user_id):
+    """Bump the user's version and return it: the change_seq of this transaction's task writes"""
+    bump_versions([user_id])
+    return current_version(user_id)
+
+
+def lock_user(user_id):
+    """Take the user's write lock (bumps the version) before reading the rows a write depends on"""
+    bump_versions([user_id])
+
+
+def lock_rows(query):
+    """`query` with its rows locked on PostgreSQL; SQLite already holds the database write lock"""
+    if db.session.get_bind().dialect.name == 'postgresql':
+        return query.with_for_update()
+    return query
+
+
+def current_version(user_id, session=None):
+    """Current data version of a user (0 before their first task write)"""
+    version = (session or db.session).query(TaskVersion.version).filter_by(user_id=user_id).scalar()
+    return version or 0
+
+
+def _touched_users(session, flush_context):
+    created, written, deleted = {}, {}, {}
+    for obj in session.new:
+        if isinstance(obj, Task):
+            created.setdefault(int(obj.user_id), []).append(obj)
+    for obj in session.deleted:
+        if isinstance(obj, Task):
+            deleted.setdefault(int(obj.user_id), []).append(obj.task_id)
+    for obj in session.dirty:
+        if isinstance(obj, Task) and session.is_modified(obj):
+            history = inspect(obj).attrs.user_id.history
+            # moved to another user: a delete for the previous owner
+            for value in history.deleted or ():
+                if value is not None and int(value) != int(obj.user_id):
+                    deleted.setdefault(int(value), []).append(obj.task_id)
+            written.setdefault(int(obj.user_id), []).append(obj)
+
+    user_ids = set(created) | set(written) | set(deleted)
+    if not user_ids:
+        return
+    bump_versions(user_ids)
+    for user_id in sorted(user_ids):
+        seq = current_version(user_id, session)
+        task_changes.stamp_written(user_id, seq, tasks=created.get(user_id, ()), created=True, session=session)
+        task_changes.stamp_written(user_id, seq, tasks=written.get(user_id, ()), session=session)
+        task_changes.record_deleted(user_id, seq, deleted.get(user_id, ()), session=session)
+
+
+def on_commit(hook):
+    """Call hook(user_ids) after every commit that wrote tasks of those users"""
+    if hook not in _commit_hooks:
+        _commit_hooks.append(hook)
+
+
+def _committed(session):
+    user_ids = session.info.pop(TOUCHED_USERS, None)
+    for hook in _commit_hooks if user_ids else ():
+        hook(user_ids)
+
+
+def _rolled_back(session, previous_transaction):
+    session.info.pop(TOUCHED_USERS, None)
+
+
+def register_version_events():
+    if not event.contains(db.session, 'after_flush', _touched_users):
+        event.listen(db.session, 'after_flush', _touched_users)
+        event.listen(db.session, 'after_commit', _committed)
+        event.listen(db.session, 'after_soft_rollback', _rolled_back)
@@ -0,0 +1,42 @@
+from collections import namedtuple
+from app import db
+from app.utils.cache import LRUCache
+
+# Per-process cache of user profiles keyed by user_id, used as the
+# flask_jwt_extended user_lookup_loader so `current_user` costs no database
+# round trip on the hot path. Entries expire after USER_CACHE_TTL seconds
+# (bounding staleness across worker processes) and are dropped at once in
+# this process when /auth/user PUT changes the user.
+
+UserProfile = namedtuple('UserProfile', ['user_id', 'name', 'email'])
+
+user_cache = LRUCache(0)
+
+
+def init_user_cache(app):
+    user_cache.maxsize = app.config.get('USER_CACHE_SIZE', 0)
+    user_cache.ttl = app.config.get('USER_CACHE_TTL') or None
+    user_cache.clear()
+
+
+def load_user_profile(user_id, session=None):
+    """Cached profile of a user, None if the user does not exist"""
+    user_id = int(user_id)
+    profile = user_cache.get(user_id)
+    if profile is None:
+        from app.models import User
+        row = (session or db.session).query(User.user_id, User.name, User.email).filter_by(user_id=user_id).first()
+        if row is None:
+            return None
+        profile = UserProfile(*row)
+        user_cache.set(user_id, profile)
+    return profile
+
+
+def invalidate_user(user_id):
+    user_cache.pop(int(user_id))
+
+
+def user_lookup(jwt_header, jwt_data):
+    """flask_jwt_extended user_lookup_loader: JWT subject -> UserProfile"""
+    return load_user_profile(jwt_data['sub'])
@@ -0,0 +1,120 @@
+import threading
+import time
+from collections import deque
+
+from flask import jsonify
+from sqlalchemy import event
+
+from app import db
+
+# Single-writer queue for SQLite deployments.
+#
+# SQLite allows one writer at a time. Under WAL, readers are never blocked,
+# but two request threads that both open a write transaction race for the
+# lock: the loser waits out busy_timeout or, when its read snapshot went
+# stale in between, fails at once with "database is locked".
+#
+# With SQLITE_WRITE_QUEUE on, a session takes a place in a FIFO queue right
+# before its first write (flush or bulk INSERT/UPDATE/DELETE) and leaves it
+# when the transaction ends, so write transactions of this process run one
+# after the other in arrival order while reads proceed untouched.
+# Waiting longer than SQLITE_WRITE_TIMEOUT raises WriteQueueTimeout.
+
+_HELD = 'write_queue_held'
+
+
+class WriteQueueTimeout(Exception):
+    """The write queue was not reached within SQLITE_WRITE_TIMEOUT seconds"""
+
+
+class WriteQueue:
+    """Lock granted to waiters in arrival order"""
+
+    def __init__(self, timeout=15):
+        self.timeout = timeout
+        self._cond = threading.Condition()
+        self._waiters = deque()
+        self._held = False
+        self.acquired = 0
+        self.total_wait = 0.0
+
+    def acquire(self, timeout=None):
+        timeout = self.timeout if timeout is None else timeout
+        token = object()
+        start = time.perf_counter()
+        with self._cond:
+            self._waiters.append(token)
+            try:
+                while self._held or self._waiters[0] is not token:
+                    remaining = timeout - (time.perf_counter() - start)
+                    if remaining <= 0 or not self._cond.wait(remaining):
+                        if self._held or self._waiters[0] is not token:
+                            return False
+            finally:
+                self._waiters.remove(token)
+                # the next waiter may now be at the head of the queue
+                self._cond.notify_all()
+            self._held = True
+            self.acquired += 1
+            self.total_wait += time.perf_counter() - start
+            return True
+
+    def release(self):
+        with self._cond:
+            self._held = False
+            self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            return {
+                'acquired': self.acquired,
+                'waiting': len(self._waiters),
+                'avg_wait_ms': round(self.total_wait / self.acquired * 1000, 3) if self.acquired else 0.0
+            }
+
+
+write_queue = WriteQueue()
+
+
+def _enter_queue(session):
+    if session.info.get(_HELD):
+        return
+    if not write_queue.acquire():
+        raise WriteQueueTimeout(f'Write queue busy for more than {write_queue.timeout}s')
+    session.info[_HELD] = True
+
+
+def _before_flush(session, flush_context, instances):
+    _enter_queue(session)
+
+
+def _before_bulk_statement(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        _enter_queue(orm_execute_state.session)
+
+
+def _after_transaction_end(session, transaction):
+    # only the outermost transaction ends the write; savepoints keep the place
+    if transaction.parent is None and session.info.pop(_HELD, False):
+        write_queue.release()
+
+
+def write_queue_timeout(e):
+    db.session.rollback()
+    return jsonify({"message": "Server busy, please retry shortly"}), 503, {"Retry-After": "1"}
+
+
+def init_write_queue(app):
+    """Serialize write transactions when SQLITE_WRITE_QUEUE is on and the database is SQLite"""
+    app.register_error_handler(WriteQueueTimeout, write_queue_timeout)
+    with app.app_context():
+        enabled = app.config.get('SQLITE_WRITE_QUEUE') and db.engine.dialect.name == 'sqlite'
+    if not enabled:
+        return
+
+    write_queue.timeout = app.config.get('SQLITE_WRITE_TIMEOUT', 15)
+    for name, listener in (('before_flush', _before_flush),
+                           ('do_orm_execute', _before_bulk_statement),
+                           ('after_transaction_end', _after_transaction_end)):
+        if not event.contains(db.session, name, listener):
+            event.listen(db.session, name, listener)
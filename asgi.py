@@ -0,0 +1,6 @@
+from app import create_app
+from app.routes.async_task_routes import AsyncTaskReads
+
+# ASGI entry point: task reads on the asyncio engine, the rest of the API through Flask
+#     uvicorn asgi:app
+app = AsyncTaskReads(create_app())
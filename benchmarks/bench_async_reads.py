@@ -0,0 +1,185 @@
+"""
+Sync vs async task reads at high concurrency.
+
+Starts one uvicorn worker per mode against the same seeded SQLite file:
+  sync   Flask app on a pool of ASGI_WSGI_THREADS threads (a2wsgi)
+  async  asgi.AsyncTaskReads: task reads on the asyncio engine (aiosqlite)
+and drives GET /user/tasks/ with N concurrent keep-alive connections.
+--db-latency-ms adds a sleep to every SQL statement (in the thread running
+it) to stand in for a remote / loaded database.
+
+    python benchmarks/bench_async_reads.py --concurrency 50,200,500 --db-latency-ms 20
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def add_latency(engine, seconds, is_async=False):
+    """Sleep `seconds` before each statement, on the thread executing it"""
+    from sqlalchemy import event
+    from sqlalchemy.util import await_only
+
+    def trace(statement):
+        time.sleep(seconds)
+
+    @event.listens_for(engine, 'connect')
+    def slow_connection(dbapi_connection, connection_record):
+        result = connection_record.driver_connection.set_trace_callback(trace)
+        if is_async:
+            await_only(result)
+
+
+def serve(args):
+    import uvicorn
+    from a2wsgi import WSGIMiddleware
+    from app import create_app, db
+    from app.routes.async_task_routes import AsyncTaskReads
+
+    flask_app = create_app()
+    latency = args.db_latency_ms / 1000
+    with flask_app.app_context():
+        add_latency(db.engine, latency)
+
+    if args.serve == 'async':
+        asgi_app = AsyncTaskReads(flask_app)
+        add_latency(asgi_app.engine.sync_engine, latency, is_async=True)
+    else:
+        asgi_app = WSGIMiddleware(flask_app, workers=flask_app.config['ASGI_WSGI_THREADS'])
+
+    uvicorn.run(asgi_app, host='127.0.0.1', port=args.port, log_level='warning',
+                lifespan='on' if args.serve == 'async' else 'off', backlog=4096)
+
+
+def seed(tasks):
+    from datetime import date, timedelta
+    from flask_jwt_extended import create_access_token
+    from app import create_app, db
+    from app.models import User, Task
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        user = User(name='bench', email='bench@example.com', password_hash='x')
+        db.session.add(user)
+        db.session.commit()
+        today = date.today()
+        db.session.execute(db.insert(Task), [{
+            'title': f'Task {i}',
+            'due_date': today + timedelta(days=i % 90 - 30) if i % 4 else None,
+            'user_id': user.user_id
+        } for i in range(tasks)])
+        db.session.commit()
+        token = create_access_token(identity=str(user.user_id), expires_delta=False)
+        db.engine.dispose()
+    return token
+
+
+async def client(port, request, deadline, latencies, errors):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            status = int((await reader.readline()).split()[1])
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                if name.lower() == 'content-length':
+                    length = int(value)
+            await reader.readexactly(length)
+            if status == 200:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors.append(status)
+    except (ConnectionError, asyncio.IncompleteReadError):
+        errors.append('connection')
+    finally:
+        writer.close()
+
+
+async def load(port, token, path, concurrency, seconds):
+    request = (f'GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\n'
+               f'Authorization: Bearer {token}\r\n\r\n').encode('latin-1')
+    latencies, errors = [], []
+    deadline = time.perf_counter() + seconds
+    await asyncio.gather(*[client(port, request, deadline, latencies, errors) for _ in range(concurrency)])
+    return latencies, errors
+
+
+def wait_for_port(port, timeout=30):
+    end = time.time() + timeout
+    while time.time() < end:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f'server on port {port} did not start')
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', default='50,200,500', help='comma separated connection counts')
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--db-latency-ms', type=float, default=20)
+    parser.add_argument('--tasks', type=int, default=2000)
+    parser.add_argument('--path', default='/user/tasks/?per_page=20')
+    parser.add_argument('--threads', type=int, default=10, help='sync mode worker threads (ASGI_WSGI_THREADS)')
+    parser.add_argument('--pool-size', type=int, default=50, help='database connections per engine')
+    parser.add_argument('--serve', choices=('sync', 'async'), help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        return serve(args)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'bench.db')}", BCRYPT_POOL_SIZE='0',
+                   ASGI_WSGI_THREADS=str(args.threads), DB_POOL_SIZE=str(args.pool_size), DB_MAX_OVERFLOW='0')
+        os.environ.update(env)
+        token = seed(args.tasks)
+
+        print(f"{args.db_latency_ms:g} ms per statement, {args.threads} sync threads, "
+              f"{args.pool_size} connections per engine, {args.seconds:g}s per run, GET {args.path}")
+        print(f"{'mode':6} {'conns':>6} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}")
+        for mode in ('sync', 'async'):
+            port = free_port()
+            server = subprocess.Popen(
+                [sys.executable, os.path.abspath(__file__), '--serve', mode, '--port', str(port),
+                 '--db-latency-ms', str(args.db_latency_ms)], env=env
+            )
+            try:
+                wait_for_port(port)
+                for concurrency in (int(value) for value in args.concurrency.split(',')):
+                    latencies, errors = asyncio.run(load(port, token, args.path, concurrency, args.seconds))
+                    latencies.sort()
+                    p99 = latencies[int(len(latencies) * 0.99)] if latencies else 0
+                    print(f"{mode:6} {concurrency:6d} {len(latencies) / args.seconds:9.0f} "
+                          f"{statistics.median(latencies or [0]) * 1000:9.1f} {p99 * 1000:9.1f} {len(errors):7d}")
+            finally:
+                server.terminate()
+                server.wait()
+
+
+if __name__ == '__main__':
+    main()
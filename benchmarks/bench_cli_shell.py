@@ -0,0 +1,145 @@
+"""
+Per-command latency of the CLI: one process per command vs `shell`.
+
+Seeds a temporary database, serves it on a local port (threaded WSGI server)
+and runs the same command script twice:
+  one-shot  `python -m app.cli <command>` for every line (interpreter start,
+            imports, token file, new connection each time)
+  shell     one `python -m app.cli shell --timing` fed the script on stdin
+            (warm process, pooled keep-alive session, ETag result cache)
+
+    python benchmarks/bench_cli_shell.py --repeat 20
+"""
+import argparse
+import os
+import re
+import shlex
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+COMMANDS = [
+    'stat-tasks',
+    'todays-tasks',
+    'list --per-page 20',
+    'recent-tasks --limit 5',
+    'get-task 1',
+]
+
+
+def serve(port):
+    sys.path.insert(0, ROOT)
+    from werkzeug.serving import run_simple
+    from app import create_app
+
+    run_simple('127.0.0.1', port, create_app(), threaded=True)
+
+
+def seed(tasks, workdir):
+    sys.path.insert(0, ROOT)
+    from datetime import date, timedelta
+    from flask_jwt_extended import create_access_token
+    from app import create_app, db
+    from app.models import User, Task
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        user = User(name='bench', email='bench@example.com', password_hash='x')
+        db.session.add(user)
+        db.session.commit()
+        today = date.today()
+        db.session.execute(db.insert(Task), [{
+            'title': f'Task {i}',
+            'due_date': today + timedelta(days=i % 30 - 10) if i % 3 else None,
+            'user_id': user.user_id
+        } for i in range(tasks)])
+        db.session.commit()
+        token = create_access_token(identity=str(user.user_id), expires_delta=False)
+        db.engine.dispose()
+
+    with open(os.path.join(workdir, 'token.txt'), 'w') as f:
+        f.write(token)
+
+
+def wait_for_port(port, timeout=30):
+    end = time.time() + timeout
+    while time.time() < end:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f'server on port {port} did not start')
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def run_one_shot(script, workdir, env):
+    times = []
+    for line in script:
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-m', 'app.cli', *shlex.split(line)], cwd=workdir, env=env,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        times.append(time.perf_counter() - start)
+    return times, sum(times)
+
+
+def run_shell(script, workdir, env):
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-m', 'app.cli', 'shell', '--timing'], cwd=workdir, env=env,
+                            input='\n'.join(script) + '\n', capture_output=True, text=True, check=True)
+    wall = time.perf_counter() - start
+    times = [float(ms) / 1000 for ms in re.findall(r'^\(([\d.]+) ms\)', result.stderr, re.MULTILINE)]
+    return times, wall
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=20, help='times the command list is run')
+    parser.add_argument('--tasks', type=int, default=2000)
+    parser.add_argument('--serve', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        return serve(args.serve)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        port = free_port()
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'bench.db')}", BCRYPT_POOL_SIZE='0',
+                   PYTHONPATH=ROOT, TASKFLOW_API_URL=f'http://127.0.0.1:{port}')
+        os.environ.update(env)
+        seed(args.tasks, tmp)
+
+        server = subprocess.Popen([sys.executable, os.path.abspath(__file__), '--serve', str(port)], env=env,
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            wait_for_port(port)
+            script = COMMANDS * args.repeat
+            print(f"{len(script)} commands ({len(COMMANDS)} distinct x {args.repeat}), {args.tasks} tasks")
+            print(f"{'mode':9} {'total s':>8} {'mean ms':>8} {'p50 ms':>8} {'p95 ms':>8}")
+            for mode, run in (('one-shot', run_one_shot), ('shell', run_shell)):
+                times, wall = run(script, tmp, env)
+                print(f"{mode:9} {wall:8.2f} {statistics.mean(times) * 1000:8.1f} "
+                      f"{statistics.median(times) * 1000:8.1f} {percentile(times, 95) * 1000:8.1f}")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == '__main__':
+    main()
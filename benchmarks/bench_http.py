@@ -0,0 +1,614 @@
+"""
+Latency / throughput benchmark of every route of task_routes.py and auth_routes.py.
+
+Seeds a throw-away SQLite database with a fixed data set (same rows on every
+run, due dates relative to today) and runs one scenario per route:
+  test client   (default) Flask test client in this process: handler cost
+                without the network, one request at a time
+  --server      the app served by werkzeug (threaded WSGI) or uvicorn (asgi.py)
+                in a child process, driven by --concurrency keep-alive clients
+Reports p50/p95/p99 latency, requests/sec and SQL statements per request
+(counted in this process, on the test client requests - with --server on
+the warm-up ones), and warns about routes without a scenario.
+
+Routes run in --rounds interleaved rounds; p50 / p95 are the median of the
+rounds' values, which keeps a background hiccup from moving one route.
+--output saves the results as JSON; --compare checks a run against a saved
+one and exits with status 1 when a route got slower than --threshold percent
+(p50 / p95, beyond --noise-ms), lost throughput, or runs more queries.
+
+    python benchmarks/bench_http.py --output bench-before.json
+    python benchmarks/bench_http.py --compare bench-before.json --threshold 15
+    python benchmarks/bench_http.py --server uvicorn --concurrency 16 --only 'GET /user/tasks'
+"""
+import argparse
+import contextlib
+import gc
+import json
+import os
+import platform
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WORDS = ['report', 'invoice', 'meeting', 'deploy', 'review', 'budget', 'email', 'design']
+STATUSES = ['PENDING', 'IN_PROGRESS', 'COMPLETED', 'CANCELLED']
+PRIORITIES = ['LOW', 'MEDIUM', 'HIGH']
+BULK_SIZE = 50
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port, timeout=30):
+    end = time.time() + timeout
+    while time.time() < end:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f'server on port {port} did not start')
+
+
+def git_revision():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT,
+                                    capture_output=True, text=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+
+
+#******************************************************************************
+# Data set
+#******************************************************************************
+
+class Context:
+    """Tokens, seeded ids and per-scenario data shared by the request builders"""
+
+    def __init__(self, app, user_id, task_ids):
+        from flask_jwt_extended import create_access_token, create_refresh_token
+
+        self.app = app
+        self.user_id = user_id
+        self.task_ids = task_ids
+        with app.app_context():
+            self.access = create_access_token(identity=str(user_id), expires_delta=False)
+            self.refresh = create_refresh_token(identity=str(user_id), expires_delta=False)
+        self.data = {}
+
+    def auth(self, token=None):
+        return {'Authorization': f'Bearer {token or self.access}'}
+
+
+def seed(app, tasks):
+    """Two users with `tasks` tasks each (the second one only adds rows the queries must skip)"""
+    from app import db
+    from app.models import User, Task
+    from app.utils import task_counters
+
+    today = date.today()
+    with app.app_context():
+        db.create_all()
+        users = []
+        for name in ('bench', 'other'):
+            user = User(name=name, email=f'{name}@example.com')
+            user.set_password('bench-password')
+            db.session.add(user)
+            users.append(user)
+        db.session.commit()
+
+        for user in users:
+            db.session.execute(db.insert(Task), [{
+                'title': f'{WORDS[i % len(WORDS)].title()} task {i}',
+                'description': f'Seeded {WORDS[(i * 3) % len(WORDS)]} work item {i}',
+                'status': STATUSES[i % len(STATUSES)],
+                'priority': PRIORITIES[i % len(PRIORITIES)],
+                'start_date': today - timedelta(days=i % 60) if i % 2 else None,
+                'due_date': today + timedelta(days=i % 90 - 30) if i % 5 else None,
+                'user_id': user.user_id
+            } for i in range(tasks)])
+        # rows inserted behind the ORM's back: recompute the stats counters
+        task_counters.rebuild_counters()
+        db.session.commit()
+
+        user_id = users[0].user_id
+        task_ids = [task_id for (task_id,) in db.session.query(Task.task_id).filter_by(user_id=user_id)
+                    .order_by(Task.task_id)]
+        db.engine.dispose()
+    return user_id, task_ids
+
+
+def create_tasks(ctx, count, prefix):
+    """Insert `count` fresh tasks for the bench user (untimed) and return their ids"""
+    from app import db
+    from app.schema.task_schema import TaskCreateSchema
+    from app.utils import task_bulk
+
+    with ctx.app.app_context():
+        task_ids = task_bulk.insert_tasks(
+            ctx.user_id, [TaskCreateSchema(title=f'{prefix} {i}') for i in range(count)], chunk_size=500
+        )
+        db.session.commit()
+    return task_ids
+
+
+#******************************************************************************
+# Scenarios: one request builder per route (i = iteration, warm-up included)
+#******************************************************************************
+
+class Scenario:
+    """
+    name: label in the report and the JSON results
+    build(ctx, i): dict of method, path and test-client style options (headers, json, data, query_string)
+    prepare(ctx, count): untimed setup for `count` iterations (e.g. tasks to delete)
+    scale: fraction of --requests to run (expensive routes)
+    stream: only the first chunk of the body is read (event stream)
+    """
+
+    def __init__(self, name, build, prepare=None, scale=1.0, stream=False):
+        self.name = name
+        self.build = build
+        self.prepare = prepare
+        self.scale = scale
+        self.stream = stream
+
+
+def _get(path, **query):
+    return lambda ctx, i: {'method': 'GET', 'path': path, 'headers': ctx.auth(), 'query_string': query}
+
+
+def _prepare_etag(ctx, count):
+    with ctx.app.test_client() as client:
+        ctx.data['etag'] = client.get('/user/tasks/stats', headers=ctx.auth()).headers['ETag']
+
+
+def _prepare_delete(ctx, count):
+    ctx.data['delete'] = create_tasks(ctx, count, 'Delete me')
+
+
+def _prepare_bulk_delete(ctx, count):
+    ids = create_tasks(ctx, count * BULK_SIZE, 'Bulk delete me')
+    ctx.data['bulk_delete'] = [ids[i:i + BULK_SIZE] for i in range(0, len(ids), BULK_SIZE)]
+
+
+def _prepare_signup(ctx, count):
+    ctx.data['signup'] += 1
+
+
+def _prepare_logout(ctx, count):
+    from flask_jwt_extended import create_refresh_token
+
+    with ctx.app.app_context():
+        ctx.data['logout'] = [create_refresh_token(identity=str(ctx.user_id)) for _ in range(count)]
+
+
+def _import_body(i):
+    lines = (json.dumps({'title': f'Imported {i}-{n}', 'priority': 'MEDIUM'}) for n in range(BULK_SIZE))
+    return ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+SCENARIOS = [
+    # ---- task reads ----
+    Scenario('GET /user/tasks/', lambda ctx, i: {
+        'method': 'GET', 'path': '/user/tasks/', 'headers': ctx.auth(),
+        'query_string': {'page': i % 10 + 1, 'per_page': 20}}),
+    Scenario('GET /user/tasks/ filtered', _get('/user/tasks/', status='PENDING', priority='HIGH', search='report')),
+    Scenario('GET /user/tasks/ keyset', _get('/user/tasks/', cursor='', per_page=20)),
+    Scenario('GET /user/tasks/stats 304', lambda ctx, i: {
+        'method': 'GET', 'path': '/user/tasks/stats',
+        'headers': {**ctx.auth(), 'If-None-Match': ctx.data['etag']}}, prepare=_prepare_etag),
+    Scenario('GET /user/tasks/search', lambda ctx, i: {
+        'method': 'GET', 'path': '/user/tasks/search', 'headers': ctx.auth(),
+        'query_string': {'q': WORDS[i % len(WORDS)], 'per_page': 20}}),
+    Scenario('GET /user/tasks/export', _get('/user/tasks/export', format='ndjson'), scale=0.1),
+    Scenario('GET /user/tasks/changes', _get('/user/tasks/changes', limit=500), scale=0.25),
+    Scenario('GET /user/tasks/events', _get('/user/tasks/events'), scale=0.25, stream=True),
+    Scenario('GET /user/tasks/<id>', lambda ctx, i: {
+        'method': 'GET', 'path': f'/user/tasks/{ctx.task_ids[i * 7 % len(ctx.task_ids)]}', 'headers': ctx.auth()}),
+    Scenario('GET /user/tasks/overdue', _get('/user/tasks/overdue')),
+    Scenario('GET /user/tasks/today', _get('/user/tasks/today')),
+    Scenario('GET /user/tasks/stats', _get('/user/tasks/stats')),
+    Scenario('GET /user/tasks/recent', _get('/user/tasks/recent', limit=10)),
+    Scenario('GET /user/tasks/upcoming', _get('/user/tasks/upcoming')),
+    # ---- task writes ----
+    Scenario('POST /user/tasks/', lambda ctx, i: {
+        'method': 'POST', 'path': '/user/tasks/', 'headers': ctx.auth(),
+        'json': {'title': f'Created {i}', 'description': 'bench', 'priority': PRIORITIES[i % 3]}}),
+    Scenario('POST /user/tasks/bulk', lambda ctx, i: {
+        'method': 'POST', 'path': '/user/tasks/bulk', 'headers': ctx.auth(),
+        'json': [{'title': f'Bulk {i}-{n}'} for n in range(BULK_SIZE)]}, scale=0.25),
+    Scenario('POST /user/tasks/import', lambda ctx, i: {
+        'method': 'POST', 'path': '/user/tasks/import', 'query_string': {'format': 'ndjson'},
+        'headers': {**ctx.auth(), 'Content-Type': 'application/x-ndjson'}, 'data': _import_body(i)}, scale=0.25),
+    Scenario('PATCH /user/tasks/bulk', lambda ctx, i: {
+        'method': 'PATCH', 'path': '/user/tasks/bulk', 'headers': ctx.auth(),
+        'json': {'task_ids': [ctx.task_ids[(i * BULK_SIZE + n) % len(ctx.task_ids)] for n in range(BULK_SIZE)],
+                 'changes': {'priority': PRIORITIES[i % 3]}}}, scale=0.25),
+    Scenario('PUT /user/tasks/<id>', lambda ctx, i: {
+        'method': 'PUT', 'path': f'/user/tasks/{ctx.task_ids[i * 11 % len(ctx.task_ids)]}', 'headers': ctx.auth(),
+        'json': {'status': STATUSES[i % 3], 'description': f'Updated {i}'}}),
+    Scenario('DELETE /user/tasks/<id>', lambda ctx, i: {
+        'method': 'DELETE', 'path': f"/user/tasks/{ctx.data['delete'][i]}", 'headers': ctx.auth()},
+        prepare=_prepare_delete),
+    Scenario('DELETE /user/tasks/bulk_delete', lambda ctx, i: {
+        'method': 'DELETE', 'path': '/user/tasks/bulk_delete', 'headers': ctx.auth(),
+        'json': {'task_ids': ctx.data['bulk_delete'][i]}}, prepare=_prepare_bulk_delete, scale=0.25),
+    # ---- auth ----
+    Scenario('POST /auth/signup', lambda ctx, i: {
+        'method': 'POST', 'path': '/auth/signup',
+        'json': {'name': 'Bench user', 'email': f"bench-{ctx.data['run']}-{ctx.data['signup']}-{i}@example.com",
+                 'password': 'bench-password'}}, _prepare_signup, scale=0.1),
+    Scenario('POST /auth/login', lambda ctx, i: {
+        'method': 'POST', 'path': '/auth/login',
+        'json': {'email': 'bench@example.com', 'password': 'bench-password'}}, scale=0.1),
+    Scenario('POST /auth/refresh', lambda ctx, i: {
+        'method': 'POST', 'path': '/auth/refresh', 'headers': ctx.auth(ctx.refresh)}),
+    Scenario('GET /auth/user', lambda ctx, i: {'method': 'GET', 'path': '/auth/user', 'headers': ctx.auth()}),
+    Scenario('PUT /auth/user', lambda ctx, i: {
+        'method': 'PUT', 'path': '/auth/user', 'headers': ctx.auth(), 'json': {'name': f'Bench {i % 2}'}}),
+    Scenario('POST /auth/logout', lambda ctx, i: {
+        'method': 'POST', 'path': '/auth/logout', 'headers': ctx.auth(ctx.data['logout'][i])},
+        prepare=_prepare_logout),
+]
+
+
+def uncovered_routes(app):
+    """'METHOD /rule' of the auth / task routes that no scenario requests"""
+    adapter = app.url_map.bind('localhost')
+    covered = set()
+    for scenario in SCENARIOS:
+        request = scenario.build(_ProbeContext(), 0)
+        endpoint, _ = adapter.match(request['path'], method=request['method'])
+        covered.add((endpoint, request['method']))
+    missing = []
+    for rule in app.url_map.iter_rules():
+        if rule.endpoint.split('.')[0] not in ('auth', 'task_bp'):
+            continue
+        for method in sorted(rule.methods - {'HEAD', 'OPTIONS'}):
+            if (rule.endpoint, method) not in covered:
+                missing.append(f'{method} {rule.rule}')
+    return missing
+
+
+class _ProbeContext:
+    """Stand-in context for resolving scenario paths without a database"""
+    task_ids = [1]
+    data = {'etag': '', 'delete': [1], 'bulk_delete': [[1]], 'logout': [''], 'run': 0, 'signup': 0}
+    refresh = access = ''
+
+    def auth(self, token=None):
+        return {}
+
+
+#******************************************************************************
+# Runners
+#******************************************************************************
+
+_devnull = open(os.devnull, 'w')
+
+
+class QueryCounter:
+    """SQL statements executed by this process's engine"""
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+
+        self.count = 0
+        event.listen(engine, 'before_cursor_execute', self._count)
+
+    def _count(self, *args):
+        self.count += 1
+
+
+def _test_client_request(client, request, stream):
+    options = {key: request[key] for key in ('headers', 'json', 'data', 'query_string') if key in request}
+    # handlers that print() would otherwise time the terminal too
+    with contextlib.redirect_stdout(_devnull):
+        response = client.open(request['path'], method=request['method'], buffered=not stream, **options)
+    if stream:
+        next(iter(response.response), None)
+    status = response.status_code
+    response.close()
+    return status
+
+
+def run_test_client(ctx, counter, scenario, requests, warmup):
+    """Sequential requests through the test client: (latencies, errors, queries per request, wall seconds)"""
+    client = ctx.app.test_client()
+    for i in range(warmup):
+        _test_client_request(client, scenario.build(ctx, i), scenario.stream)
+
+    latencies, queries, errors = [], [], 0
+    wall = time.perf_counter()
+    for i in range(warmup, warmup + requests):
+        request = scenario.build(ctx, i)
+        before = counter.count
+        start = time.perf_counter()
+        status = _test_client_request(client, request, scenario.stream)
+        latencies.append(time.perf_counter() - start)
+        queries.append(counter.count - before)
+        errors += status >= 400
+    return latencies, errors, queries, time.perf_counter() - wall
+
+
+def run_server(ctx, counter, scenario, requests, warmup, base_url, concurrency):
+    """
+    `warmup` requests through the test client (query count), `warmup` through
+    the server, then `requests` spread over `concurrency` keep-alive clients
+    """
+    import requests as http
+
+    client = ctx.app.test_client()
+    queries = []
+    for i in range(warmup):
+        before = counter.count
+        _test_client_request(client, scenario.build(ctx, i), scenario.stream)
+        queries.append(counter.count - before)
+
+    def send(session, request):
+        response = session.request(request['method'], base_url + request['path'], headers=request.get('headers'),
+                                   params=request.get('query_string'), json=request.get('json'),
+                                   data=request.get('data'), stream=scenario.stream, timeout=60)
+        if scenario.stream:
+            next(response.iter_content(chunk_size=None), None)
+        else:
+            response.content
+        response.close()
+        return response.status_code
+
+    with http.Session() as session:
+        for i in range(warmup, 2 * warmup):
+            send(session, scenario.build(ctx, i))
+
+    pending = iter(range(2 * warmup, 2 * warmup + requests))
+    lock = threading.Lock()
+    latencies, errors = [], []
+
+    def worker():
+        with http.Session() as session:
+            while True:
+                with lock:
+                    i = next(pending, None)
+                if i is None:
+                    return
+                request = scenario.build(ctx, i)
+                start = time.perf_counter()
+                status = send(session, request)
+                elapsed = time.perf_counter() - start
+                with lock:
+                    latencies.append(elapsed)
+                    errors.append(status >= 400)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    wall = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, sum(errors), queries, time.perf_counter() - wall
+
+
+def serve(server, port):
+    sys.path.insert(0, ROOT)
+    from app import create_app
+
+    if server == 'uvicorn':
+        import uvicorn
+        from app.routes.async_task_routes import AsyncTaskReads
+
+        uvicorn.run(AsyncTaskReads(create_app()), host='127.0.0.1', port=port, log_level='warning', backlog=4096)
+    else:
+        from werkzeug.serving import run_simple
+
+        run_simple('127.0.0.1', port, create_app(), threaded=True)
+
+
+#******************************************************************************
+# Results
+#******************************************************************************
+
+def summarize(rounds):
+    """One route's results from its rounds [(latencies, errors, queries, wall seconds)]"""
+    ms = lambda seconds: round(seconds * 1000, 3)
+    latencies = [value for measured in rounds for value in measured[0]]
+    queries = [value for measured in rounds for value in measured[2]]
+    wall = sum(measured[3] for measured in rounds)
+    return {
+        'requests': len(latencies),
+        'errors': sum(measured[1] for measured in rounds),
+        'p50_ms': ms(statistics.median(percentile(measured[0], 50) for measured in rounds)),
+        'p95_ms': ms(statistics.median(percentile(measured[0], 95) for measured in rounds)),
+        'p99_ms': ms(percentile(latencies, 99)),
+        'mean_ms': ms(statistics.mean(latencies)) if latencies else 0.0,
+        'rps': round(len(latencies) / wall, 1) if wall else 0.0,
+        'queries': statistics.median(queries) if queries else None,
+        'p50_rounds_ms': [ms(percentile(measured[0], 50)) for measured in rounds],
+    }
+
+
+def print_results(results):
+    print(f"{'route':36} {'n':>5} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/s':>8} {'queries':>7} {'errors':>6}")
+    for name, r in results.items():
+        queries = '-' if r['queries'] is None else f"{r['queries']:g}"
+        print(f"{name:36} {r['requests']:5d} {r['p50_ms']:8.2f} {r['p95_ms']:8.2f} {r['p99_ms']:8.2f} "
+              f"{r['rps']:8.1f} {queries:>7} {r['errors']:6d}")
+
+
+def compare(baseline, current, threshold, noise_ms):
+    """
+    Print the change of every route against `baseline` and return the
+    regressions: p50 / p95 up by more than threshold% (and noise_ms),
+    req/s down by more than threshold%, or more queries per request.
+    """
+    for key in ('mode', 'server', 'concurrency', 'tasks'):
+        if baseline['meta'].get(key) != current['meta'].get(key):
+            print(f"warning: baseline {key}={baseline['meta'].get(key)!r}, this run {key}={current['meta'].get(key)!r}")
+
+    limit = threshold / 100
+    regressions = []
+    print(f"\ncompared with {baseline['meta'].get('commit')} (threshold {threshold:g}%, noise {noise_ms:g} ms)")
+    print(f"{'route':36} {'p50 ms':>18} {'p95 ms':>18} {'req/s':>18} {'queries':>9}")
+    for name, cur in current['results'].items():
+        base = baseline['results'].get(name)
+        if base is None:
+            print(f"{name:36} (new)")
+            continue
+        problems = []
+        for metric in ('p50_ms', 'p95_ms'):
+            if cur[metric] > base[metric] * (1 + limit) and cur[metric] - base[metric] > noise_ms:
+                problems.append(metric)
+        if cur['rps'] < base['rps'] * (1 - limit) and cur['mean_ms'] - base['mean_ms'] > noise_ms:
+            problems.append('rps')
+        if cur['queries'] is not None and base['queries'] is not None and cur['queries'] > base['queries']:
+            problems.append('queries')
+
+        change = lambda a, b: f"{a:7.2f}>{b:7.2f} {((b - a) / a * 100 if a else 0):+4.0f}%"
+        queries = f"{base['queries'] if base['queries'] is not None else '-'}>{cur['queries'] if cur['queries'] is not None else '-'}"
+        line = (f"{name:36} {change(base['p50_ms'], cur['p50_ms']):>18} {change(base['p95_ms'], cur['p95_ms']):>18} "
+                f"{change(base['rps'], cur['rps']):>18} {queries:>9}")
+        if problems:
+            line += f"  REGRESSION ({', '.join(problems)})"
+            regressions.append((name, problems))
+        print(line)
+    return regressions
+
+
+#******************************************************************************
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=200, help='timed requests per route (some routes run fewer)')
+    parser.add_argument('--warmup', type=int, default=5, help='untimed requests per route and round first')
+    parser.add_argument('--rounds', type=int, default=3, help='interleaved rounds over the routes')
+    parser.add_argument('--tasks', type=int, default=5000, help='seeded tasks per user')
+    parser.add_argument('--server', choices=['werkzeug', 'uvicorn'], help='serve the app in a child process')
+    parser.add_argument('--concurrency', type=int, default=8, help='concurrent clients with --server')
+    parser.add_argument('--only', help='regular expression: run the routes whose name matches')
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--compare', help='JSON results of an earlier run to compare with')
+    parser.add_argument('--threshold', type=float, default=15, help='allowed slowdown in percent')
+    parser.add_argument('--noise-ms', type=float, default=1.0, help='latency changes below this are ignored')
+    parser.add_argument('--serve', help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        return serve(args.serve, args.port)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # the app reads its configuration at import time
+        env = {
+            'DATABASE_URL': f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+            'BCRYPT_POOL_SIZE': '0',
+            'PYTHONPATH': ROOT,
+        }
+        os.environ.update(env)
+        sys.path.insert(0, ROOT)
+        from app import create_app, db
+
+        app = create_app()
+        user_id, task_ids = seed(app, args.tasks)
+        ctx = Context(app, user_id, task_ids)
+        ctx.data.update(run=int(time.time()), signup=0)
+        with app.app_context():
+            counter = QueryCounter(db.engine)
+
+        missing = uncovered_routes(app)
+        for route in missing:
+            print(f"warning: no scenario for {route}")
+
+        scenarios = [s for s in SCENARIOS if not args.only or re.search(args.only, s.name)]
+        if not scenarios:
+            parser.error(f'--only {args.only!r} matches no route')
+        server = None
+        base_url = None
+        if args.server:
+            port = free_port()
+            server = subprocess.Popen([sys.executable, os.path.abspath(__file__), '--serve', args.server,
+                                       '--port', str(port)], env=dict(os.environ),
+                                      stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            wait_for_port(port)
+            base_url = f'http://127.0.0.1:{port}'
+
+        commit, dirty = git_revision()
+        mode = f'{args.server} x{args.concurrency}' if args.server else 'test client'
+        rounds = max(1, args.rounds)
+        print(f"{len(scenarios)} routes x {rounds} rounds, {args.tasks} tasks per user, {mode}, "
+              f"commit {commit}{' (dirty)' if dirty else ''}")
+        measured = {scenario.name: [] for scenario in scenarios}
+        try:
+            for _ in range(rounds):
+                for scenario in scenarios:
+                    count = max(1, int(args.requests * scenario.scale))
+                    if scenario.prepare:
+                        scenario.prepare(ctx, count + 2 * args.warmup)
+                    gc.collect()
+                    if args.server:
+                        measured[scenario.name].append(run_server(ctx, counter, scenario, count, args.warmup,
+                                                                  base_url, max(1, args.concurrency)))
+                    else:
+                        measured[scenario.name].append(run_test_client(ctx, counter, scenario, count, args.warmup))
+            results = {name: summarize(route_rounds) for name, route_rounds in measured.items()}
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+    print_results(results)
+    report = {
+        'meta': {
+            'commit': commit,
+            'dirty': dirty,
+            'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'mode': 'server' if args.server else 'test-client',
+            'server': args.server,
+            'concurrency': args.concurrency if args.server else 1,
+            'tasks': args.tasks,
+            'requests': args.requests,
+            'warmup': args.warmup,
+            'rounds': rounds,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'uncovered_routes': missing,
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, report, args.threshold, args.noise_ms)
+        if regressions:
+            print(f"{len(regressions)} route(s) regressed")
+            sys.exit(1)
+        print("no regressions")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Full-text search latency for one user as the table fills with other users'
+tasks: each user's tasks sit in their own FTS rowid range, so a search should
+stay near-flat in the number of users.
+
+    python benchmarks/bench_search.py --users 100 1000 4000 --tasks-per-user 200
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+
+from app import create_app, db
+from app.models import User, Task
+from app.utils import task_search
+
+WORDS = ['report', 'meeting', 'invoice', 'groceries', 'expense', 'review', 'deploy', 'budget']
+QUERIES = ['rep', 'expense rep', 'budget review', 'report']
+
+
+def seed(first, last, tasks_per_user):
+    db.session.execute(db.insert(User), [
+        {'name': f'bench {u}', 'email': f'bench-{u}@example.com', 'password_hash': 'x'} for u in range(first, last)
+    ])
+    user_ids = db.session.scalars(db.select(User.user_id).where(User.user_id > first)).all()
+    db.session.execute(db.insert(Task), [{
+        'title': f'{WORDS[i % len(WORDS)]} {WORDS[(i * 3) % len(WORDS)]} {i}',
+        'description': f'Notes on {WORDS[(i * 5) % len(WORDS)]} number {i}',
+        'user_id': user_id
+    } for user_id in user_ids for i in range(tasks_per_user)])
+    db.session.commit()
+
+
+def measure(user_id, term, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        task_search.search_tasks(user_id, term, limit=21)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, nargs='+', default=[100, 1000, 4000])
+    parser.add_argument('--tasks-per-user', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        with db.engine.begin() as connection:
+            if not task_search.setup_search(connection):
+                sys.exit(f"No full-text index for {connection.dialect.name}")
+
+        seeded = 0
+        print(f"{'users':>7} {'tasks':>9}  " + '  '.join(f'{term!r:>15}' for term in QUERIES))
+        for users in sorted(args.users):
+            seed(seeded, users, args.tasks_per_user)
+            seeded = users
+            timings = [measure(1, term, args.repeat) for term in QUERIES]
+            print(f"{users:>7} {users * args.tasks_per_user:>9}  " + '  '.join(f'{ms:>12.2f} ms' for ms in timings))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+Task list serialization benchmark: ORM + Task.to_dict() + stdlib json
+versus row tuples + TaskRowSerializer + the app's JSON provider (orjson).
+
+    python benchmarks/bench_serialization.py --rows 50000 --repeat 5
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+
+from app import create_app, db
+from app.models import User, Task, StatusEnum, PriorityEnum
+from app.utils.task_serializer import task_rows, serialize_task_rows
+
+
+def seed(rows):
+    user = User(name='bench', email='bench@example.com', password_hash='x')
+    db.session.add(user)
+    db.session.flush()
+    statuses, priorities = list(StatusEnum), list(PriorityEnum)
+    today = date.today()
+    db.session.execute(db.insert(Task), [{
+        'title': f'Task {i}',
+        'description': f'Description of task {i}',
+        'start_date': today - timedelta(days=i % 30),
+        'due_date': today + timedelta(days=(i % 60) - 30) if i % 5 else None,
+        'status': statuses[i % len(statuses)],
+        'priority': priorities[i % len(priorities)],
+        'user_id': user.user_id
+    } for i in range(rows)])
+    db.session.commit()
+    return user.user_id
+
+
+def orm_path(app, user_id):
+    tasks = Task.query.filter_by(user_id=user_id).order_by(Task.due_date.asc()).all()
+    body = json.dumps({'success': True, 'data': [task.to_dict() for task in tasks]}, sort_keys=True)
+    db.session.expunge_all()
+    return body
+
+
+def row_path(app, user_id):
+    rows = task_rows(Task.query.filter_by(user_id=user_id).order_by(Task.due_date.asc())).all()
+    return app.json.dumps({'success': True, 'data': serialize_task_rows(rows)})
+
+
+def measure(fn, app, user_id, rows, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(app, user_id)
+        best = min(best, time.perf_counter() - start)
+    return rows / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        user_id = seed(args.rows)
+
+        assert json.loads(orm_path(app, user_id)) == json.loads(row_path(app, user_id))
+
+        before = measure(orm_path, app, user_id, args.rows, args.repeat)
+        after = measure(row_path, app, user_id, args.rows, args.repeat)
+
+    print(f"JSON provider: {type(app.json).__name__}")
+    print(f"ORM + to_dict + json : {before:12,.0f} rows/sec")
+    print(f"rows + serializer    : {after:12,.0f} rows/sec  ({after / before:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
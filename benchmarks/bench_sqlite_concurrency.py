@@ -0,0 +1,128 @@
+"""
+Concurrent read/write benchmark for the SQLite profiles: rollback journal
+(SQLite defaults), WAL + PRAGMAs, and WAL + the single-writer queue.
+
+Writer threads create and update tasks through the API while reader threads
+page through the task list; each profile runs in its own process against a
+fresh database file.
+
+    python benchmarks/bench_sqlite_concurrency.py --readers 8 --writers 4 --seconds 10
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROFILES = {
+    'rollback-journal': {'SQLITE_JOURNAL_MODE': 'DELETE', 'SQLITE_SYNCHRONOUS': 'FULL',
+                         'SQLITE_MMAP_SIZE': '0', 'SQLITE_CACHE_SIZE': '0', 'SQLITE_WRITE_QUEUE': '0'},
+    'wal': {'SQLITE_WRITE_QUEUE': '0'},
+    'wal+write-queue': {'SQLITE_WRITE_QUEUE': '1'},
+}
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def run_profile(args):
+    """Executed in a child process with the profile's environment"""
+    sys.path.insert(0, ROOT)
+    from flask_jwt_extended import create_access_token
+    from app import create_app, db
+    from app.models import User, Task
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        user = User(name='bench', email='bench@example.com', password_hash='x')
+        db.session.add(user)
+        db.session.commit()
+        db.session.execute(db.insert(Task), [
+            {'title': f'Seed {i}', 'user_id': user.user_id} for i in range(args.seed)
+        ])
+        db.session.commit()
+        headers = {'Authorization': f'Bearer {create_access_token(identity=str(user.user_id))}'}
+
+    stop = threading.Event()
+    lock = threading.Lock()
+    reads, writes, errors = [], [], []
+
+    def reader():
+        client = app.test_client()
+        while not stop.is_set():
+            start = time.perf_counter()
+            response = client.get('/user/tasks/?per_page=20', headers=headers)
+            elapsed = time.perf_counter() - start
+            with lock:
+                (reads if response.status_code == 200 else errors).append(elapsed)
+
+    def writer(n):
+        client = app.test_client()
+        i = 0
+        while not stop.is_set():
+            i += 1
+            start = time.perf_counter()
+            response = client.post('/user/tasks/', json={'title': f'W{n}-{i}'}, headers=headers)
+            ok = response.status_code == 201
+            if ok:
+                task_id = response.get_json()['data']['task_id']
+                response = client.put(f'/user/tasks/{task_id}', json={'status': 'IN_PROGRESS'}, headers=headers)
+                ok = response.status_code == 200
+            elapsed = time.perf_counter() - start
+            with lock:
+                (writes if ok else errors).append(elapsed)
+
+    threads = [threading.Thread(target=reader) for _ in range(args.readers)]
+    threads += [threading.Thread(target=writer, args=(n,)) for n in range(args.writers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    ms = lambda seconds: seconds * 1000
+    print(f"{len(reads) / args.seconds:9.0f} {ms(statistics.median(reads or [0])):8.1f} "
+          f"{ms(percentile(reads, 99)):8.1f} {len(writes) / args.seconds:9.0f} "
+          f"{ms(statistics.median(writes or [0])):8.1f} {ms(percentile(writes, 99)):8.1f} {len(errors):7d}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--seed', type=int, default=5000)
+    parser.add_argument('--profile', choices=PROFILES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.profile:
+        return run_profile(args)
+
+    print(f"{args.readers} readers, {args.writers} writers, {args.seconds:g}s per profile")
+    print(f"{'profile':18} {'reads/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'writes/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for name, overrides in PROFILES.items():
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ, BCRYPT_POOL_SIZE='0', DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+                       **overrides)
+            result = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--profile', name, '--readers', str(args.readers),
+                 '--writers', str(args.writers), '--seconds', str(args.seconds), '--seed', str(args.seed)],
+                env=env, capture_output=True, text=True
+            )
+            line = result.stdout.strip().splitlines()[-1] if result.returncode == 0 else f"failed: {result.stderr.strip()[-200:]}"
+            print(f"{name:18} {line}")
+
+
+if __name__ == '__main__':
+    main()
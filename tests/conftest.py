@@ -0,0 +1,91 @@
+import os
+import tempfile
+import uuid
+
+import pytest
+
+# app.config reads the environment at import time: point it at a throwaway
+# SQLite file and keep bcrypt cheap and inline before importing the app
+_db_dir = tempfile.mkdtemp(prefix='task-api-tests-')
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(_db_dir, 'test.db')
+os.environ.pop('REPLICA_DATABASE_URL', None)
+os.environ['BCRYPT_LOG_ROUNDS'] = '4'
+os.environ['BCRYPT_POOL_SIZE'] = '0'
+
+from app import create_app, db  # noqa: E402
+from app.config import Config  # noqa: E402
+from app.database import REPLICA_BIND, replica_bind  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def app():
+    app = create_app()
+    app.config['TESTING'] = True
+    with app.app_context():
+        # primary only: a replica app of make_app leaves its bind key on `db`
+        db.create_all(bind_key=None)
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def make_app(tmp_path):
+    """
+    Factory for an app of its own: a fresh primary SQLite file, optionally a
+    replica file, and config overrides. Apps are disposed after the test.
+    """
+    apps = []
+
+    def factory(replica=False, **config):
+        primary_url = f"sqlite:///{tmp_path / f'primary-{len(apps)}.db'}"
+        replica_url = f"sqlite:///{tmp_path / f'replica-{len(apps)}.db'}" if replica else None
+        with pytest.MonkeyPatch.context() as patch:
+            patch.setattr(Config, 'SQLALCHEMY_DATABASE_URI', primary_url)
+            patch.setattr(Config, 'REPLICA_DATABASE_URL', replica_url)
+            patch.setattr(Config, 'SQLALCHEMY_BINDS', {REPLICA_BIND: replica_bind(replica_url)} if replica else {})
+            for name, value in config.items():
+                patch.setattr(Config, name, value, raising=False)
+            app = create_app()
+        app.config['TESTING'] = True
+        with app.app_context():
+            db.create_all(bind_key=None)
+        apps.append(app)
+        return app
+
+    yield factory
+    for app in apps:
+        with app.app_context():
+            for engine in db.engines.values():
+                engine.dispose()
+
+
+def signup(client, name='Test User'):
+    """Sign up and log in a new user: the login response plus ready-made headers"""
+    email = f'user-{uuid.uuid4().hex[:12]}@example.com'
+    response = client.post('/auth/signup', json={'name': name, 'email': email, 'password': 'password123'})
+    assert response.status_code == 201, response.get_json()
+
+    response = client.post('/auth/login', json={'email': email, 'password': 'password123'})
+    assert response.status_code == 200, response.get_json()
+    login = response.get_json()
+    login['user_id'] = login['user']['user_id']
+    login['headers'] = {'Authorization': f"Bearer {login['access_token']}"}
+    return login
+
+
+@pytest.fixture
+def new_user():
+    """signup() as a fixture, for clients of apps made by make_app"""
+    return signup
+
+
+@pytest.fixture
+def user(client):
+    """A freshly signed-up, logged-in user of the shared app"""
+    return signup(client)
@@ -0,0 +1,152 @@
+import asyncio
+import json
+from datetime import timedelta
+from urllib.parse import urlencode
+
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import delete
+
+from app import db
+from app.models import User
+from app.routes.async_task_routes import AsyncTaskReads
+from app.utils.user_cache import invalidate_user
+from test_tasks import TASKS_URL, SAMPLE_TASKS, create_tasks
+
+
+async def _request(asgi, method, path, headers, query, body):
+    scope = {
+        'type': 'http', 'http_version': '1.1', 'method': method, 'scheme': 'http',
+        'path': path, 'raw_path': path.encode(), 'root_path': '',
+        'query_string': urlencode(query or {}).encode(),
+        'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers.items()],
+        'client': ('127.0.0.1', 50000), 'server': ('testserver', 80),
+    }
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    start, chunks = {}, []
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            start.update(message)
+        else:
+            chunks.append(message.get('body', b''))
+
+    await asgi(scope, receive, send)
+    response_headers = {name.decode('latin-1').lower(): value.decode('latin-1') for name, value in start['headers']}
+    return start['status'], response_headers, b''.join(chunks)
+
+
+def call(asgi, path, headers=None, query=None, method='GET', json_body=None):
+    """One request through the ASGI app: (status, headers, JSON body or None)"""
+    headers = dict(headers or {})
+    body = b''
+    if json_body is not None:
+        body = json.dumps(json_body).encode()
+        headers.update({'Content-Type': 'application/json', 'Content-Length': str(len(body))})
+    status, response_headers, payload = asyncio.run(_request(asgi, method, path, headers, query, body))
+    return status, response_headers, json.loads(payload) if payload else None
+
+
+@pytest.fixture
+def served(make_app, new_user):
+    """asgi.py's AsyncTaskReads around an app of its own, a user with tasks, and their Flask client"""
+    app = make_app()
+    asgi = AsyncTaskReads(app)
+    client = app.test_client()
+    user = new_user(client)
+    task_ids = create_tasks(client, user, SAMPLE_TASKS)
+    yield app, asgi, client, user, task_ids
+    asyncio.run(asgi.engine.dispose())
+
+
+def test_async_reads_match_the_flask_responses(served):
+    app, asgi, client, user, task_ids = served
+    reads = [
+        (f'{TASKS_URL}/', {}),
+        (f'{TASKS_URL}/', {'status': 'PENDING', 'page': 1, 'per_page': 1}),
+        (f'{TASKS_URL}/', {'cursor': '', 'per_page': 2, 'count': 'exact'}),
+        (f'{TASKS_URL}/', {'status': 'NOT_A_STATUS'}),
+        (f'{TASKS_URL}/{task_ids[0]}', {}),
+        (f'{TASKS_URL}/999999', {}),
+        (f'{TASKS_URL}/overdue', {}),
+        (f'{TASKS_URL}/today', {}),
+        (f'{TASKS_URL}/stats', {}),
+        (f'{TASKS_URL}/recent', {'limit': 2}),
+        (f'{TASKS_URL}/upcoming', {}),
+    ]
+    for path, query in reads:
+        expected = client.get(path, query_string=query, headers=user['headers'])
+        status, headers, body = call(asgi, path, user['headers'], query)
+        assert (status, body) == (expected.status_code, expected.get_json()), path
+        if status == 200:
+            assert headers['etag'] == expected.headers['ETag']
+
+    # the next cursor page is the same as well (cursors are signed for the user on both paths)
+    cursor = client.get(f'{TASKS_URL}/', query_string={'cursor': '', 'per_page': 2},
+                        headers=user['headers']).get_json()['pagination']['next_cursor']
+    expected = client.get(f'{TASKS_URL}/', query_string={'cursor': cursor, 'per_page': 2}, headers=user['headers'])
+    assert call(asgi, f'{TASKS_URL}/', user['headers'], {'cursor': cursor, 'per_page': 2})[2] == expected.get_json()
+
+
+def test_async_read_revalidates_with_304(served):
+    app, asgi, client, user, task_ids = served
+    status, headers, _ = call(asgi, f'{TASKS_URL}/stats', user['headers'])
+
+    status, _, body = call(asgi, f'{TASKS_URL}/stats', {**user['headers'], 'If-None-Match': headers['etag']})
+    assert (status, body) == (304, None)
+
+
+def test_another_users_task_is_not_found(served, new_user):
+    app, asgi, client, user, task_ids = served
+    other = new_user(client)
+
+    status, _, body = call(asgi, f'{TASKS_URL}/{task_ids[0]}', other['headers'])
+    assert (status, body) == (404, {'success': False, 'error': 'Task not found'})
+    assert call(asgi, f'{TASKS_URL}/', other['headers'])[2]['data']['tasks'] == []
+
+
+def test_async_reads_apply_the_jwt_checks(served):
+    app, asgi, client, user, task_ids = served
+    with app.app_context():
+        expired = create_access_token(identity=str(user['user_id']), expires_delta=timedelta(seconds=-1))
+    client.post('/auth/logout', headers={'Authorization': f"Bearer {user['refresh_token']}"})
+
+    for headers, expected_status in (
+        ({}, 401),
+        ({'Authorization': 'Token abc'}, 401),
+        ({'Authorization': 'Bearer'}, 422),
+        ({'Authorization': 'Bearer abc'}, 422),
+        ({'Authorization': f'Bearer {expired}'}, 401),
+        # a (here also revoked) refresh token is not an access token
+        ({'Authorization': f"Bearer {user['refresh_token']}"}, 422),
+    ):
+        flask = client.get(f'{TASKS_URL}/stats', headers=headers)
+        status, _, body = call(asgi, f'{TASKS_URL}/stats', headers)
+        assert (status, body) == (flask.status_code, flask.get_json())
+        assert status == expected_status and 'msg' in body
+
+
+def test_token_of_deleted_user_is_rejected(served, new_user):
+    app, asgi, client, _, task_ids = served
+    user = new_user(client)
+    with app.app_context():
+        db.session.execute(delete(User).where(User.user_id == user['user_id']))
+        db.session.commit()
+    invalidate_user(user['user_id'])
+
+    status, _, body = call(asgi, f'{TASKS_URL}/', user['headers'])
+    assert (status, body) == (401, {'msg': f"Error loading the user {user['user_id']}"})
+
+
+def test_writes_are_passed_to_flask(served):
+    app, asgi, client, user, task_ids = served
+
+    status, _, body = call(asgi, f'{TASKS_URL}/', user['headers'], method='POST', json_body={'title': 'through asgi'})
+    assert status == 201
+    status, _, body = call(asgi, f"{TASKS_URL}/{body['data']['task_id']}", user['headers'])
+    assert (status, body['data']['title']) == (200, 'through asgi')
@@ -0,0 +1,94 @@
+import pytest
+
+from test_tasks import TASKS_URL, SAMPLE_TASKS, assert_counters_match, create_tasks
+
+BATCH_URL = '/batch'
+
+
+def run_batch(client, user, requests, atomic=False):
+    response = client.post(BATCH_URL, json={'requests': requests, 'atomic': atomic}, headers=user['headers'])
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()['data']
+
+
+def stats_etag(client, user):
+    return client.get(f'{TASKS_URL}/stats', headers=user['headers']).headers['ETag']
+
+
+def titles(client, user):
+    response = client.get(f'{TASKS_URL}/', query_string={'per_page': 100}, headers=user['headers'])
+    return sorted(task['title'] for task in response.get_json()['data']['tasks'])
+
+
+def test_sub_requests_report_their_own_status(client, user):
+    task_id = create_tasks(client, user, SAMPLE_TASKS[:1])[0]
+
+    batch = run_batch(client, user, [
+        {'method': 'GET', 'path': f'{TASKS_URL}/{task_id}'},
+        {'method': 'POST', 'path': f'{TASKS_URL}/', 'body': {'title': 'from a batch'}},
+        {'method': 'GET', 'path': f'{TASKS_URL}/999999'},
+        {'method': 'PUT', 'path': f'{TASKS_URL}/{task_id}', 'body': {'status': 'NOT_A_STATUS'}},
+        {'method': 'POST', 'path': '/auth/login', 'body': {}},
+        {'method': 'GET', 'path': '/no/such/path'},
+        {'method': 'PATCH', 'path': f'{TASKS_URL}/{task_id}'},
+        {'method': 'GET', 'path': f'{TASKS_URL}?status=PENDING'},
+    ])
+
+    assert [result['status'] for result in batch['responses']] == [200, 201, 404, 400, 400, 404, 405, 200]
+    assert batch['responses'][0]['body']['data']['task_id'] == task_id
+    assert batch['responses'][4]['body']['error'] == '/auth/login cannot be used in a batch'
+    # the trailing-slash redirect was followed, and the read sees the earlier write
+    assert [task['title'] for task in batch['responses'][7]['body']['data']['tasks']] == ['from a batch', 'write report']
+    assert 'committed' not in batch
+    # without "atomic" every successful write stands on its own
+    assert titles(client, user) == ['from a batch', 'write report']
+
+
+def test_atomic_batch_rolls_back_at_the_first_failure(app, client, user):
+    task_id = create_tasks(client, user, SAMPLE_TASKS)[0]
+    before = assert_counters_match(app, client, user)
+    etag = stats_etag(client, user)
+
+    batch = run_batch(client, user, [
+        {'method': 'PUT', 'path': f'{TASKS_URL}/{task_id}', 'body': {'status': 'COMPLETED', 'title': 'renamed'}},
+        {'method': 'POST', 'path': f'{TASKS_URL}/', 'body': {'title': 'from a batch', 'status': 'PENDING'}},
+        {'method': 'DELETE', 'path': f'{TASKS_URL}/999999'},
+        {'method': 'POST', 'path': f'{TASKS_URL}/', 'body': {'title': 'never created'}},
+    ], atomic=True)
+
+    assert [result['status'] for result in batch['responses']] == [200, 201, 404, 424]
+    assert batch['committed'] is False
+    # task rows, counters and the data version are all back where they were
+    assert titles(client, user) == sorted(task['title'] for task in SAMPLE_TASKS)
+    assert assert_counters_match(app, client, user) == before
+    assert stats_etag(client, user) == etag
+
+
+def test_atomic_batch_commits_when_every_request_succeeds(app, client, user):
+    task_id = create_tasks(client, user, SAMPLE_TASKS[:1])[0]
+    etag = stats_etag(client, user)
+
+    batch = run_batch(client, user, [
+        {'method': 'PUT', 'path': f'{TASKS_URL}/{task_id}', 'body': {'status': 'COMPLETED'}},
+        {'method': 'POST', 'path': f'{TASKS_URL}/', 'body': {'title': 'from a batch'}},
+    ], atomic=True)
+
+    assert [result['status'] for result in batch['responses']] == [200, 201]
+    assert batch['committed'] is True
+    assert titles(client, user) == ['from a batch', 'write report']
+    assert assert_counters_match(app, client, user) == {'COMPLETED': 1, 'PENDING': 1}
+    assert stats_etag(client, user) != etag
+
+
+@pytest.mark.parametrize('body, error', [
+    ({'requests': []}, 'Validation failed'),
+    ({'requests': [{'method': 'TRACE', 'path': TASKS_URL}]}, 'Validation failed'),
+    ({'requests': [{'path': 'user/tasks'}]}, 'Validation failed'),
+    ({'requests': [{'path': TASKS_URL}] * 3}, 'A batch may contain at most 2 requests'),
+])
+def test_invalid_batches_are_rejected(app, client, user, monkeypatch, body, error):
+    monkeypatch.setitem(app.config, 'BATCH_MAX_REQUESTS', 2)
+
+    response = client.post(BATCH_URL, json=body, headers=user['headers'])
+    assert response.status_code == 400
+    assert response.get_json()['error'] == error
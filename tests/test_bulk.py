@@ -0,0 +1,183 @@
+import pytest
+from sqlalchemy import event
+
+from app import db
+from test_tasks import TASKS_URL, SAMPLE_TASKS, create_tasks, due
+
+
+def titles_by_id(client, user):
+    response = client.get(f'{TASKS_URL}/', query_string={'per_page': 100}, headers=user['headers'])
+    return {task['task_id']: task['title'] for task in response.get_json()['data']['tasks']}
+
+
+#**************************************************************************************************
+# POST /user/tasks/bulk
+
+
+def test_bulk_create_returns_ids_in_input_order_and_errors_by_index(app, client, user, monkeypatch):
+    # chunks of 2: the valid items span three INSERTs
+    monkeypatch.setitem(app.config, 'BULK_CHUNK_SIZE', 2)
+    items = [
+        {'title': 'first'},
+        {'description': 'no title'},
+        {'title': 'second', 'due_date': due(2)},
+        {'title': 'third', 'status': 'NOT_A_STATUS'},
+        {'title': 'fourth'},
+        {'title': 'fifth', 'priority': 'HIGH'},
+        {'title': ''},
+        {'title': 'sixth'},
+    ]
+
+    response = client.post(f'{TASKS_URL}/bulk', json=items, headers=user['headers'])
+    assert response.status_code == 201
+    data = response.get_json()['data']
+
+    assert (data['created'], data['failed']) == (5, 3)
+    assert [(error['index'], error['field']) for error in data['errors']] == [(1, 'title'), (3, 'status'), (6, 'title')]
+    titles = titles_by_id(client, user)
+    assert [titles[task_id] for task_id in data['task_ids']] == ['first', 'second', 'fourth', 'fifth', 'sixth']
+
+
+def test_bulk_create_with_only_invalid_items_creates_nothing(client, user):
+    response = client.post(f'{TASKS_URL}/bulk', json={'tasks': [{'title': ''}, {}]}, headers=user['headers'])
+
+    assert response.status_code == 400
+    body = response.get_json()
+    assert body['error'] == 'Validation failed'
+    assert [error['index'] for error in body['details']] == [0, 1]
+    assert titles_by_id(client, user) == {}
+
+
+@pytest.mark.parametrize('payload, status', [
+    ([], 400),
+    ({'tasks': []}, 400),
+    ({'title': 'not a list'}, 400),
+    ([{'title': 'a'}, {'title': 'b'}, {'title': 'c'}], 413),
+])
+def test_bulk_create_rejects_bad_payloads(app, client, user, monkeypatch, payload, status):
+    monkeypatch.setitem(app.config, 'BULK_MAX_TASKS', 2)
+
+    response = client.post(f'{TASKS_URL}/bulk', json=payload, headers=user['headers'])
+    assert response.status_code == status
+    assert titles_by_id(client, user) == {}
+
+
+#**************************************************************************************************
+# PATCH /user/tasks/bulk
+
+
+def bulk_update(client, user, body):
+    response = client.patch(f'{TASKS_URL}/bulk', json=body, headers=user['headers'])
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()['data']
+
+
+def test_bulk_update_returns_the_updated_rows(client, user, new_user):
+    task_ids = create_tasks(client, user, SAMPLE_TASKS)
+    other = new_user(client)
+    foreign_id = create_tasks(client, other, SAMPLE_TASKS[:1])[0]
+
+    data = bulk_update(client, user, {
+        'task_ids': [task_ids[0], task_ids[2], foreign_id],
+        'changes': {'status': 'COMPLETED', 'priority': 'HIGH'},
+        'return_rows': True
+    })
+
+    assert data['updated'] == 2
+    returned = sorted(data['tasks'], key=lambda task: task['task_id'])
+    assert [task['task_id'] for task in returned] == [task_ids[0], task_ids[2]]
+    for task in returned:
+        assert (task['status'], task['priority']) == ('COMPLETED', 'HIGH')
+        # the same dict as a read of the task after the commit
+        assert task == client.get(f"{TASKS_URL}/{task['task_id']}", headers=user['headers']).get_json()['data']
+    # the other user's task was neither updated nor returned
+    assert client.get(f'{TASKS_URL}/{foreign_id}', headers=other['headers']).get_json()['data']['status'] == 'PENDING'
+
+
+def test_bulk_update_by_filter_returns_rows_only_when_asked(client, user):
+    create_tasks(client, user, SAMPLE_TASKS)
+
+    data = bulk_update(client, user, {'filter': {'status': 'PENDING'}, 'changes': {'due_date': due(7)}})
+    assert data == {'updated': 2}
+
+    data = bulk_update(client, user, {'filter': {'due_after': due(6), 'due_before': due(8)},
+                                      'changes': {'title': 'rescheduled'}, 'return_rows': True})
+    assert data['updated'] == 2
+    assert [(task['title'], task['due_date']) for task in data['tasks']] == [('rescheduled', due(7))] * 2
+
+
+#**************************************************************************************************
+# DELETE /user/tasks/bulk_delete
+
+
+@pytest.fixture
+def delete_statements(app):
+    """DELETE statements on `tasks` run while the fixture is active"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith('DELETE FROM tasks'):
+            statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', record)
+    yield statements
+    event.remove(engine, 'before_cursor_execute', record)
+
+
+def bulk_delete(client, user, **options):
+    return client.delete(f'{TASKS_URL}/bulk_delete', headers=user['headers'], **options)
+
+
+def test_bulk_delete_by_ids_in_chunks(app, client, user, new_user, monkeypatch, delete_statements):
+    monkeypatch.setitem(app.config, 'BULK_CHUNK_SIZE', 2)
+    task_ids = create_tasks(client, user, SAMPLE_TASKS)
+    other = new_user(client)
+    foreign_id = create_tasks(client, other, SAMPLE_TASKS[:1])[0]
+
+    response = bulk_delete(client, user, json={'task_ids': task_ids[:3] + [foreign_id, 999999]})
+    assert response.status_code == 200
+    assert response.get_json()['data']['deleted'] == 3
+    # [t0, t1] [t2, foreign] [999999]: the last chunk matches nothing and deletes nothing
+    assert len(delete_statements) == 2
+
+    assert sorted(titles_by_id(client, user)) == task_ids[3:]
+    assert client.get(f'{TASKS_URL}/{foreign_id}', headers=other['headers']).status_code == 200
+
+
+def test_bulk_delete_by_query_string_ids(client, user):
+    task_ids = create_tasks(client, user, SAMPLE_TASKS)
+
+    response = bulk_delete(client, user, query_string={'task_ids': f'{task_ids[0]},{task_ids[4]}'})
+    assert response.status_code == 200
+    assert response.get_json()['data']['deleted'] == 2
+    assert sorted(titles_by_id(client, user)) == task_ids[1:4]
+
+
+@pytest.mark.parametrize('chunk_size, statements', [(2, 5), (3, 3), (100, 1)])
+def test_bulk_delete_by_filter_in_chunks(app, client, user, monkeypatch, delete_statements, chunk_size, statements):
+    monkeypatch.setitem(app.config, 'BULK_CHUNK_SIZE', chunk_size)
+    create_tasks(client, user, SAMPLE_TASKS * 3)
+
+    response = bulk_delete(client, user, json={'filter': {'due_after': due(2)}})
+    assert response.status_code == 200
+    # 'write report', 'review PR' and 'book flights', three times each
+    assert response.get_json()['data']['deleted'] == 9
+    # one DELETE per chunk; a last round that finds nothing sends none
+    assert len(delete_statements) == statements
+    assert sorted(set(titles_by_id(client, user).values())) == ['old chore', 'someday']
+
+
+@pytest.mark.parametrize('options, status', [
+    ({'json': {'filter': {'status': 'COMPLETED'}}}, 404),
+    ({'json': {'task_ids': [999999]}}, 404),
+    ({'json': {'filter': {'status': 'NOT_A_STATUS'}}}, 400),
+    ({'json': {'task_ids': [1], 'filter': {'status': 'PENDING'}}}, 400),
+    ({}, 400),
+])
+def test_bulk_delete_errors(client, user, options, status):
+    create_tasks(client, user, SAMPLE_TASKS[:1])
+
+    assert bulk_delete(client, user, **options).status_code == status
+    assert len(titles_by_id(client, user)) == 1
@@ -0,0 +1,29 @@
+import pytest
+from urllib3.exceptions import ConnectTimeoutError, ReadTimeoutError
+
+from app.cli import cli
+
+
+@pytest.fixture
+def retry():
+    return cli.get_session().get_adapter(cli.API_URL).max_retries
+
+
+@pytest.mark.parametrize('method', ['GET', 'HEAD'])
+def test_reads_are_retried_on_gateway_errors(retry, method):
+    assert all(retry.is_retry(method, status) for status in (502, 503, 504))
+
+
+@pytest.mark.parametrize('method', ['POST', 'PUT', 'PATCH', 'DELETE'])
+def test_writes_are_not_replayed_after_reaching_the_server(retry, method):
+    # the server (or a proxy in front of it) may have applied the write already
+    assert not any(retry.is_retry(method, status) for status in (502, 503, 504))
+    with pytest.raises(ReadTimeoutError):
+        retry.increment(method, '/user/tasks/1', error=ReadTimeoutError(None, '/user/tasks/1', 'timed out'))
+
+
+@pytest.mark.parametrize('method', ['GET', 'PUT', 'DELETE'])
+def test_failed_connections_are_retried(retry, method):
+    # nothing was sent: safe for every method
+    following = retry.increment(method, '/user/tasks/1', error=ConnectTimeoutError('timed out'))
+    assert following.total == retry.total - 1
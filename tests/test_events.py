@@ -0,0 +1,88 @@
+import json
+
+import pytest
+
+from app.utils import task_events
+from test_tasks import TASKS_URL, SAMPLE_TASKS, create_tasks, read_changes
+
+EVENTS_URL = f'{TASKS_URL}/events'
+
+
+def parse_events(chunk):
+    """The events of a text/event-stream chunk as (event, id, data); a comment line is ('comment', None, text)"""
+    events = []
+    for message in chunk.split('\n\n'):
+        if message.startswith(':'):
+            events.append(('comment', None, message[1:].strip()))
+            continue
+        fields = dict(line.split(': ', 1) for line in message.splitlines() if ': ' in line)
+        if 'event' in fields:
+            events.append((fields['event'], fields.get('id'), json.loads(fields['data'])))
+    return events
+
+
+@pytest.fixture
+def open_stream(client):
+    """Open GET /user/tasks/events; returns its chunks as a generator of decoded strings"""
+    responses = []
+
+    def opener(user, headers=None):
+        response = client.get(EVENTS_URL, headers={**user['headers'], **(headers or {})}, buffered=False)
+        assert response.status_code == 200
+        assert response.mimetype == 'text/event-stream'
+        responses.append(response)
+        return (chunk.decode('utf-8') for chunk in response.response)
+
+    yield opener
+    for response in responses:
+        response.close()
+    assert task_events.broker.stats()['streams'] == 0
+
+
+def test_stream_replays_changes_after_last_event_id(client, user, open_stream):
+    task_ids = create_tasks(client, user, SAMPLE_TASKS[:2])
+    cursor = read_changes(client, user).get_json()['data']['next_cursor']
+    created = create_tasks(client, user, SAMPLE_TASKS[2:3])[0]
+    client.put(f'{TASKS_URL}/{task_ids[0]}', json={'status': 'COMPLETED'}, headers=user['headers'])
+    client.delete(f'{TASKS_URL}/{task_ids[1]}', headers=user['headers'])
+
+    events = parse_events(next(open_stream(user, {'Last-Event-ID': cursor})))
+
+    assert [(event, data.get('task_id')) for event, _, data in events] == [
+        ('task.created', created), ('task.updated', task_ids[0]), ('task.deleted', task_ids[1]), ('ready', None)
+    ]
+    assert events[1][2]['task']['status'] == 'COMPLETED'
+    # the ready event's id is where the stream stands: replaying from it sends nothing more
+    ready_id = events[-1][1]
+    assert ready_id == events[-2][1] == events[-1][2]['cursor']
+    assert read_changes(client, user, since=ready_id).get_json()['data']['changes'] == []
+
+
+def test_stream_delivers_a_committed_write(client, user, open_stream):
+    create_tasks(client, user, SAMPLE_TASKS[:1])
+    chunks = open_stream(user)
+    # without Last-Event-ID the stream starts from now: nothing is replayed
+    assert [event for event, _, _ in parse_events(next(chunks))] == ['ready']
+
+    task_id = create_tasks(client, user, [{'title': 'live', 'status': 'IN_PROGRESS'}])[0]
+
+    events = parse_events(next(chunks))
+    assert [(event, data.get('task_id')) for event, _, data in events] == [('task.created', task_id), ('stats', None)]
+    assert events[0][2]['task']['title'] == 'live'
+    assert events[1][2]['status_counts'] == {'IN_PROGRESS': 1, 'PENDING': 1}
+    assert events[1][2]['delta'] == {'IN_PROGRESS': 1}
+
+
+def test_quiet_stream_sends_heartbeats(app, client, user, open_stream, monkeypatch):
+    monkeypatch.setitem(app.config, 'EVENTS_HEARTBEAT', 0.05)
+    chunks = open_stream(user)
+    next(chunks)
+
+    assert parse_events(next(chunks)) == [('comment', None, 'heartbeat')]
+    assert parse_events(next(chunks)) == [('comment', None, 'heartbeat')]
+
+
+def test_malformed_last_event_id_is_rejected(client, user):
+    response = client.get(EVENTS_URL, headers={**user['headers'], 'Last-Event-ID': 'not-a-cursor'})
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Invalid cursor.'
@@ -0,0 +1,155 @@
+import csv
+import io
+import json
+
+import pytest
+
+from app.utils.task_export import EXPORT_FIELDS
+from test_tasks import TASKS_URL, SAMPLE_TASKS, create_tasks, due
+
+# descriptions that CSV has to quote
+AWKWARD_TASKS = [
+    {'title': 'quote "this"', 'description': 'a, b and c', 'due_date': due(2)},
+    {'title': 'two lines', 'description': 'first line\nsecond line'},
+]
+
+
+def read_all(client, user):
+    response = client.get(f'{TASKS_URL}/', query_string={'per_page': 100}, headers=user['headers'])
+    return sorted(response.get_json()['data']['tasks'], key=lambda task: task['task_id'])
+
+
+def export(client, user, **params):
+    return client.get(f'{TASKS_URL}/export', query_string=params, headers=user['headers'])
+
+
+#**************************************************************************************************
+# GET /user/tasks/export
+
+
+def test_ndjson_export_matches_the_task_reads(client, user, new_user):
+    create_tasks(client, user, SAMPLE_TASKS + AWKWARD_TASKS)
+    create_tasks(client, new_user(client), SAMPLE_TASKS[:1])
+
+    response = export(client, user)
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    assert response.headers['Content-Disposition'] == 'attachment; filename=tasks.ndjson'
+
+    lines = response.get_data(as_text=True).splitlines()
+    assert [json.loads(line) for line in lines] == read_all(client, user)
+
+
+def test_csv_export_matches_the_task_reads(client, user):
+    create_tasks(client, user, SAMPLE_TASKS + AWKWARD_TASKS)
+
+    response = export(client, user, format='CSV')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/csv'
+
+    reader = csv.DictReader(io.StringIO(response.get_data(as_text=True)))
+    assert reader.fieldnames == EXPORT_FIELDS
+    expected = [{field: '' if task[field] is None else str(task[field]) for field in EXPORT_FIELDS}
+                for task in read_all(client, user)]
+    assert list(reader) == expected
+
+
+def test_export_applies_the_filters(client, user):
+    create_tasks(client, user, SAMPLE_TASKS)
+
+    response = export(client, user, status='PENDING', due_before=due(5))
+    assert [json.loads(line)['title'] for line in response.get_data(as_text=True).splitlines()] == ['write report']
+
+    response = export(client, user, format='csv', due_after=due(30))
+    assert response.get_data(as_text=True).splitlines() == [','.join(EXPORT_FIELDS)]
+
+
+@pytest.mark.parametrize('params, error', [
+    ({'due_after': '2025-13-01'}, 'due_after'),
+    ({'due_before': 'tomorrow'}, 'due_before'),
+    ({'status': 'NOT_A_STATUS'}, "Invalid status 'NOT_A_STATUS'"),
+    ({'format': 'xml'}, "Invalid format 'xml'"),
+])
+def test_export_rejects_bad_parameters(client, user, params, error):
+    response = export(client, user, **params)
+    assert response.status_code == 400
+    assert error in response.get_json()['error']
+
+
+#**************************************************************************************************
+# POST /user/tasks/import
+
+
+def import_body(client, user, body, content_type='application/x-ndjson', **params):
+    response = client.post(f'{TASKS_URL}/import', data=body.encode('utf-8'), content_type=content_type,
+                           query_string=params, headers=user['headers'])
+    assert response.status_code in (200, 201), response.get_json()
+    return response.get_json()['data']
+
+
+def test_csv_import_keeps_multi_line_fields_and_reports_the_row_line(app, client, user, monkeypatch):
+    monkeypatch.setitem(app.config, 'BULK_CHUNK_SIZE', 2)
+    body = (
+        'title,description,status,due_date\r\n'           # line 1
+        'plain,one line,PENDING,\r\n'                      # line 2
+        'spread,"first line\r\nsecond line",,\r\n'         # lines 3-4
+        'bad status,,NOT_A_STATUS,\r\n'                    # line 5
+        ',"no title\r\nacross lines",,\r\n'                # lines 6-7
+        f'dated,,COMPLETED,{due(4)}\r\n'                   # line 8
+    )
+
+    summary = import_body(client, user, body, content_type='text/csv')
+
+    assert (summary['imported'], summary['failed'], summary['committed_lines']) == (3, 2, 8)
+    assert [(error['line'], error['field']) for error in summary['errors']] == [(5, 'status'), (7, 'title')]
+    tasks = {task['title']: task for task in read_all(client, user)}
+    assert sorted(tasks) == ['dated', 'plain', 'spread']
+    assert tasks['spread']['description'] == 'first line\r\nsecond line'
+    assert (tasks['dated']['status'], tasks['dated']['due_date']) == ('COMPLETED', due(4))
+
+
+def test_ndjson_import_reports_errors_by_line(app, client, user, monkeypatch):
+    monkeypatch.setitem(app.config, 'BULK_CHUNK_SIZE', 2)
+    body = '\n'.join([
+        json.dumps({'title': 'one'}),
+        '{"title": "broken"',
+        '',
+        json.dumps(['not', 'an', 'object']),
+        json.dumps({'title': 'two', 'priority': 'HIGH'}),
+        json.dumps({'title': 'three', 'due_date': 'someday'}),
+        json.dumps({'title': 'four'}),
+    ]) + '\n'
+
+    summary = import_body(client, user, body)
+
+    assert (summary['imported'], summary['failed'], summary['committed_lines']) == (3, 3, 7)
+    assert [(error['line'], error['field']) for error in summary['errors']] == [(2, None), (4, None), (6, 'due_date')]
+    assert summary['errors'][0]['message'].startswith('Invalid JSON')
+    assert [task['title'] for task in read_all(client, user)] == ['one', 'two', 'four']
+
+
+def test_import_resumes_after_the_committed_lines(client, user):
+    body = ''.join(json.dumps({'title': f'task {i}'}) + '\n' for i in range(1, 6))
+
+    summary = import_body(client, user, body, resume_from=3)
+
+    assert (summary['imported'], summary['committed_lines']) == (2, 5)
+    assert [task['title'] for task in read_all(client, user)] == ['task 4', 'task 5']
+
+
+def test_csv_export_imports_back(client, user, new_user):
+    create_tasks(client, user, SAMPLE_TASKS + AWKWARD_TASKS)
+    exported = export(client, user, format='csv').get_data(as_text=True)
+
+    other = new_user(client)
+    summary = import_body(client, other, exported, content_type='text/csv')
+
+    assert (summary['imported'], summary['failed']) == (len(SAMPLE_TASKS + AWKWARD_TASKS), 0)
+    fields = ('title', 'description', 'status', 'priority', 'start_date', 'due_date')
+    copy = lambda tasks: [tuple(task[field] for field in fields) for task in tasks]
+    assert copy(read_all(client, other)) == copy(read_all(client, user))
+
+
+def test_import_rejects_an_unknown_format(client, user):
+    response = client.post(f'{TASKS_URL}/import', data=b'{}', query_string={'format': 'xml'}, headers=user['headers'])
+    assert response.status_code == 400
@@ -0,0 +1,53 @@
+import pytest
+from sqlalchemy import text
+
+from app.routes import health_routes
+from app.utils.replica import replica_health
+
+HEALTH_URL = '/health/db'
+
+
+def test_health_without_token_only_reports_connectivity(client):
+    response = client.get(HEALTH_URL)
+    assert response.status_code == 200
+    assert response.get_json() == {'success': True, 'message': 'Database reachable'}
+
+
+@pytest.mark.parametrize('headers', [{}, {'X-Health-Token': 'wrong'}, {'X-Health-Token': ''}])
+def test_health_details_need_the_token(app, client, monkeypatch, headers):
+    monkeypatch.setitem(app.config, 'HEALTH_TOKEN', 'monitoring-secret')
+
+    response = client.get(HEALTH_URL, headers=headers)
+    assert response.status_code == 200
+    assert 'data' not in response.get_json()
+
+
+def test_health_details_with_the_token(make_app):
+    app = make_app(replica=True, HEALTH_TOKEN='monitoring-secret')
+    client = app.test_client()
+    replica_health.mark_down('connection to replica-host failed for user "reader"')
+    try:
+        response = client.get(HEALTH_URL, headers={'X-Health-Token': 'monitoring-secret'})
+    finally:
+        replica_health.healthy, replica_health.checked_at = True, None
+
+    assert response.status_code == 200
+    data = response.get_json()['data']
+    assert {'journal_mode', 'event_streams'} <= set(data)
+    assert data['replica']['healthy'] is False
+    assert 'reader' not in response.get_data(as_text=True)
+
+
+@pytest.mark.parametrize('token', [None, 'monitoring-secret'])
+def test_unreachable_database_hides_the_driver_error(app, client, monkeypatch, token):
+    monkeypatch.setitem(app.config, 'HEALTH_TOKEN', token)
+    # a failing statement stands in for a lost database
+    monkeypatch.setattr(health_routes, 'text', lambda sql: text('SELECT * FROM secret_missing_table'))
+
+    response = client.get(HEALTH_URL, headers={'X-Health-Token': 'monitoring-secret'})
+    assert response.status_code == 503
+    body = response.get_json()
+    assert body['error'] == 'Database unreachable'
+    assert 'secret_missing_table' not in response.get_data(as_text=True)
+    # pool figures only for the token holder
+    assert ('details' in body) is (token is not None)
@@ -0,0 +1,104 @@
+import sqlite3
+
+import pytest
+from sqlalchemy import text
+
+from app import db
+from app.database import REPLICA_BIND
+from app.utils.replica import recent_writers, replica_health
+
+TASKS_URL = '/user/tasks'
+
+
+def sqlite_path(engine):
+    return engine.url.database
+
+
+@pytest.fixture
+def replicated(make_app, new_user):
+    """
+    An app with a primary and a replica SQLite file. One task is written, the
+    primary is copied to the replica, and the replica's copy of the task is
+    then retitled, so every response tells which database it was read from.
+    """
+    app = make_app(replica=True, REPLICA_READ_YOUR_WRITES=60, REPLICA_HEALTH_INTERVAL=60)
+    client = app.test_client()
+    user = new_user(client)
+    response = client.post(f'{TASKS_URL}/', json={'title': 'report from primary'}, headers=user['headers'])
+    task_id = response.get_json()['data']['task_id']
+
+    with app.app_context():
+        replica = db.engines[REPLICA_BIND]
+        replica.dispose()
+        with sqlite3.connect(sqlite_path(db.engine)) as source, sqlite3.connect(sqlite_path(replica)) as target:
+            source.backup(target)
+        with replica.begin() as connection:
+            connection.execute(text("UPDATE tasks SET title = 'report from replica' WHERE task_id = :id"),
+                               {'id': task_id})
+
+    # the setup writes put the user in the read-your-writes window
+    recent_writers.clear()
+    replica_health.healthy, replica_health.checked_at = True, None
+    yield app, client, user, task_id
+    replica_health.healthy, replica_health.checked_at = True, None
+
+
+def title(client, user, task_id):
+    response = client.get(f'{TASKS_URL}/{task_id}', headers=user['headers'])
+    assert response.status_code == 200
+    return response.get_json()['data']['title']
+
+
+def test_reads_go_to_the_replica(replicated):
+    app, client, user, task_id = replicated
+
+    assert title(client, user, task_id) == 'report from replica'
+    response = client.get(f'{TASKS_URL}/', headers=user['headers'])
+    assert [task['title'] for task in response.get_json()['data']['tasks']] == ['report from replica']
+
+
+def test_search_reads_from_the_replica(replicated):
+    app, client, user, task_id = replicated
+
+    response = client.get(f'{TASKS_URL}/search', query_string={'q': 'report'}, headers=user['headers'])
+    assert response.status_code == 200
+    assert [task['title'] for task in response.get_json()['data']['tasks']] == ['report from replica']
+
+
+def test_user_reads_own_writes_from_the_primary(replicated, new_user):
+    app, client, user, task_id = replicated
+    other = new_user(client)
+    recent_writers.clear()
+
+    response = client.put(f'{TASKS_URL}/{task_id}', json={'description': 'edited'}, headers=user['headers'])
+    assert response.status_code == 200
+
+    assert title(client, user, task_id) == 'report from primary'
+    # other users are not affected by that window
+    assert client.get(f'{TASKS_URL}/', headers=other['headers']).status_code == 200
+    assert not recent_writers.get(other['user_id'])
+
+
+def test_batch_reads_after_a_write_stay_on_the_primary(replicated):
+    app, client, user, task_id = replicated
+
+    response = client.post('/batch', json={'requests': [
+        {'method': 'PUT', 'path': f'{TASKS_URL}/{task_id}', 'body': {'description': 'edited'}},
+        {'method': 'GET', 'path': f'{TASKS_URL}/{task_id}'},
+    ]}, headers=user['headers'])
+
+    read = response.get_json()['data']['responses'][1]
+    assert read['status'] == 200
+    assert read['body']['data']['title'] == 'report from primary'
+    assert read['body']['data']['description'] == 'edited'
+
+
+def test_unhealthy_replica_falls_back_to_the_primary(replicated):
+    app, client, user, task_id = replicated
+
+    replica_health.mark_down('replica unreachable')
+    assert title(client, user, task_id) == 'report from primary'
+
+    # once the next health check succeeds, reads go back to the replica
+    replica_health.checked_at = None
+    assert title(client, user, task_id) == 'report from replica'
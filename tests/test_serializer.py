@@ -0,0 +1,49 @@
+import itertools
+from datetime import date, timedelta
+
+from app import db
+from app.models import Task, StatusEnum, PriorityEnum
+from app.utils.task_serializer import task_rows, serialize_task_rows
+from test_tasks import TASKS_URL
+
+
+def seed_every_kind_of_task(app, user_id):
+    """A task per status x priority x due date (past, today, future, none), written past the API's checks"""
+    today = date.today()
+    due_dates = [today - timedelta(days=3), today, today + timedelta(days=3), None]
+    with app.app_context():
+        db.session.add_all(Task(
+            title=f'{status.value} {priority.value} {due_date}',
+            description=None if index % 2 else f'description {index}',
+            status=status,
+            priority=priority,
+            start_date=today - timedelta(days=index % 5),
+            due_date=due_date,
+            user_id=user_id
+        ) for index, (status, priority, due_date) in enumerate(
+            itertools.product(StatusEnum, PriorityEnum, due_dates)
+        ))
+        db.session.commit()
+
+
+def test_row_serializer_matches_to_dict(app, user):
+    seed_every_kind_of_task(app, user['user_id'])
+
+    with app.app_context():
+        query = Task.query.filter_by(user_id=user['user_id']).order_by(Task.task_id)
+        expected = [task.to_dict() for task in query.all()]
+        assert len(expected) == len(StatusEnum) * len(PriorityEnum) * 4
+        assert {task['is_overdue'] for task in expected} == {True, False}
+
+        assert serialize_task_rows(task_rows(query).all()) == expected
+
+
+def test_list_endpoint_returns_to_dict_output(app, client, user):
+    seed_every_kind_of_task(app, user['user_id'])
+
+    response = client.get(f'{TASKS_URL}/', query_string={'per_page': 100}, headers=user['headers'])
+    listed = sorted(response.get_json()['data']['tasks'], key=lambda task: task['task_id'])
+
+    with app.app_context():
+        tasks = Task.query.filter_by(user_id=user['user_id']).order_by(Task.task_id).all()
+        assert listed == [task.to_dict() for task in tasks]
@@ -0,0 +1,408 @@
+import base64
+import json
+import threading
+import time
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import func, text
+
+from app import db
+from app.models import Task
+from app.utils import cache, task_counters, task_search, task_versions
+
+TASKS_URL = '/user/tasks'
+
+
+def due(days):
+    return (date.today() + timedelta(days=days)).isoformat()
+
+
+def create_tasks(client, user, tasks):
+    response = client.post(f'{TASKS_URL}/bulk', json={'tasks': tasks}, headers=user['headers'])
+    assert response.status_code == 201, response.get_json()
+    return response.get_json()['data']['task_ids']
+
+
+def assert_counters_match(app, client, user):
+    """The stored counters (and GET /stats) agree with a fresh GROUP BY over tasks"""
+    user_id = user['user_id']
+    with app.app_context():
+        rows = db.session.query(Task.status, func.count(Task.task_id)).filter(
+            Task.user_id == user_id
+        ).group_by(Task.status).all()
+        expected = {status.value: count for status, count in rows}
+        assert task_counters.counter_drift(user_id) == []
+
+    response = client.get(f'{TASKS_URL}/stats', headers=user['headers'])
+    assert response.status_code == 200
+    assert response.get_json()['data']['status_counts'] == expected
+    return expected
+
+
+SAMPLE_TASKS = [
+    {'title': 'write report', 'status': 'PENDING', 'due_date': due(3)},
+    {'title': 'review PR', 'status': 'IN_PROGRESS', 'due_date': due(3)},
+    {'title': 'book flights', 'status': 'PENDING', 'due_date': due(10)},
+    {'title': 'old chore', 'status': 'COMPLETED', 'due_date': due(1)},
+    {'title': 'someday', 'status': 'CANCELLED'},
+]
+
+
+#**************************************************************************************************
+# Counters (task_stats / task_due_counts) stay in step with every kind of write
+
+
+def test_create_task_updates_counters(app, client, user):
+    response = client.post(f'{TASKS_URL}/', json={'title': 'one', 'due_date': due(2)}, headers=user['headers'])
+    assert response.status_code == 201
+
+    assert assert_counters_match(app, client, user) == {'PENDING': 1}
+
+
+def test_bulk_create_updates_counters(app, client, user):
+    create_tasks(client, user, SAMPLE_TASKS)
+
+    assert assert_counters_match(app, client, user) == {
+        'PENDING': 2, 'IN_PROGRESS': 1, 'COMPLETED': 1, 'CANCELLED': 1
+    }
+
+
+def test_update_task_moves_counters(app, client, user):
+    task_ids = create_tasks(client, user, SAMPLE_TASKS)
+
+    response = client.put(f'{TASKS_URL}/{task_ids[0]}', json={'status': 'COMPLETED', 'due_date': due(5)},
+                          headers=user['headers'])
+    assert response.status_code == 200
+
+    assert assert_counters_match(app, client, user) == {
+        'PENDING': 1, 'IN_PROGRESS': 1, 'COMPLETED': 2, 'CANCELLED': 1
+    }
+
+
+@pytest.mark.parametrize('target', ['task_ids', 'filter'])
+def test_bulk_update_moves_counters(app, client, user, target):
+    task_ids = create_tasks(client, user, SAMPLE_TASKS)
+    body = {'changes': {'status': 'IN_PROGRESS', 'due_date': due(7)}}
+    if target == 'task_ids':
+        body['task_ids'] = task_ids[:3]
+    else:
+        body['filter'] = {'due_before': due(5)}
+
+    response = client.patch(f'{TASKS_URL}/bulk', json=body, headers=user['headers'])
+    assert response.status_code == 200
+    assert response.get_json()['data']['updated'] == 3
+
+    assert_counters_match(app, client, user)
+
+
+def test_filter_delete_updates_counters(app, client, user, monkeypatch):
+    create_tasks(client, user, SAMPLE_TASKS * 3)
+    # several chunks, the last one short
+    monkeypatch.setitem(app.config, 'BULK_CHUNK_SIZE', 4)
+
+    response = client.delete(f'{TASKS_URL}/bulk_delete', json={'filter': {'status': 'PENDING'}},
+                             headers=user['headers'])
+    assert response.status_code == 200
+    assert response.get_json()['data']['deleted'] == 6
+
+    assert assert_counters_match(app, client, user) == {'IN_PROGRESS': 3, 'COMPLETED': 3, 'CANCELLED': 3}
+
+
+def test_import_updates_counters(app, client, user):
+    body = '\n'.join(json.dumps(task) for task in SAMPLE_TASKS + [{'title': ''}])
+    response = client.post(f'{TASKS_URL}/import', data=body, content_type='application/x-ndjson',
+                           headers=user['headers'])
+    assert response.status_code == 201
+    summary = response.get_json()['data']
+    assert (summary['imported'], summary['failed']) == (5, 1)
+
+    assert assert_counters_match(app, client, user) == {
+        'PENDING': 2, 'IN_PROGRESS': 1, 'COMPLETED': 1, 'CANCELLED': 1
+    }
+
+
+def test_delete_task_updates_counters(app, client, user):
+    task_ids = create_tasks(client, user, SAMPLE_TASKS)
+
+    for task_id in task_ids[:2]:
+        response = client.delete(f'{TASKS_URL}/{task_id}', headers=user['headers'])
+        assert response.status_code == 200
+
+    assert assert_counters_match(app, client, user) == {'PENDING': 1, 'COMPLETED': 1, 'CANCELLED': 1}
+
+
+@pytest.mark.parametrize('method', ['PUT', 'DELETE'])
+def test_concurrent_writes_of_one_task_keep_counters(app, client, user, method):
+    """A second PUT / DELETE waits for the first one's commit and starts from the row it left"""
+    task_id = create_tasks(client, user, SAMPLE_TASKS[:1])[0]
+    holding, failures = threading.Event(), []
+
+    def first_writer():
+        # another worker: same change, committed while the request below is in flight
+        try:
+            with app.app_context():
+                task_versions.lock_user(user['user_id'])
+                task = task_versions.lock_rows(Task.query.filter_by(task_id=task_id)).first()
+                if method == 'PUT':
+                    task.status = 'COMPLETED'
+                else:
+                    db.session.delete(task)
+                db.session.flush()
+                holding.set()
+                time.sleep(0.3)
+                db.session.commit()
+        except Exception as e:
+            failures.append(e)
+            holding.set()
+
+    writer = threading.Thread(target=first_writer)
+    writer.start()
+    assert holding.wait(5)
+    response = client.open(f'{TASKS_URL}/{task_id}', method=method, json={'status': 'COMPLETED'},
+                           headers=user['headers'])
+    writer.join()
+
+    assert failures == []
+    assert response.status_code == (200 if method == 'PUT' else 404)
+    assert assert_counters_match(app, client, user) == ({'COMPLETED': 1} if method == 'PUT' else {})
+
+
+#**************************************************************************************************
+# ETags of the task reads follow the user's data version
+
+
+def test_unchanged_read_revalidates_with_304(client, user):
+    create_tasks(client, user, SAMPLE_TASKS)
+
+    first = client.get(f'{TASKS_URL}/stats', headers=user['headers'])
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+
+    again = client.get(f'{TASKS_URL}/stats', headers={**user['headers'], 'If-None-Match': etag})
+    assert again.status_code == 304
+    assert again.headers['ETag'] == etag
+
+
+def test_write_changes_etag(client, user):
+    task_ids = create_tasks(client, user, SAMPLE_TASKS)
+    etag = client.get(f'{TASKS_URL}/stats', headers=user['headers']).headers['ETag']
+
+    client.put(f'{TASKS_URL}/{task_ids[0]}', json={'status': 'COMPLETED'}, headers=user['headers'])
+
+    response = client.get(f'{TASKS_URL}/stats', headers={**user['headers'], 'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert response.get_json()['data']['status_counts']['COMPLETED'] == 2
+
+
+def test_write_outside_the_request_changes_etag(app, client, user):
+    """A commit made elsewhere (another worker, a maintenance command) invalidates the ETag too"""
+    etag = client.get(f'{TASKS_URL}/stats', headers=user['headers']).headers['ETag']
+
+    with app.app_context():
+        db.session.add(Task(title='from another worker', user_id=user['user_id']))
+        db.session.commit()
+
+    response = client.get(f'{TASKS_URL}/stats', headers={**user['headers'], 'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert response.get_json()['data']['status_counts'] == {'PENDING': 1}
+
+
+#**************************************************************************************************
+# Change feed: upserts and tombstones in cursor order
+
+
+def read_changes(client, user, since=None, limit=None):
+    params = {key: value for key, value in (('since', since), ('limit', limit)) if value is not None}
+    return client.get(f'{TASKS_URL}/changes', query_string=params, headers=user['headers'])
+
+
+def test_changes_in_cursor_order(client, user):
+    task_ids = create_tasks(client, user, SAMPLE_TASKS[:3])
+    client.put(f'{TASKS_URL}/{task_ids[0]}', json={'status': 'COMPLETED'}, headers=user['headers'])
+    client.delete(f'{TASKS_URL}/{task_ids[1]}', headers=user['headers'])
+
+    response = read_changes(client, user)
+    assert response.status_code == 200
+    feed = response.get_json()['data']
+    assert feed['has_more'] is False
+
+    changes = [(change['op'], change['task_id']) for change in feed['changes']]
+    assert changes == [('upsert', task_ids[2]), ('upsert', task_ids[0]), ('delete', task_ids[1])]
+    positions = [(change['seq'], change['task_id']) for change in feed['changes']]
+    assert positions == sorted(positions)
+    assert feed['changes'][0]['created'] is True and feed['changes'][1]['created'] is False
+
+    # paging one change at a time walks the same sequence
+    paged, cursor = [], None
+    while True:
+        page = read_changes(client, user, since=cursor, limit=1).get_json()['data']
+        paged += [(change['op'], change['task_id']) for change in page['changes']]
+        cursor = page['next_cursor']
+        if not page['has_more']:
+            break
+    assert paged == changes
+
+    # nothing new after the last cursor
+    assert read_changes(client, user, since=feed['next_cursor']).get_json()['data']['changes'] == []
+
+
+def test_malformed_cursor_is_rejected(client, user):
+    assert read_changes(client, user, since='not-a-cursor').status_code == 400
+
+
+def test_cursor_older_than_pruned_tombstones_is_gone(app, client, user):
+    task_ids = create_tasks(client, user, SAMPLE_TASKS[:2])
+    stale_cursor = read_changes(client, user).get_json()['data']['next_cursor']
+    client.delete(f'{TASKS_URL}/{task_ids[0]}', headers=user['headers'])
+
+    result = app.test_cli_runner().invoke(args=['tasks', 'prune-tombstones', '--days', '0'])
+    assert result.exit_code == 0, result.output
+
+    assert read_changes(client, user, since=stale_cursor).status_code == 410
+    # starting over without a cursor works
+    response = read_changes(client, user)
+    assert response.status_code == 200
+    assert [change['task_id'] for change in response.get_json()['data']['changes']] == [task_ids[1]]
+
+
+#**************************************************************************************************
+# Full-text search
+
+
+def search(client, user, q, **params):
+    response = client.get(f'{TASKS_URL}/search', query_string={'q': q, **params}, headers=user['headers'])
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()['data']
+
+
+def test_search_matches_prefixes_of_own_tasks_best_first(client, user, new_user):
+    create_tasks(client, user, [
+        {'title': 'Team meeting', 'description': 'Discuss the expense reports'},
+        {'title': 'Submit expense report'},
+        {'title': 'Buy groceries'},
+    ])
+    other = new_user(client)
+    create_tasks(client, other, [{'title': 'Expense report of someone else'}])
+
+    found = search(client, user, 'expense rep')
+    assert [task['title'] for task in found['tasks']] == ['Submit expense report', 'Team meeting']
+    assert found['tasks'][0]['score'] > found['tasks'][1]['score']
+
+    page = search(client, user, 'expense rep', per_page=1, page=2)
+    assert [task['title'] for task in page['tasks']] == ['Team meeting']
+    assert page['has_next'] is False
+
+
+def test_search_probe_is_refreshed(app, client, user, monkeypatch):
+    create_tasks(client, user, [{'title': 'Quarterly report'}])
+    with app.app_context():
+        key = str(db.engine.url)
+    # a worker that probed before `flask tasks search-setup` ran
+    task_search._search_ready.set(key, False)
+    assert search(client, user, 'report')['tasks'][0]['score'] is None
+
+    now = time.monotonic()
+    monkeypatch.setattr(cache.time, 'monotonic', lambda: now + task_search.SEARCH_PROBE_TTL + 1)
+    assert search(client, user, 'report')['tasks'][0]['score'] is not None
+
+
+def test_search_setup_replaces_an_outdated_index(make_app, new_user):
+    app = make_app()
+    client = app.test_client()
+    user = new_user(client)
+    with app.app_context():
+        # the first layout: rowid = task_id, every user in one range
+        with db.engine.begin() as connection:
+            for statement in task_search.SQLITE_DROP_OUTDATED + ["DROP VIEW tasks_fts_source"]:
+                connection.execute(text(statement))
+            connection.execute(text(
+                "CREATE VIRTUAL TABLE tasks_fts USING fts5(title, description, content='tasks', content_rowid='task_id')"
+            ))
+        task_search._search_ready.clear()
+    create_tasks(client, user, [{'title': 'Quarterly report'}])
+
+    assert search(client, user, 'report')['tasks'][0]['score'] is None    # LIKE fallback
+
+    result = app.test_cli_runner().invoke(args=['tasks', 'search-setup'])
+    assert result.exit_code == 0, result.output
+    found = search(client, user, 'report')['tasks']
+    assert [task['title'] for task in found] == ['Quarterly report'] and found[0]['score'] is not None
+
+
+#**************************************************************************************************
+# Cursor (keyset) pagination of GET /user/tasks/
+
+
+def read_page(client, user, **params):
+    return client.get(f'{TASKS_URL}/', query_string=params, headers=user['headers'])
+
+
+def walk_cursor(client, user, per_page, **params):
+    """Every task of a full cursor walk, page after page"""
+    tasks, cursor = [], ''
+    while cursor is not None:
+        response = read_page(client, user, cursor=cursor, per_page=per_page, **params)
+        assert response.status_code == 200, response.get_json()
+        body = response.get_json()
+        assert len(body['data']) <= per_page
+        tasks += body['data']
+        cursor = body['pagination']['next_cursor']
+        assert body['pagination']['has_next'] is (cursor is not None)
+    return tasks
+
+
+@pytest.mark.parametrize('per_page', [1, 2, 3, 10])
+def test_cursor_walk_covers_null_and_equal_due_dates_once(client, user, per_page):
+    # four tasks share a due date and three have none: page ends fall inside both runs
+    due_days = [3, None, 3, 1, 3, None, 3, None, 5]
+    task_ids = create_tasks(client, user, [
+        {'title': f'Task {i}', **({'due_date': due(days)} if days is not None else {})}
+        for i, days in enumerate(due_days)
+    ])
+    expected = sorted(zip(due_days, task_ids), key=lambda pair: (pair[0] is None, pair[0] or 0, pair[1]))
+
+    walked = walk_cursor(client, user, per_page)
+    assert [task['task_id'] for task in walked] == [task_id for _, task_id in expected]
+
+
+def test_cursor_walk_follows_filters(client, user):
+    create_tasks(client, user, SAMPLE_TASKS)
+
+    walked = walk_cursor(client, user, 1, status='PENDING')
+    assert [task['title'] for task in walked] == ['write report', 'book flights']
+
+
+def test_tampered_or_foreign_cursor_is_rejected(client, user, new_user):
+    create_tasks(client, user, SAMPLE_TASKS)
+    cursor = read_page(client, user, cursor='', per_page=2).get_json()['pagination']['next_cursor']
+    payload, signature = cursor.split('.')
+
+    other = new_user(client)
+    create_tasks(client, other, SAMPLE_TASKS)
+    tampered = json.loads(base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4)))
+    tampered['id'] += 1
+    tampered = base64.urlsafe_b64encode(json.dumps(tampered).encode()).decode().rstrip('=')
+
+    for bad in (f'{tampered}.{signature}', payload, 'not-a-cursor'):
+        response = read_page(client, user, cursor=bad)
+        assert response.status_code == 400
+        assert response.get_json()['error'] == 'Invalid cursor.'
+    # a cursor handed out to one user does not page through another's tasks
+    assert read_page(client, other, cursor=cursor).status_code == 400
+    assert read_page(client, user, cursor=cursor).status_code == 200
+
+
+@pytest.mark.parametrize('count', ['exact', 'estimate'])
+def test_cursor_page_counts_only_when_asked(client, user, count):
+    create_tasks(client, user, SAMPLE_TASKS)
+
+    pagination = read_page(client, user, cursor='', per_page=2).get_json()['pagination']
+    assert 'total_items' not in pagination
+
+    pagination = read_page(client, user, cursor='', per_page=2, status='PENDING', count=count).get_json()['pagination']
+    # SQLite has no planner estimate: both counts are exact there
+    assert pagination['total_items'] == 2
+    assert pagination['total_is_estimate'] is (count == 'estimate')
@@ -0,0 +1,118 @@
+import time
+
+import pytest
+from sqlalchemy import delete, event, update
+
+from app import db
+from app.models import User
+from app.utils import cache
+from app.utils.user_cache import invalidate_user
+
+
+def refresh_headers(user):
+    return {'Authorization': f"Bearer {user['refresh_token']}"}
+
+
+def test_refresh_token_mints_access_token(client, user):
+    response = client.post('/auth/refresh', headers=refresh_headers(user))
+    assert response.status_code == 200
+
+    access = {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+    response = client.get('/auth/user', headers=access)
+    assert response.status_code == 200
+    assert response.get_json()['user_id'] == user['user_id']
+
+
+def test_revoked_refresh_token_is_rejected(client, user):
+    response = client.post('/auth/logout', headers=refresh_headers(user))
+    assert response.status_code == 200
+
+    response = client.post('/auth/refresh', headers=refresh_headers(user))
+    assert response.status_code == 401
+
+    # logging out again with the same token is refused as well
+    response = client.post('/auth/logout', headers=refresh_headers(user))
+    assert response.status_code == 401
+
+
+def test_logout_revokes_only_that_refresh_token(client, user):
+    other = client.post('/auth/login', json={'email': user['user']['email'], 'password': 'password123'}).get_json()
+
+    client.post('/auth/logout', headers=refresh_headers(user))
+
+    response = client.post('/auth/refresh', headers=refresh_headers(other))
+    assert response.status_code == 200
+
+
+#**************************************************************************************************
+# Per-process user-profile cache behind current_user
+
+
+@pytest.fixture
+def user_queries(app):
+    """Statements touching `users` run while the fixture is active"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if 'users' in statement:
+            statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', record)
+    yield statements
+    event.remove(engine, 'before_cursor_execute', record)
+
+
+def rename_in_database(app, user_id, name):
+    """Change a user behind the cache's back, as another worker process would"""
+    with app.app_context():
+        db.session.execute(update(User).where(User.user_id == user_id).values(name=name))
+        db.session.commit()
+
+
+def profile(client, user):
+    response = client.get('/auth/user', headers=user['headers'])
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_cache_hit_skips_the_user_lookup(client, user, user_queries):
+    profile(client, user)
+    user_queries.clear()
+
+    assert profile(client, user)['user_id'] == user['user_id']
+    assert user_queries == []
+
+
+def test_profile_update_invalidates_the_cache(client, user):
+    assert profile(client, user)['name'] == 'Test User'
+
+    response = client.put('/auth/user', json={'name': 'Renamed User'}, headers=user['headers'])
+    assert response.status_code == 200
+
+    assert profile(client, user)['name'] == 'Renamed User'
+
+
+def test_cached_profile_expires_after_ttl(app, client, user, monkeypatch):
+    profile(client, user)
+    rename_in_database(app, user['user_id'], 'Renamed Elsewhere')
+
+    # still served from this process's cache ...
+    assert profile(client, user)['name'] == 'Test User'
+
+    # ... until USER_CACHE_TTL seconds have passed
+    now = time.monotonic()
+    monkeypatch.setattr(cache.time, 'monotonic', lambda: now + app.config['USER_CACHE_TTL'] + 1)
+    assert profile(client, user)['name'] == 'Renamed Elsewhere'
+
+
+def test_token_of_deleted_user_is_rejected(app, client, user):
+    profile(client, user)
+    with app.app_context():
+        db.session.execute(delete(User).where(User.user_id == user['user_id']))
+        db.session.commit()
+    invalidate_user(user['user_id'])
+
+    assert client.get('/auth/user', headers=user['headers']).status_code == 401
+    assert client.get('/user/tasks/', headers=user['headers']).status_code == 401
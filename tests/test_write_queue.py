@@ -0,0 +1,90 @@
+import threading
+import time
+
+import pytest
+from sqlalchemy import event
+
+from app import db
+from app.models import Task
+from app.utils import write_queue as queue_module
+from app.utils.write_queue import write_queue
+
+TASKS_URL = '/user/tasks'
+
+
+@pytest.fixture
+def queued(make_app, new_user):
+    """An app with SQLITE_WRITE_QUEUE on; the session listeners are removed afterwards"""
+    timeout = write_queue.timeout
+    app = make_app(SQLITE_WRITE_QUEUE=True, SQLITE_WRITE_TIMEOUT=0.5)
+    client = app.test_client()
+    yield app, client, new_user(client)
+    for name, listener in (('before_flush', queue_module._before_flush),
+                           ('do_orm_execute', queue_module._before_bulk_statement),
+                           ('after_transaction_end', queue_module._after_transaction_end)):
+        if event.contains(db.session, name, listener):
+            event.remove(db.session, name, listener)
+    write_queue.timeout = timeout
+
+
+def hold_write_transaction(app, user_id, release, holding, failures):
+    """Another request thread: flush a task, keep the transaction open until `release`"""
+    try:
+        with app.app_context():
+            db.session.add(Task(title='held', user_id=user_id))
+            db.session.flush()
+            holding.set()
+            release.wait(5)
+            db.session.commit()
+    except Exception as e:
+        failures.append(e)
+        holding.set()
+
+
+def test_write_transactions_run_one_after_the_other(queued):
+    app, client, user = queued
+    holding, release, failures = threading.Event(), threading.Event(), []
+    acquired = write_queue.stats()['acquired']
+
+    writer = threading.Thread(target=hold_write_transaction, args=(app, user['user_id'], release, holding, failures))
+    writer.start()
+    assert holding.wait(5)
+    threading.Timer(0.2, release.set).start()
+
+    start = time.perf_counter()
+    response = client.post(f'{TASKS_URL}/', json={'title': 'queued'}, headers=user['headers'])
+    waited = time.perf_counter() - start
+    writer.join()
+
+    assert failures == []
+    assert response.status_code == 201
+    # the request's write started only once the held transaction had committed
+    assert waited >= 0.2
+    assert write_queue.stats()['acquired'] - acquired == 2
+    assert write_queue.stats()['waiting'] == 0
+
+
+def test_queue_timeout_returns_503_with_retry_after(queued):
+    app, client, user = queued
+    holding, release, failures = threading.Event(), threading.Event(), []
+
+    writer = threading.Thread(target=hold_write_transaction, args=(app, user['user_id'], release, holding, failures))
+    writer.start()
+    assert holding.wait(5)
+    try:
+        response = client.post(f'{TASKS_URL}/', json={'title': 'too late'}, headers=user['headers'])
+        bulk = client.post(f'{TASKS_URL}/bulk', json=[{'title': 'too late'}], headers=user['headers'])
+    finally:
+        release.set()
+        writer.join()
+
+    assert failures == []
+    for timed_out in (response, bulk):
+        assert timed_out.status_code == 503
+        assert timed_out.headers['Retry-After'] == '1'
+
+    # the timed-out requests left the queue: the next write goes through
+    response = client.post(f'{TASKS_URL}/', json={'title': 'later'}, headers=user['headers'])
+    assert response.status_code == 201
+    titles = [task['title'] for task in client.get(f'{TASKS_URL}/', headers=user['headers']).get_json()['data']['tasks']]
+    assert sorted(titles) == ['held', 'later']